@@ -0,0 +1,85 @@
+"""Serve a NumPy model to worker processes in batches, and report the metrics."""
+
+import argparse
+import multiprocessing
+import time
+
+import numpy as np
+from alpha_dom import encoding
+from alpha_dom import inference
+
+NUM_ACTIONS = 11
+
+
+class MLP:
+    """A policy and value network with one hidden layer and random weights."""
+
+    def __init__(self, num_features: int, hidden: int, seed: int = 0) -> None:
+        """Initialize the weights."""
+        rng = np.random.default_rng(seed)
+        self.w1 = rng.normal(0, num_features**-0.5, (num_features, hidden))
+        self.w2 = rng.normal(0, hidden**-0.5, (hidden, NUM_ACTIONS + 1))
+        self.w1, self.w2 = self.w1.astype(np.float32), self.w2.astype(np.float32)
+
+    def __call__(
+        self,
+        observations: np.ndarray,
+        masks: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Return the priors and values of a batch of observations."""
+        out = np.maximum(observations @ self.w1, 0) @ self.w2
+        logits = np.where(masks, out[:, :NUM_ACTIONS], -np.inf)
+        priors = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return priors / priors.sum(axis=1, keepdims=True), np.tanh(out[:, -1])
+
+
+def work(client: inference.Client, num_requests: int, seed: int) -> None:
+    """Evaluate one observation at a time, as a self-play worker would."""
+    rng = np.random.default_rng(seed)
+    observations = rng.random((1, encoding.observation_size()), dtype=np.float32)
+    masks = np.ones((1, NUM_ACTIONS), dtype=bool)
+    for _ in range(num_requests):
+        client(observations, masks)
+
+
+def main() -> None:
+    """Run the workers against the server and print its metrics."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--hidden", type=int, default=512)
+    parser.add_argument("--max-batch-size", type=int, default=64)
+    parser.add_argument("--max-latency", type=float, default=0.002)
+    args = parser.parse_args()
+
+    server = inference.Server(
+        MLP(encoding.observation_size(), args.hidden),
+        encoding.observation_size(),
+        NUM_ACTIONS,
+        num_clients=args.workers,
+        max_batch_size=args.max_batch_size,
+        max_latency=args.max_latency,
+    )
+    ctx = multiprocessing.get_context()
+    workers = [
+        ctx.Process(target=work, args=(client, args.requests, k))
+        for k, client in enumerate(server.clients)
+    ]
+    start = time.perf_counter()
+    with server:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    seconds = time.perf_counter() - start
+
+    stats = server.stats()
+    print(f"{stats.requests / seconds:,.0f} observations/sec")
+    print(f"{stats.batches} batches, {stats.mean_batch_size:.1f} rows on average")
+    print(f"max queue depth {stats.max_queue_depth}")
+    print(f"latency p50 {1e3 * stats.p50_latency:.2f} ms")
+    print(f"latency p99 {1e3 * stats.p99_latency:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Generate self-play positions and report the throughput."""
+
+import argparse
+import pathlib
+
+from alpha_dom import selfplay
+
+
+def main() -> None:
+    """Run self-play, resuming from the index in the output directory."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("root", type=pathlib.Path, help="The output directory.")
+    parser.add_argument("--shards", type=int, default=16)
+    parser.add_argument("--games-per-shard", type=int, default=64)
+    parser.add_argument("--envs", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = selfplay.Config(
+        root=args.root,
+        num_shards=args.shards,
+        games_per_shard=args.games_per_shard,
+        num_envs=args.envs,
+        seed=args.seed,
+    )
+    throughput = selfplay.run(config, args.workers)
+    print(f"{throughput.games} games, {throughput.positions} positions")
+    print(f"{throughput.games_per_second:.1f} games/sec")
+    print(f"{throughput.positions_per_second:.1f} positions/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Play a tournament between two baseline bots and report the win rate."""
+
+import argparse
+
+from alpha_dom import bots
+
+
+def main() -> None:
+    """Play the tournament and print its results."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("a", choices=sorted(bots.STRATEGIES))
+    parser.add_argument("b", choices=sorted(bots.STRATEGIES))
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = bots.tournament(
+        bots.STRATEGIES[args.a],
+        bots.STRATEGIES[args.b],
+        args.games,
+        args.workers,
+        seed=args.seed,
+    )
+    low, high = result.confidence_interval()
+    print(f"{args.a}: {result.wins} wins, {result.ties} ties, {result.losses} losses")
+    print(f"win rate {result.win_rate:.3f} (95% CI {low:.3f} to {high:.3f})")
+    print(f"{result.games_per_minute:,.0f} games/min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+"""Provides the beliefs of players about hidden information, and samplers of it."""
+
+from .tracker import SIZES
+from .tracker import ZONES
+from .tracker import Beliefs
@@ -0,0 +1,309 @@
+"""What a player knows about the hidden zones of every player of a game.
+
+All gains and trashes are public, so the cards that each player owns are
+known to everyone, and so are the cards in play. What is hidden is which of
+the other cards of a player are in its hand, discard pile or draw pile, and the
+order of every draw pile. `Beliefs` tracks, for one observer and each player:
+
+- `deck`: the cards that the player owns.
+- `known`: the cards known to be in its hand, discard pile and play area.
+- `top`: the cards known to be on top of its draw pile, in order.
+- `hidden`: the other cards, each of which may be in any of the hidden slots of
+  the hand, discard pile and draw pile below `top`.
+
+The beliefs are updated incrementally from the events of the players (see
+`alpha_dom.player.events`), using only what the observer sees. The observer
+sees its own draws, so its own hand and discard pile are always known, and only
+the order of its draw pile is hidden.
+
+A reshuffle moves the known cards of a discard pile to `hidden`, which forgets
+that they are in the draw pile rather than the hand. This only loses information
+when a player reshuffles in the middle of its turn.
+
+`Beliefs.determinize` samples full states that are consistent with the beliefs,
+for search over information sets, e.g. by running `alpha_dom.search.MCTS` from
+each of them.
+"""
+
+import typing
+
+import numpy as np
+
+from alpha_dom import cards
+from alpha_dom import seeding
+from alpha_dom.engine import Snapshot
+from alpha_dom.player import Player
+from alpha_dom.player import events
+
+# The zones in `Beliefs.known`, and then in `Beliefs.sizes`.
+ZONES = ("hand", "discard_pile", "in_play")
+SIZES = (*ZONES, "draw_pile")
+HAND, DISCARD, PLAY, DRAW = range(len(SIZES))
+
+# The indices of the zones named by the methods of `Player`.
+_ZONE = {"Hand": HAND, "DiscardPile": DISCARD, "DrawPile": DRAW}
+
+
+class Beliefs:
+    """What one player knows about the zones of every player of a game.
+
+    Attributes:
+        observer: The index of the observing player.
+        deck: (P, C) count of each card that each player owns.
+        known: (P, 3, C) count of each card known to be in each zone of `ZONES`.
+        hidden: (P, C) count of each card whose zone is not known.
+        sizes: (P, 4) number of cards in each zone of `SIZES`.
+        top: The ids of the cards known to be on top of each draw pile, with the
+            top card last.
+    """
+
+    def __init__(
+        self,
+        players: typing.Sequence[Player],
+        observer: int,
+        *,
+        listen: bool = True,
+    ) -> None:
+        """Initialize the beliefs of a player at any point of a game.
+
+        Only the zones of the observer and the public zones of the other players
+        are read: the observer knows its own hand, discard pile and play area,
+        and the play areas of the others.
+
+        Args:
+            players: The players, in turn order.
+            observer: The index of the observing player.
+            listen: Whether to follow the game from the events of the players.
+                Otherwise, pass their events to `observe`.
+        """
+        num_players, c = len(players), cards.num_cards()
+        self.observer = observer
+        self.deck = np.zeros((num_players, c), dtype=np.int32)
+        self.known = np.zeros((num_players, len(ZONES), c), dtype=np.int32)
+        self.sizes = np.zeros((num_players, len(SIZES)), dtype=np.int32)
+        self.top: list[list[int]] = [[] for _ in players]
+        self._index = {p.name: i for i, p in enumerate(players)}
+
+        for i, p in enumerate(players):
+            np.add.at(self.deck[i], [card.id for card in p.deck], 1)
+            np.add.at(self.known[i, PLAY], [card.id for card in p.cards_in_play], 1)
+            if i == observer:
+                for zone, counts in ((HAND, p.hand), (DISCARD, p.discard_pile)):
+                    for card, n in counts.items():
+                        self.known[i, zone, card.id] += n
+            self.sizes[i] = [
+                sum(p.hand.values()),
+                sum(p.discard_pile.values()),
+                len(p.cards_in_play),
+                len(p.draw_pile) + sum(p.shuffled.values()),
+            ]
+        self.hidden = self.deck - self.known.sum(axis=1)
+
+        self._players = list(players) if listen else []
+        for p in self._players:
+            p.listen(self.observe)
+
+    @property
+    def num_players(self) -> int:
+        """Return the number of players."""
+        return len(self.top)
+
+    def detach(self) -> None:
+        """Stop following the events of the players."""
+        for p in self._players:
+            p.unlisten(self.observe)
+        self._players = []
+
+    def slots(self) -> np.ndarray:
+        """Return the (P, 3) number of hidden cards in each hand and pile.
+
+        The columns are the hand, the discard pile and the draw pile below `top`.
+        """
+        slots = self.sizes[:, [HAND, DISCARD, DRAW]].copy()
+        slots[:, :2] -= self.known[:, [HAND, DISCARD]].sum(axis=2)
+        slots[:, 2] -= [len(top) for top in self.top]
+        return slots
+
+    def validate(self) -> None:
+        """Check that the beliefs are consistent with themselves.
+
+        Raises:
+            ValueError: If the counts do not add up, e.g. after a missed event.
+        """
+        top = np.zeros_like(self.deck)
+        for i, ids in enumerate(self.top):
+            np.add.at(top[i], ids, 1)
+        if (self.hidden < 0).any() or (
+            self.hidden + self.known.sum(axis=1) + top != self.deck
+        ).any():
+            msg = "The hidden cards do not match the decks."
+            raise ValueError(msg)
+        if (self.slots() < 0).any() or (
+            self.slots().sum(axis=1) != self.hidden.sum(axis=1)
+        ).any():
+            msg = "The hidden cards do not match the sizes of the zones."
+            raise ValueError(msg)
+
+    def observe(self, event: events.Event) -> None:
+        """Update the beliefs with an event of one of the players."""
+        i, kind = self._index[event.player], event.kind
+        c = -1 if event.card is None else event.card.id
+        if kind is events.Kind.Draw:
+            self._draw(i, c)
+        elif kind is events.Kind.Play:
+            self._take(i, c, HAND, event.n)
+            self._put(i, c, PLAY, event.n)
+        elif event.zone is not None:
+            self._move(i, c, kind, _ZONE[event.zone], -1 - event.position)
+        elif kind is events.Kind.Look:
+            # Cards above the depth are known already, in order.
+            if i == self.observer and event.n == len(self.top[i]):
+                self.hidden[i, c] -= 1
+                self.top[i].insert(0, c)
+        elif kind is events.Kind.Cleanup:
+            self.known[i, DISCARD] += self.known[i, HAND] + self.known[i, PLAY]
+            self.known[i, [HAND, PLAY]] = 0
+            self.sizes[i, DISCARD] += self.sizes[i, HAND] + self.sizes[i, PLAY]
+            self.sizes[i, [HAND, PLAY]] = 0
+        elif kind is events.Kind.Reshuffle:
+            self.hidden[i] += self.known[i, DISCARD]
+            self.known[i, DISCARD] = 0
+            self.sizes[i, DRAW] += self.sizes[i, DISCARD]
+            self.sizes[i, DISCARD] = 0
+
+    def _move(  # noqa: PLR0913
+        self,
+        i: int,
+        c: int,
+        kind: events.Kind,
+        zone: int,
+        depth: int,
+    ) -> None:
+        """Apply a public event that gains a card to a zone or takes it from one.
+
+        A card taken from the draw pile is `depth` cards from the top.
+        """
+        if kind is events.Kind.Gain:
+            self.deck[i, c] += 1
+            self._put(i, c, zone)
+            return
+
+        if zone == DRAW:
+            self._take_drawn(i, c, depth)
+        else:
+            self._take(i, c, zone)
+        if kind is events.Kind.TopDeck:
+            self._put(i, c, DRAW)
+        elif kind is events.Kind.Discard:
+            self._put(i, c, DISCARD)
+        elif kind is events.Kind.Trash:
+            self.deck[i, c] -= 1
+
+    def _draw(self, i: int, c: int) -> None:
+        """Move the top card of a draw pile into the hand."""
+        top = self.top[i]
+        if top:
+            self.known[i, HAND, top.pop()] += 1
+        elif i == self.observer:
+            self.hidden[i, c] -= 1
+            self.known[i, HAND, c] += 1
+        self.sizes[i, DRAW] -= 1
+        self.sizes[i, HAND] += 1
+
+    def _take(self, i: int, c: int, zone: int, n: int = 1) -> None:
+        """Remove revealed copies of a card from a hand or discard pile."""
+        self.sizes[i, zone] -= n
+        known = min(n, int(self.known[i, zone, c]))
+        self.known[i, zone, c] -= known
+        self.hidden[i, c] -= n - known
+
+    def _take_drawn(self, i: int, c: int, depth: int) -> None:
+        """Remove a revealed card from a draw pile, `depth` cards from the top."""
+        self.sizes[i, DRAW] -= 1
+        top = self.top[i]
+        if depth < len(top):
+            del top[len(top) - 1 - depth]
+        else:
+            self.hidden[i, c] -= 1
+
+    def _put(self, i: int, c: int, zone: int, n: int = 1) -> None:
+        """Add revealed copies of a card to a zone."""
+        self.sizes[i, zone] += n
+        if zone == DRAW:
+            self.top[i].extend([c] * n)
+        else:
+            self.known[i, zone, c] += n
+
+    def determinize(
+        self,
+        root: Snapshot,
+        n: int,
+        *,
+        rng: seeding.RngLike = None,
+    ) -> Snapshot:
+        """Sample hidden states that are consistent with the beliefs.
+
+        In each sample, the `hidden` cards of each player are dealt uniformly at
+        random to the hidden slots of its zones, and its draw pile is the hidden
+        cards of the draw pile, in random order, under `top`.
+
+        Args:
+            root: A snapshot of the game from `alpha_dom.engine.BatchedGame`,
+                for its public state. Its zones are ignored, so it may be a
+                snapshot of the true state.
+            n: The number of samples.
+            rng: The random number generator, or a seed for one.
+
+        Returns:
+            A snapshot of `n` games, to restore into `n` games of a
+            `BatchedGame` with `restore(snapshot, games)`. Its zones have a
+            leading dimension of size `n`, and the other arrays are those of
+            `root`.
+
+        Raises:
+            ValueError: If a draw pile does not fit in the draw piles of `root`.
+        """
+        rng = np.random.default_rng(rng)
+        num_players, c = self.hidden.shape
+        capacity = len(root["draw_pile"][0])
+        if self.sizes[:, DRAW].max(initial=0) > capacity:
+            msg = f"A draw pile has more than {capacity} cards."
+            raise ValueError(msg)
+
+        hand, discard_pile, in_play = (
+            np.repeat(self.known[None, :, zone], n, axis=0) for zone in range(3)
+        )
+        draw_pile = np.zeros((n, num_players, capacity), dtype=np.int32)
+        draw_counts = np.zeros((n, num_players, c), dtype=np.int32)
+        slots = self.slots()
+        for i in range(num_players):
+            ids = np.repeat(np.arange(c, dtype=np.int32), self.hidden[i])
+            dealt = ids[rng.random((n, ids.size)).argsort(axis=1)]
+            h, d, r = slots[i]
+            hand[:, i] += _counts(dealt[:, :h], c)
+            discard_pile[:, i] += _counts(dealt[:, h : h + d], c)
+
+            bottom, top = dealt[:, h + d :], self.top[i]
+            draw_pile[:, i, :r] = bottom
+            draw_pile[:, i, r : r + len(top)] = top
+            draw_counts[:, i] = _counts(bottom, c) + np.bincount(top, minlength=c)
+
+        return {
+            **root,
+            "hand": hand,
+            "discard_pile": discard_pile,
+            "in_play": in_play,
+            "draw_pile": draw_pile,
+            "draw_size": np.repeat(self.sizes[None, :, DRAW], n, axis=0),
+            "draw_counts": draw_counts,
+        }
+
+
+def _counts(ids: np.ndarray, num_cards: int) -> np.ndarray:
+    """Return the (n, C) count of each card in each row of (n, K) card ids."""
+    n = len(ids)
+    offsets = np.arange(n)[:, None] * num_cards
+    return np.bincount((ids + offsets).ravel(), minlength=n * num_cards).reshape(
+        n,
+        num_cards,
+    )
@@ -1,8 +1,16 @@
 """Provides model for board in dominion."""
 
+from .model import EMPTY_PILES_TO_END
+from .model import PROVINCE
 from .model import Board
 from .model import SuggestedSet
+from .model import SupplyTemplate
 from .model import load
 from .model import load_custom
 from .model import load_random
 from .model import load_suggested
+from .model import supply_template
+from .tables import Tables
+from .tables import buy_mask
+from .tables import masks
+from .tables import play_mask
@@ -1,17 +1,67 @@
 """Implements Dominion kingdom as a pydantic model."""
 
 import enum
+import functools
 import json
 import pathlib
-import random
 import typing
 
+import numpy as np
 import pydantic
 
 from .. import cards
+from .. import seeding
+from ..state import zobrist
+from ..state.undo import Tracked
+from .tables import Tables
 
+PROVINCE = "Province"
+EMPTY_PILES_TO_END = 3
 
-class Board(pydantic.BaseModel):
+
+class SupplyTemplate(typing.NamedTuple):
+    """The initial supply of a kingdom, for a number of players.
+
+    Attributes:
+        counts: (C,) the read-only count of each card, indexed by card id.
+        supply: The counts keyed by card, in the order of the kingdom cards. This
+            is shared, so it must be copied before it is changed.
+        zobrist: The hash of the supply, as in `Board.state_hash`.
+        empty: The number of empty piles, as in `Board.empty_piles`.
+    """
+
+    counts: np.ndarray
+    supply: dict[cards.Card, int]
+    zobrist: int
+    empty: int
+
+
+@functools.cache
+def supply_template(ids: tuple[int, ...], num_players: int) -> SupplyTemplate:
+    """Return the initial supply of a kingdom, built from the piles of its cards.
+
+    Args:
+        ids: The ids of the kingdom cards, as in `Tables.ids`.
+        num_players: The number of players in the game.
+    """
+    counts = np.zeros(cards.num_cards(), dtype=np.int32)
+    counts[list(ids)] = cards.pile_vector(num_players)[list(ids)]
+    counts.flags.writeable = False
+    supply = dict(zip(map(cards.from_id, ids), counts[list(ids)].tolist(), strict=True))
+    empty = sum(n == 0 for n in supply.values())
+    return SupplyTemplate(counts, supply, _zone_hash("supply", supply), empty)
+
+
+def _zone_hash(zone: str, counts: dict[cards.Card, int]) -> int:
+    """Return the hash of the counts of the cards in a zone of the board."""
+    keys = zobrist.zone_keys(zobrist.zone_index(zone))
+    h = 0
+    for card, n in counts.items():
+        h ^= keys[card.id][n % zobrist.NUM_COUNTS]
+    return h
+
+
+class Board(Tracked):
     """A pydantic model for a board in Dominion.
 
     Attributes:
@@ -20,13 +70,23 @@ class Board(pydantic.BaseModel):
         non_kingdom_supply: The common cards in the board.
         trash: Cards in the trash and their multiplicity.
         supply: Cards in the supply and their multiplicity.
+
+    Changes to the supply and trash should go through `update_supply` and
+    `update_trash`, which maintain `state_hash` and `empty_piles`, and can be
+    undone with an `alpha_dom.state.UndoLog`. After changing them directly, call
+    `rehash`.
     """
 
+    CONTAINERS: typing.ClassVar[tuple[str, ...]] = ("trash", "supply")
+
     name: str
     kingdom_supply_cards: list[cards.Card]
     non_kingdom_supply_cards: list[cards.Card] = []
     trash: dict[cards.Card, int] = {}
     supply: dict[cards.Card, int] = {}
+    _tables: Tables | None = pydantic.PrivateAttr(default=None)
+    _zobrist: int = pydantic.PrivateAttr(default=0)
+    _empty: int = pydantic.PrivateAttr(default=0)
 
     def __str__(self) -> str:
         """Return the name of the board."""
@@ -70,7 +130,7 @@ class Board(pydantic.BaseModel):
     def __init__(self, *, name: str, kingdom_supply_cards: list[str]) -> None:
         """Initialize the board."""
         has_witch = "Witch" in kingdom_supply_cards
-        super().__init__(
+        super().__init__(  # type: ignore[call-arg]
             name=name,
             kingdom_supply_cards=list(map(cards.load, kingdom_supply_cards)),
             non_kingdom_supply_cards=cards.load_common(load_curse=has_witch),
@@ -107,34 +167,117 @@ class Board(pydantic.BaseModel):
         """Return the kingdom cards in the board."""
         return self.kingdom_supply_cards + self.non_kingdom_supply_cards
 
+    @property
+    def state_hash(self) -> int:
+        """Return the Zobrist hash of the supply and trash.
+
+        See `alpha_dom.state.zobrist`.
+        """
+        return self._zobrist
+
+    @property
+    def empty_piles(self) -> int:
+        """Return the number of empty piles in the supply."""
+        return self._get("_empty")
+
+    def rehash(self) -> int:
+        """Recompute the hash of the supply and trash from scratch, and return it.
+
+        This also recounts the empty piles.
+        """
+        self._empty = sum(n == 0 for n in self.supply.values())
+        h = _zone_hash("supply", self.supply) ^ _zone_hash("trash", self.trash)
+        self._zobrist = h
+        return h
+
+    def update_supply(self, card: cards.Card, delta: int) -> None:
+        """Add (or, if negative, remove) copies of a card to the supply.
+
+        Args:
+            card: The card.
+            delta: The change in the number of copies.
+        """
+        was_empty = self.supply.get(card) == 0
+        old = self._set_count("supply", card, delta)
+        self._rekey(zobrist.zone_index("supply"), card, old, old + delta)
+        if was_empty != (old + delta == 0):
+            self._set_logged("_empty", self._get("_empty") + (-1 if was_empty else 1))
+
+    def update_trash(self, card: cards.Card, delta: int) -> None:
+        """Add (or, if negative, remove) copies of a card to the trash.
+
+        Args:
+            card: The card.
+            delta: The change in the number of copies.
+        """
+        old = self._set_count("trash", card, delta)
+        self._rekey(zobrist.zone_index("trash"), card, old, old + delta)
+
+    def _rekey(self, zone: int, card: cards.Card, old: int, new: int) -> None:
+        """Update the hash for a change in the count of a card in a zone."""
+        keys = zobrist.zone_keys(zone)[card.id]
+        self._set_logged(
+            "_zobrist",
+            self._get("_zobrist")
+            ^ keys[old % zobrist.NUM_COUNTS]
+            ^ keys[new % zobrist.NUM_COUNTS],
+        )
+
+    def game_over(self) -> bool:
+        """Return whether the supply meets a condition for ending the game.
+
+        A game ends when the Province pile, or any three supply piles, are empty.
+        """
+        return (
+            self._get("_empty") >= EMPTY_PILES_TO_END
+            or self.supply.get(cards.load(PROVINCE), 0) == 0
+        )
+
+    @property
+    def tables(self) -> Tables:
+        """Return the cost and type tables of the kingdom cards.
+
+        These are built by `set_initial_supply`, or on first access.
+        """
+        if self._tables is None:
+            self._tables = Tables.from_board(self)
+        return self._tables
+
+    def supply_template(self, num_players: int = 2) -> SupplyTemplate:
+        """Return the initial supply of the board, from the cache of templates.
+
+        Args:
+            num_players: The number of players in the game.
+        """
+        return supply_template(tuple(self.tables.ids.tolist()), num_players)
+
     def set_initial_supply(self, num_players: int = 2) -> None:
         """Set initial card counts for supply cards.
 
+        The size of each pile is given by the `Card.pile` of its card. The supply
+        is copied from a template that is built once for each kingdom and number
+        of players, so this does not look at the cards.
+
         Args:
             num_players: The number of players in the game.
         """
-        # TODO: Make a class hierarchy for cards and move this logic to the cards'
-        # own class
-        for card in self.kingdom_cards:
-            if card.name == "Copper":
-                self.supply[card] = 60
-            elif card.name == "Silver":
-                self.supply[card] = 40
-            elif card.name == "Gold":
-                self.supply[card] = 30
-            elif card.name == "Curse":
-                self.supply[card] = 10 * (num_players - 1)
-            elif "Victory" in card.types:
-                self.supply[card] = 4 + 2 * num_players
-            else:  # "Action" in card.types
-                self.supply[card] = 10
-
-
-def load_random() -> Board:
-    """Load board with 10 random kingdom cards from the Base set."""
-    kingdom_supply_cards: list[str] = random.sample(
-        cards.Expansion.Base.list_names(),
-        10,
+        template = self.supply_template(num_players)
+        self.supply = dict(template.supply)
+        self._set_logged("_zobrist", template.zobrist ^ _zone_hash("trash", self.trash))
+        self._set_logged("_empty", template.empty)
+
+
+def load_random(rng: seeding.RngLike = None) -> Board:
+    """Load board with 10 random kingdom cards from the Base set.
+
+    Args:
+        rng: The random number generator used to pick the cards, or a seed for
+            one.
+    """
+    kingdom_supply_cards: list[str] = (
+        np.random.default_rng(rng)
+        .choice(cards.Expansion.Base.list_names(), 10, replace=False)
+        .tolist()
     )
     kingdom_supply_cards.sort()
     return load_custom(kingdom_supply_cards)
@@ -0,0 +1,167 @@
+"""Precomputed per-board tables for generating legal-action masks.
+
+Deciding which cards can be bought, or which cards in hand can be played, only
+needs the cost and types of each card. These are gathered once per board into
+arrays aligned with `Board.kingdom_cards`, so that the masks at every decision
+point are a few vectorized comparisons. `Tables.stack` pads the tables of many
+boards into (N, A) arrays, and the same mask functions then apply to batches of
+games, e.g. those of a `BatchedGame`.
+"""
+
+import typing
+
+import numpy as np
+
+from alpha_dom import cards
+
+if typing.TYPE_CHECKING:
+    from alpha_dom import player
+
+    from .model import Board
+
+# A cost that no amount of money can pay, for padding.
+UNAFFORDABLE = np.iinfo(np.int32).max
+
+
+class Tables(typing.NamedTuple):
+    """The cards of a board, or of a batch of boards, as aligned arrays.
+
+    Attributes:
+        ids: (..., A) the id of each card, or -1 for padding.
+        costs: (..., A) the cost of each card, or `UNAFFORDABLE` for padding.
+        types: (..., A) the `TypeFlag`s of each card, or 0 for padding.
+    """
+
+    ids: np.ndarray
+    costs: np.ndarray
+    types: np.ndarray
+
+    @classmethod
+    def from_board(cls, b: "Board") -> "Tables":
+        """Return the tables of a board, in the order of its kingdom cards."""
+        ids = np.array([c.id for c in b.kingdom_cards], dtype=np.int32)
+        tables = cls(
+            ids=ids,
+            costs=cards.cost_vector()[ids].astype(np.int32),
+            types=cards.flag_vector()[ids],
+        )
+        for table in tables:
+            table.flags.writeable = False
+        return tables
+
+    @classmethod
+    def stack(
+        cls,
+        boards: typing.Sequence["Board"],
+        width: int | None = None,
+    ) -> "Tables":
+        """Return the (N, A) tables of many boards, padded to the same width.
+
+        Args:
+            boards: The boards.
+            width: The number of columns. Defaults to the most kingdom cards
+                on any board.
+        """
+        width = max(len(b.kingdom_cards) for b in boards) if width is None else width
+        ids = np.full((len(boards), width), -1, dtype=np.int32)
+        costs = np.full((len(boards), width), UNAFFORDABLE, dtype=np.int32)
+        types = np.zeros((len(boards), width), dtype=np.uint8)
+        for i, b in enumerate(boards):
+            t = b.tables
+            ids[i, : t.ids.size] = t.ids
+            costs[i, : t.ids.size] = t.costs
+            types[i, : t.ids.size] = t.types
+        return cls(ids, costs, types)
+
+    def gather(self, counts: np.ndarray) -> np.ndarray:
+        """Return counts indexed by card id in the order of the tables.
+
+        Args:
+            counts: (..., C) counts indexed by card id, e.g. a supply.
+
+        Returns:
+            (..., A) the count of each card, or 0 for padding.
+        """
+        gathered = np.take_along_axis(counts, np.maximum(self.ids, 0), axis=-1)
+        gathered *= self.ids >= 0
+        return gathered
+
+
+def _expand(values: np.ndarray | int) -> np.ndarray:
+    """Add a trailing axis to broadcast per-game values against cards."""
+    return np.expand_dims(np.asarray(values), -1)
+
+
+def buy_mask(
+    tables: Tables,
+    supply: np.ndarray,
+    money: np.ndarray | int,
+    buys: np.ndarray | int,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Return whether each card in the tables can be bought.
+
+    A card can be bought if the player has a buy left, enough money, and the
+    pile of the card is not empty.
+
+    Args:
+        tables: (..., A) the tables of the boards.
+        supply: (..., A) the number of copies of each card in the supply, in
+            the order of the tables. See `Tables.gather`.
+        money: (...) the money of the player in each game.
+        buys: (...) the buys of the player in each game.
+        out: (..., A) buffer to write the mask into.
+    """
+    out = np.less_equal(tables.costs, _expand(money), out=out)
+    out &= supply > 0
+    out &= _expand(buys) > 0
+    return out
+
+
+def play_mask(
+    hand: np.ndarray,
+    actions: np.ndarray | int,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Return whether each card can be played from the hand as an action.
+
+    Args:
+        hand: (..., C) the number of copies of each card in the hand.
+        actions: (...) the actions of the player in each game.
+        out: (..., C) buffer to write the mask into.
+    """
+    out = np.greater(hand, 0, out=out)
+    out &= cards.type_vector(cards.TypeFlag.Action)
+    out &= _expand(actions) > 0
+    return out
+
+
+def masks(
+    b: "Board",
+    p: "player.Player | player.VectorPlayer",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the buy and play masks of a player on a board.
+
+    Args:
+        b: The board, with its supply set.
+        p: The player.
+
+    Returns:
+        - (A,) whether each card in `b.kingdom_cards` can be bought.
+        - (C,) whether each card, by id, can be played from the hand.
+    """
+    tables = b.tables
+    supply = np.fromiter(
+        (b.supply.get(c, 0) for c in b.kingdom_cards),
+        dtype=np.int32,
+        count=tables.ids.size,
+    )
+
+    if isinstance(p.hand, np.ndarray):
+        hand = p.hand
+    else:
+        hand = np.zeros(cards.num_cards(), dtype=np.int32)
+        for card, n in p.hand.items():
+            hand[card.id] = n
+
+    return buy_mask(tables, supply, p.money, p.buys), play_mask(hand, p.actions)
@@ -0,0 +1,17 @@
+"""Provides rule-based baseline bots and tournaments between them."""
+
+from .batched import compile_strategies
+from .batched import play_games
+from .play import board_for
+from .play import choose
+from .play import play_game
+from .play import play_turn
+from .strategies import BIG_MONEY
+from .strategies import BIG_MONEY_ULTIMATE
+from .strategies import SMITHY_BM
+from .strategies import STRATEGIES
+from .strategies import WITCH_BM
+from .strategies import Rule
+from .strategies import Strategy
+from .tournament import Result
+from .tournament import tournament
@@ -0,0 +1,176 @@
+"""Bots that play many games of Dominion at once on a `BatchedGame`.
+
+The strategies are compiled into arrays with one row per strategy, so that in
+each step every unfinished game takes a turn of the strategy in the current
+player's seat. This plays the same games as `alpha_dom.bots.play`, up to the
+order in which shuffles consume the random stream.
+"""
+
+import typing
+
+import numpy as np
+
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import seeding
+from alpha_dom.engine import BatchedGame
+from alpha_dom.engine import execute_batch
+
+from .play import MAX_TURNS
+from .play import board_for
+from .strategies import Strategy
+
+
+class Compiled(typing.NamedTuple):
+    """The rules of several strategies as arrays, padded to the longest.
+
+    Attributes:
+        card: (S, R) id of the card of each buy rule, or -1 for padding.
+        max_provinces: (S, R) conditions of the buy rules.
+        max_owned: (S, R) conditions of the buy rules.
+        min_treasure: (S, R) conditions of the buy rules.
+        action: (S, A) id of each action card to play, or -1 for padding.
+    """
+
+    card: np.ndarray
+    max_provinces: np.ndarray
+    max_owned: np.ndarray
+    min_treasure: np.ndarray
+    action: np.ndarray
+
+
+def compile_strategies(strategies: typing.Sequence[Strategy]) -> Compiled:
+    """Return the rules of the strategies as arrays."""
+    s = len(strategies)
+    r = max(len(strategy.buys) for strategy in strategies)
+    a = max((len(strategy.actions) for strategy in strategies), default=0)
+
+    rules = np.zeros((4, s, r), dtype=np.int64)
+    rules[0] = -1
+    actions = np.full((s, max(a, 1)), -1, dtype=np.int64)
+    for i, strategy in enumerate(strategies):
+        for j, rule in enumerate(strategy.buys):
+            rules[:, i, j] = (cards.load(rule.card).id, *rule[1:])
+        for j, card in enumerate(strategy.action_cards()):
+            actions[i, j] = card.id
+
+    return Compiled(
+        card=rules[0],
+        max_provinces=rules[1],
+        max_owned=rules[2],
+        min_treasure=rules[3],
+        action=actions,
+    )
+
+
+def play_games(
+    strategies: typing.Sequence[Strategy],
+    seats: np.ndarray,
+    b: board.Board | None = None,
+    *,
+    max_turns: int = MAX_TURNS,
+    rng: seeding.RngLike = None,
+) -> np.ndarray:
+    """Play a batch of games between strategies, and return their outcomes.
+
+    Args:
+        strategies: The strategies.
+        seats: (N, P) index into `strategies` of the strategy in each seat of
+            each game.
+        b: The board of every game. By default, a board with the cards the
+            strategies use.
+        max_turns: The number of turns after which a game is a draw.
+        rng: The random number generator used for shuffling, or a seed for one.
+
+    Returns:
+        (N, P) the outcome of each game for each seat, as in
+        `BatchedGame.outcomes`, with 0 for games that hit the turn limit.
+    """
+    seats = np.asarray(seats, dtype=np.intp)
+    b = board_for(strategies) if b is None else b
+    game = BatchedGame.from_board(b, len(seats), len(seats[0]), rng=rng)
+    compiled = compile_strategies(strategies)
+
+    while (g := game.active()).size:
+        g = g[game.turn[g] < max_turns]
+        if not g.size:
+            break
+        s = seats[g, game.current[g]]
+        _play_actions(game, compiled, g, s)
+        game.play_treasures(g)
+        _buy(game, compiled, g, s)
+        game.cleanup(g)
+
+    return np.where(game.done[:, None], game.outcomes(), 0)
+
+
+def _play_actions(
+    game: BatchedGame,
+    compiled: Compiled,
+    games: np.ndarray,
+    strategies: np.ndarray,
+) -> None:
+    """Play the action cards of each strategy, for as long as it can."""
+    for action in compiled.action.T:
+        g, card_ids = games, action[strategies]
+        while True:
+            p = game.current[g]
+            keep = (card_ids >= 0) & (game.actions[g] > 0)
+            keep &= game.hand[g, p, np.maximum(card_ids, 0)] > 0
+            if not keep.any():
+                break
+            g, card_ids = g[keep], card_ids[keep]
+            game.play(g, card_ids)
+            execute_batch(game, g, card_ids)
+
+
+def _buy(
+    game: BatchedGame,
+    compiled: Compiled,
+    games: np.ndarray,
+    strategies: np.ndarray,
+) -> None:
+    """Buy the cards that each strategy chooses, while it has buys left."""
+    g, s = games, strategies
+    while g.size:
+        card_ids = np.full(game.num_games, -1)
+        card_ids[g] = _choose(game, compiled, g, s)
+        game.buy(card_ids)
+        keep = (card_ids[g] >= 0) & (game.buys[g] > 0)
+        g, s = g[keep], s[keep]
+
+
+def _choose(
+    game: BatchedGame,
+    compiled: Compiled,
+    games: np.ndarray,
+    strategies: np.ndarray,
+) -> np.ndarray:
+    """Return the card that each strategy buys next, or -1 to stop buying.
+
+    See `alpha_dom.bots.play.choose`.
+    """
+    p = game.current[games]
+    owned = (
+        game.hand[games, p]
+        + game.discard_pile[games, p]
+        + game.in_play[games, p]
+        + game.draw_counts[games, p]
+    )
+    treasure = owned @ cards.coin_vector()
+    provinces = game.supply[games, cards.load(board.PROVINCE).id]
+
+    card_ids = compiled.card[strategies]
+    valid = card_ids >= 0
+    c = np.maximum(card_ids, 0)
+    rows = np.arange(games.size)[:, None]
+    eligible = (
+        valid
+        & (cards.cost_vector()[c] <= game.money[games, None])
+        & (game.supply[games[:, None], c] > 0)
+        & (provinces[:, None] <= compiled.max_provinces[strategies])
+        & (owned[rows, c] < compiled.max_owned[strategies])
+        & (treasure[:, None] >= compiled.min_treasure[strategies])
+    )
+    first = eligible.argmax(axis=1)
+    return np.where(eligible.any(axis=1), card_ids[rows[:, 0], first], -1)
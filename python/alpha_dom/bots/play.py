@@ -0,0 +1,127 @@
+"""Bots that play games of Dominion on `Player` and `Board` models.
+
+This is the reference implementation of the strategies. `alpha_dom.bots.batched`
+plays the same strategies on a `BatchedGame`, many games at a time.
+"""
+
+import collections
+import typing
+
+import numpy as np
+
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import engine
+from alpha_dom import seeding
+from alpha_dom.player import Player
+
+from .strategies import Strategy
+
+MAX_TURNS = 200
+
+
+def board_for(strategies: typing.Iterable[Strategy]) -> board.Board:
+    """Return a board with the kingdom cards that the strategies use."""
+    common = {c.name for c in cards.load_common()}
+    names = set().union(*(s.card_names() for s in strategies)) - common
+    return board.load_custom(sorted(names))
+
+
+def choose(strategy: Strategy, p: Player, b: board.Board) -> cards.Card | None:
+    """Return the card that a strategy buys next, or None to stop buying.
+
+    Args:
+        strategy: The strategy.
+        p: The player, with its money for the turn.
+        b: The board.
+    """
+    owned = collections.Counter(p.deck)
+    treasure = sum(card.coins * n for card, n in owned.items())
+    provinces = b.supply.get(cards.load(board.PROVINCE), 0)
+    for rule in strategy.buys:
+        card = cards.load(rule.card)
+        if (
+            card.cost <= p.money
+            and b.supply.get(card, 0) > 0
+            and provinces <= rule.max_provinces
+            and owned[card] < rule.max_owned
+            and treasure >= rule.min_treasure
+        ):
+            return card
+    return None
+
+
+def play_turn(
+    strategy: Strategy,
+    p: Player,
+    b: board.Board,
+    others: typing.Sequence[Player],
+) -> None:
+    """Play a turn of a strategy with `Player.play`, `Player.buy` and cleanup.
+
+    Args:
+        strategy: The strategy.
+        p: The player whose turn it is.
+        b: The board.
+        others: The other players, who are affected by attacks.
+    """
+    p.start_turn()
+    for card in strategy.action_cards():
+        while p.actions > 0 and p.hand.get(card, 0) > 0:
+            p.play(card)
+            engine.execute(p, card, b, others)
+
+    p.play_treasures()
+    while p.buys > 0 and (choice := choose(strategy, p, b)) is not None:
+        p.buy(choice, b)
+    p.cleanup()
+
+
+def play_game(
+    strategies: typing.Sequence[Strategy],
+    b: board.Board | None = None,
+    *,
+    max_turns: int = MAX_TURNS,
+    rng: seeding.RngLike = None,
+) -> np.ndarray:
+    """Play a game between strategies, and return its outcome.
+
+    Args:
+        strategies: The strategy of each player, in turn order.
+        b: The board. By default, a board with the cards the strategies use.
+        max_turns: The number of turns after which the game is a draw.
+        rng: The random number generator used for shuffling, or a seed for one.
+
+    Returns:
+        The outcome for each player, as in `BatchedGame.outcomes`: 1 for a win,
+        0 for a shared win or a draw, and -1 for a loss.
+    """
+    b = board_for(strategies) if b is None else b
+    b.set_initial_supply(len(strategies))
+    rng = np.random.default_rng(rng)
+    players = [Player(name=i, rng=rng) for i in range(len(strategies))]
+
+    for turn in range(max_turns):
+        i = turn % len(players)
+        others = players[i + 1 :] + players[:i]
+        play_turn(strategies[i], players[i], b, others)
+        if b.game_over():
+            return _outcome(players, last=i)
+    return np.zeros(len(players), dtype=np.int64)
+
+
+def _outcome(players: list[Player], last: int) -> np.ndarray:
+    """Return the outcome of a finished game.
+
+    Among players tied for the most points, those who had fewer turns win.
+
+    Args:
+        players: The players, in turn order.
+        last: The index of the player who took the last turn.
+    """
+    scores = np.array([p.victory_points() for p in players])
+    later = np.arange(len(players)) > last
+    best = scores == scores.max()
+    if (best & later).any():
+        best &= later
+    return np.where(best, 1 if best.sum() == 1 else 0, -1)
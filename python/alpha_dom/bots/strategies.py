@@ -0,0 +1,122 @@
+"""Rule-based strategies for the baseline bots.
+
+A strategy plays the action cards it knows whenever it can, plays all of its
+treasures, and then buys the first card in its list of buy rules that it can
+afford and whose conditions hold, for as long as it has buys left.
+
+These follow the well-known "Big Money" family of strategies: a player buys
+treasure and Provinces, greening (buying Duchies and Estates) as the Provinces
+run out, and the variants add one or two copies of a strong terminal draw card.
+"""
+
+import typing
+
+from alpha_dom import cards
+
+# A bound that no count in a game reaches, for conditions that do not apply.
+UNLIMITED = 1_000
+
+
+class Rule(typing.NamedTuple):
+    """Buy a card when the player can afford it and every condition holds.
+
+    Attributes:
+        card: The name of the card.
+        max_provinces: Only buy while at most this many Provinces are left.
+        max_owned: Only buy while the player owns fewer copies of the card.
+        min_treasure: Only buy once the treasures in the player's deck produce
+            at least this many coins in total.
+    """
+
+    card: str
+    max_provinces: int = UNLIMITED
+    max_owned: int = UNLIMITED
+    min_treasure: int = 0
+
+
+class Strategy(typing.NamedTuple):
+    """A rule-based strategy.
+
+    Attributes:
+        name: The name of the strategy.
+        buys: The buy rules, in order of priority.
+        actions: The action cards to play, in order of priority. Each must have
+            effects that need no choices (see `alpha_dom.cards.effects`).
+    """
+
+    name: str
+    buys: tuple[Rule, ...]
+    actions: tuple[str, ...] = ()
+
+    def card_names(self) -> set[str]:
+        """Return the names of the cards that the strategy buys or plays."""
+        return {rule.card for rule in self.buys} | set(self.actions)
+
+    def action_cards(self) -> list[cards.Card]:
+        """Return the action cards to play.
+
+        Raises:
+            ValueError: If the strategy plays a card without effects, or whose
+                effects need a choice of a card to gain.
+        """
+        program = cards.effects.program()
+        played = [cards.load(name) for name in self.actions]
+        unplayable = [
+            card.name
+            for card in played
+            if not card.effects
+            or any(e.op == cards.effects.Op.Gain for e in program.effects(card.id))
+        ]
+        if unplayable:
+            msg = f"{self.name} cannot play {unplayable} without choices."
+            raise ValueError(msg)
+        return played
+
+
+BIG_MONEY = Strategy(
+    name="Big Money",
+    buys=(Rule("Province"), Rule("Gold"), Rule("Silver")),
+)
+
+BIG_MONEY_ULTIMATE = Strategy(
+    name="Big Money Ultimate",
+    buys=(
+        Rule("Province", min_treasure=18),
+        Rule("Duchy", max_provinces=4),
+        Rule("Estate", max_provinces=2),
+        Rule("Gold"),
+        Rule("Duchy", max_provinces=6),
+        Rule("Silver"),
+    ),
+)
+
+SMITHY_BM = Strategy(
+    name="Smithy-BM",
+    buys=(
+        Rule("Province", min_treasure=16),
+        Rule("Duchy", max_provinces=4),
+        Rule("Estate", max_provinces=2),
+        Rule("Gold"),
+        Rule("Duchy", max_provinces=5),
+        Rule("Smithy", max_owned=1),
+        Rule("Smithy", max_owned=2, min_treasure=14),
+        Rule("Silver"),
+    ),
+    actions=("Smithy",),
+)
+
+WITCH_BM = Strategy(
+    name="Witch-BM",
+    buys=(
+        Rule("Province", min_treasure=16),
+        Rule("Duchy", max_provinces=4),
+        Rule("Estate", max_provinces=2),
+        Rule("Witch", max_owned=2),
+        Rule("Gold"),
+        Rule("Duchy", max_provinces=5),
+        Rule("Silver"),
+    ),
+    actions=("Witch",),
+)
+
+STRATEGIES = {s.name: s for s in (BIG_MONEY, BIG_MONEY_ULTIMATE, SMITHY_BM, WITCH_BM)}
@@ -0,0 +1,145 @@
+"""Tournaments between two strategies, split into batches across processes.
+
+The games of a tournament are played in batches of `batch_size` games. Batch
+`k` is played with `seeding.stream(seed, k)` alone, so the results do not depend
+on the number of workers. The strategies alternate seats from game to game, to
+cancel out the advantage of going first.
+"""
+
+import contextlib
+import functools
+import math
+import multiprocessing
+import time
+import typing
+
+import numpy as np
+
+from alpha_dom import seeding
+
+from .batched import play_games
+from .play import MAX_TURNS
+from .strategies import Strategy
+
+# The z-score of a two-sided 95% confidence interval.
+Z_95 = 1.96
+
+
+class Result(typing.NamedTuple):
+    """The results of a tournament, from the point of view of the first strategy.
+
+    Attributes:
+        wins: The number of games it won outright.
+        ties: The number of games it shared the win of, or that were drawn.
+        losses: The number of games it lost.
+        seconds: The time taken to play the games.
+    """
+
+    wins: int
+    ties: int
+    losses: int
+    seconds: float
+
+    @property
+    def games(self) -> int:
+        """Return the number of games played."""
+        return self.wins + self.ties + self.losses
+
+    @property
+    def win_rate(self) -> float:
+        """Return the fraction of games won, counting ties as half a win."""
+        return (self.wins + self.ties / 2) / self.games if self.games else 0.0
+
+    def confidence_interval(self, z: float = Z_95) -> tuple[float, float]:
+        """Return a confidence interval of the win rate.
+
+        This is the normal approximation, with the variance of the score of a
+        game (1, 1/2 or 0) estimated from the games.
+
+        Args:
+            z: The z-score of the interval, for 95% by default.
+        """
+        if not self.games:
+            return 0.0, 1.0
+        p = self.win_rate
+        variance = (self.wins + self.ties / 4) / self.games - p**2
+        half = z * math.sqrt(max(variance, 0.0) / self.games)
+        return max(p - half, 0.0), min(p + half, 1.0)
+
+    @property
+    def games_per_minute(self) -> float:
+        """Return the number of games played per minute."""
+        return 60 * self.games / self.seconds if self.seconds else 0.0
+
+
+def _play_batch(  # noqa: PLR0913
+    strategies: tuple[Strategy, Strategy],
+    num_games: int,
+    batch_size: int,
+    max_turns: int,
+    seed: int,
+    batch: int,
+) -> np.ndarray:
+    """Return the number of wins, ties and losses of the first strategy in a batch."""
+    size = min(batch_size, num_games - batch * batch_size)
+    first = (batch * batch_size + np.arange(size)) % 2
+    seats = np.stack([first, 1 - first], axis=1)
+    outcomes = play_games(
+        strategies,
+        seats,
+        max_turns=max_turns,
+        rng=seeding.generator(seed, batch),
+    )
+    mine = outcomes[np.arange(size), first]
+    return np.array([(mine == 1).sum(), (mine == 0).sum(), (mine == -1).sum()])
+
+
+def tournament(  # noqa: PLR0913
+    a: Strategy,
+    b: Strategy,
+    num_games: int,
+    num_workers: int = 1,
+    *,
+    batch_size: int = 1024,
+    max_turns: int = MAX_TURNS,
+    seed: int = 0,
+    context: str | None = None,
+) -> Result:
+    """Play a two-player tournament between two strategies.
+
+    Args:
+        a: The first strategy, whose results are reported.
+        b: The second strategy.
+        num_games: The number of games to play.
+        num_workers: The number of worker processes. With one, the games are
+            played in this process.
+        batch_size: The number of games that a worker plays at once.
+        max_turns: The number of turns after which a game is a draw.
+        seed: The master seed.
+        context: The multiprocessing start method, e.g. "fork" or "spawn".
+
+    Returns:
+        The results of the first strategy.
+    """
+    play = functools.partial(
+        _play_batch,
+        (a, b),
+        num_games,
+        batch_size,
+        max_turns,
+        seed,
+    )
+    batches = range(math.ceil(num_games / batch_size))
+
+    start = time.perf_counter()
+    counts: typing.Iterable[np.ndarray]
+    with contextlib.ExitStack() as stack:
+        if num_workers > 1:
+            ctx = multiprocessing.get_context(context)
+            pool = stack.enter_context(ctx.Pool(num_workers))
+            counts = pool.imap_unordered(play, batches)
+        else:
+            counts = map(play, batches)
+        wins, ties, losses = sum(counts, np.zeros(3, dtype=np.int64)).tolist()
+
+    return Result(wins, ties, losses, time.perf_counter() - start)
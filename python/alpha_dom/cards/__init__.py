@@ -1,21 +1,59 @@
 """Provides the models for the cards from the base game."""
 
+from . import effects
+from .compact import CompactCard
+from .compact import coin_vector
+from .compact import compact_card
+from .compact import compact_cards
+from .compact import cost_vector
+from .compact import fingerprint
+from .compact import flag_vector
+from .compact import num_cards
+from .compact import pile_vector
+from .compact import points_per_cards_vector
+from .compact import points_vector
+from .compact import type_matrix
+from .compact import type_vector
 from .model import Card
 from .model import Expansion
+from .model import Pile
+from .model import Registry
 from .model import Type
+from .model import TypeFlag
+from .model import from_id
 from .model import load
 from .model import load_all
 from .model import load_base
 from .model import load_common
 from .model import load_expansion
+from .model import registry
 
 __all__ = [
     "Card",
+    "CompactCard",
     "Expansion",
+    "Pile",
+    "Registry",
     "Type",
+    "TypeFlag",
+    "coin_vector",
+    "compact_card",
+    "compact_cards",
+    "cost_vector",
+    "effects",
+    "fingerprint",
+    "flag_vector",
+    "from_id",
     "load",
     "load_all",
     "load_base",
     "load_common",
     "load_expansion",
+    "num_cards",
+    "pile_vector",
+    "points_per_cards_vector",
+    "points_vector",
+    "registry",
+    "type_matrix",
+    "type_vector",
 ]
@@ -0,0 +1,167 @@
+"""Compiles the json files for all cards into a single catalog file.
+
+Opening one file at start-up is much cheaper than opening one file per card,
+especially on network filesystems. After adding or editing a card, rebuild the
+catalog with:
+
+    python -m alpha_dom.cards.catalog
+
+If the catalog is missing, does not match the cards listed by `Expansion`, or
+was compiled from json files of other sizes, the cards are read from their own
+json files instead. The sizes only take a `stat` per file to check, and catch
+most edits. Edits that keep the size of a file are caught by the hash of the
+catalog, which `python -m alpha_dom.cards.catalog --check` and the tests check
+against the contents of the files, in CI and in a pre-commit hook.
+"""
+
+import argparse
+import hashlib
+import json
+import pathlib
+import sys
+import typing
+
+from .model import Expansion
+
+EXPANSIONS_DIR = pathlib.Path(__file__).parent.joinpath("expansions")
+CATALOG_PATH = pathlib.Path(__file__).parent.joinpath("catalog.json")
+FORMAT_VERSION = 2
+
+RawCards = dict[Expansion, list[dict[str, typing.Any]]]
+
+
+def source_paths() -> list[pathlib.Path]:
+    """Return the paths of the json files for all cards, in catalog order."""
+    return [
+        EXPANSIONS_DIR.joinpath(expansion.value, f"{name}.json")
+        for expansion in Expansion
+        for name in expansion.list_names()
+    ]
+
+
+def source_hash() -> str:
+    """Return a hash of the contents of the json files for all cards."""
+    digest = hashlib.sha256()
+    for path in source_paths():
+        digest.update(path.relative_to(EXPANSIONS_DIR).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def source_sizes() -> list[int]:
+    """Return the sizes of the json files for all cards, in catalog order."""
+    return [path.stat().st_size for path in source_paths()]
+
+
+def read_sources() -> RawCards:
+    """Read the raw data for every card from its own json file."""
+    return {
+        expansion: [
+            json.loads(
+                EXPANSIONS_DIR.joinpath(expansion.value, f"{name}.json").read_text(),
+            )
+            for name in expansion.list_names()
+        ]
+        for expansion in Expansion
+    }
+
+
+def compile_catalog(path: pathlib.Path = CATALOG_PATH) -> str:
+    """Compile the json files for all cards into a single catalog file.
+
+    Args:
+        path: Where to write the catalog.
+
+    Returns:
+        The hash of the sources that the catalog was compiled from.
+    """
+    digest = source_hash()
+    catalog = {
+        "format": FORMAT_VERSION,
+        "hash": digest,
+        "sizes": source_sizes(),
+        "expansions": {e.value: data for e, data in read_sources().items()},
+    }
+    path.write_text(json.dumps(catalog, separators=(",", ":")) + "\n")
+    return digest
+
+
+def read_catalog(
+    path: pathlib.Path = CATALOG_PATH,
+    *,
+    verify: bool = False,
+) -> RawCards | None:
+    """Read the raw data for every card from the compiled catalog.
+
+    By default, this checks that the catalog has the expected format, lists the
+    same cards as `Expansion`, and was compiled from json files of the same
+    sizes, so that no other file is opened.
+
+    Args:
+        path: The path to the catalog.
+        verify: Whether to check the hash of the catalog against the contents
+            of the json files for all cards, instead of their sizes.
+
+    Returns:
+        The raw data for every card, or None if the catalog is missing or stale.
+    """
+    try:
+        catalog = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+    if catalog.get("format") != FORMAT_VERSION:
+        return None
+
+    try:
+        fresh = (
+            catalog.get("hash") == source_hash()
+            if verify
+            else catalog.get("sizes") == source_sizes()
+        )
+    except OSError:
+        return None
+    if not fresh:
+        return None
+
+    raw: RawCards = {}
+    for expansion in Expansion:
+        data = catalog["expansions"].get(expansion.value, [])
+        if [d.get("name") for d in data] != expansion.list_names():
+            return None
+        raw[expansion] = data
+
+    return raw
+
+
+def load_raw(path: pathlib.Path = CATALOG_PATH) -> RawCards:
+    """Read the raw data for every card, preferring the compiled catalog.
+
+    Args:
+        path: The path to the catalog.
+    """
+    raw = read_catalog(path)
+    return read_sources() if raw is None else raw
+
+
+def main() -> None:
+    """Compile the catalog, or check that it is up to date."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with an error if the catalog is missing or stale.",
+    )
+    args = parser.parse_args()
+
+    if args.check:
+        if read_catalog(verify=True) is None:
+            msg = f"{CATALOG_PATH} is stale. Run `python -m alpha_dom.cards.catalog`."
+            sys.exit(msg)
+        return
+
+    compile_catalog()
+
+
+if __name__ == "__main__":
+    main()
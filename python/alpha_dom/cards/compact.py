@@ -0,0 +1,219 @@
+"""Provides a lightweight card type for the engine's hot paths.
+
+`Card` remains the model for validating and serializing cards. Inside the
+engine, cards are better represented by their integer ids, e.g. as indices into
+lists of counts, or by `CompactCard`s when an object is needed as a dict key.
+"""
+
+import functools
+import hashlib
+import typing
+
+import numpy as np
+
+from .model import Card
+from .model import Expansion
+from .model import Type
+from .model import TypeFlag
+from .model import _TypePredicates
+from .model import registry
+
+
+class CompactCard(_TypePredicates):
+    """An immutable, slotted view of a card in the registry.
+
+    There is exactly one compact card for each card in the registry, so compact
+    cards hash and compare by identity. This is much cheaper than hashing and
+    comparing the names of `Card`s.
+
+    Attributes:
+        id: The integer id of the card.
+        name: The name of the card.
+        cost: The cost of the card.
+        types: The types of the card.
+        flags: The types of the card as bit flags.
+        expansion: The expansion of the card.
+        coins: The number of coins a treasure produces when it is played.
+        points: The number of victory points the card is worth.
+        points_per_cards: If positive, the card is also worth 1 victory point
+            per this many cards in its owner's deck (rounded down).
+    """
+
+    __slots__ = (
+        "id",
+        "name",
+        "cost",
+        "types",
+        "flags",
+        "expansion",
+        "coins",
+        "points",
+        "points_per_cards",
+    )
+
+    id: int  # noqa: A003
+    name: str
+    cost: int
+    types: tuple[Type, ...]
+    flags: TypeFlag
+    expansion: Expansion
+    coins: int
+    points: int
+    points_per_cards: int
+
+    def __init__(self, card_id: int, card: Card) -> None:
+        """Initialize the compact card from a card in the registry."""
+        for attr, value in (
+            ("id", card_id),
+            ("name", card.name),
+            ("cost", card.cost),
+            ("types", tuple(card.types)),
+            ("flags", card.flags),
+            ("expansion", card.expansion),
+            ("coins", card.coins),
+            ("points", card.points),
+            ("points_per_cards", card.points_per_cards),
+        ):
+            object.__setattr__(self, attr, value)
+
+    def __setattr__(self, name: str, value: object) -> typing.NoReturn:
+        """Compact cards are immutable."""
+        msg = f"Cannot set {name} on an immutable {type(self).__name__}"
+        raise AttributeError(msg)
+
+    def __delattr__(self, name: str) -> typing.NoReturn:
+        """Compact cards are immutable."""
+        msg = f"Cannot delete {name} from an immutable {type(self).__name__}"
+        raise AttributeError(msg)
+
+    def __reduce__(self) -> tuple[typing.Any, tuple[int]]:
+        """Unpickle compact cards to the interned instance in this process."""
+        return compact_card, (self.id,)
+
+    def __str__(self) -> str:
+        """Return the name of the card."""
+        return self.name
+
+    def __repr__(self) -> str:
+        """Return a string representation of the compact card."""
+        return f"CompactCard(id: {self.id}, name: {self.name})"
+
+    def __lt__(self, other: typing.Self) -> bool:
+        """Allows sorting compact cards by their id."""
+        return self.id < other.id
+
+    def to_card(self) -> Card:
+        """Return the full card from the registry."""
+        return registry().by_id[self.id]
+
+
+@functools.cache
+def compact_cards() -> tuple[CompactCard, ...]:
+    """Return the compact cards for all cards, indexed by their integer ids."""
+    return tuple(CompactCard(i, card) for i, card in enumerate(registry().by_id))
+
+
+def compact_card(card: Card | str | int) -> CompactCard:
+    """Return the compact card for a card, a card name or an integer id.
+
+    Raises:
+        KeyError: If there is no card with the given name.
+        IndexError: If there is no card with the given id.
+    """
+    if isinstance(card, Card):
+        card = card.name
+    if isinstance(card, str):
+        card = registry().ids[card]
+    return compact_cards()[card]
+
+
+def num_cards() -> int:
+    """Return the number of cards in the registry, i.e. one more than the max id."""
+    return len(registry().by_id)
+
+
+@functools.cache
+def fingerprint() -> str:
+    """Return a fingerprint of the ids of all cards, i.e. of their order.
+
+    It changes whenever the id of any card does, e.g. when a card is added, so
+    that logs, shards and buffers of ids from another registry are detected.
+    """
+    names = "\n".join(card.name for card in registry().by_id)
+    return hashlib.sha256(names.encode()).hexdigest()[:16]
+
+
+def _table(values: list[int]) -> np.ndarray:
+    """Return a read-only array of per-card values, indexed by card id."""
+    table = np.array(values, dtype=np.int32)
+    table.flags.writeable = False
+    return table
+
+
+@functools.cache
+def cost_vector() -> np.ndarray:
+    """Return the cost of every card, indexed by card id."""
+    return _table([c.cost for c in compact_cards()])
+
+
+@functools.cache
+def coin_vector() -> np.ndarray:
+    """Return the coins produced by every card when played, indexed by card id."""
+    return _table([c.coins for c in compact_cards()])
+
+
+@functools.cache
+def points_vector() -> np.ndarray:
+    """Return the victory points of every card, indexed by card id."""
+    return _table([c.points for c in compact_cards()])
+
+
+@functools.cache
+def points_per_cards_vector() -> np.ndarray:
+    """Return the deck size per victory point of every card, indexed by card id.
+
+    Cards that are not worth points based on deck size have a value of 0.
+    """
+    return _table([c.points_per_cards for c in compact_cards()])
+
+
+@functools.cache
+def pile_vector(num_players: int) -> np.ndarray:
+    """Return the size of the supply pile of every card, indexed by card id.
+
+    Args:
+        num_players: The number of players in the game.
+    """
+    return _table([c.to_card().pile.size(num_players) for c in compact_cards()])
+
+
+@functools.cache
+def flag_vector() -> np.ndarray:
+    """Return the `TypeFlag`s of every card, indexed by card id."""
+    table = np.array([c.flags for c in compact_cards()], dtype=np.uint8)
+    table.flags.writeable = False
+    return table
+
+
+@functools.cache
+def type_matrix() -> np.ndarray:
+    """Return whether every card has each type.
+
+    Returns:
+        (C, T) whether the card with each id has each type, with the types in
+        the order of `Type`.
+    """
+    bits = np.array([t.flag for t in Type], dtype=np.uint8)
+    table = (flag_vector()[:, None] & bits) > 0
+    table.flags.writeable = False
+    return table
+
+
+@functools.cache
+def type_vector(flags: Type | TypeFlag) -> np.ndarray:
+    """Return whether every card has any of the given types, indexed by card id."""
+    if isinstance(flags, Type):
+        flags = flags.flag
+    table = (flag_vector() & flags) > 0
+    table.flags.writeable = False
+    return table
@@ -0,0 +1,167 @@
+"""Compiles the effects of cards from a small language into opcode arrays.
+
+Each card lists the effects of playing it in its json file, one per line, e.g.
+
+    "effects": ["+1 card", "+2 actions"]
+
+The language has one statement per opcode of `Op`:
+
+    +N card(s)                          Op.Draw
+    +N action(s)                        Op.Actions
+    +N buy(s)                           Op.Buys
+    +N coin(s)                          Op.Coins
+    gain a card costing up to N         Op.Gain
+    each other player gains a <card>    Op.OthersGain
+    each other player draws N card(s)   Op.OthersDraw
+    blocks attacks                      Op.Block
+
+`Op.Block` is a reaction: it does nothing when the card is played, but other
+players with the card in hand are unaffected by the attacks of the current
+player. Treasures keep producing their `coins` when played, without effects.
+
+The effects of every card are compiled once, when first needed, into flat arrays
+of opcodes and arguments (see `Program`). The engine interprets those arrays
+without dispatching on the names of cards.
+"""
+
+import enum
+import functools
+import re
+import typing
+
+import numpy as np
+
+from .model import registry
+
+
+class Op(enum.IntEnum):
+    """The opcodes of the effects of cards."""
+
+    Draw = 0
+    Actions = 1
+    Buys = 2
+    Coins = 3
+    Gain = 4
+    OthersGain = 5
+    OthersDraw = 6
+    Block = 7
+
+
+# The opcodes that add to the resources of the current player. Their order is
+# that of the columns of `Program.plus`.
+PLUS = (Op.Draw, Op.Actions, Op.Buys, Op.Coins)
+
+_PLUS = {"card": Op.Draw, "action": Op.Actions, "buy": Op.Buys, "coin": Op.Coins}
+
+_GRAMMAR = (
+    (re.compile(r"\+(\d+) (card|action|buy|coin)s?"), None),
+    (re.compile(r"gain (?:a )?card costing up to (\d+)(?: coins?)?"), Op.Gain),
+    (re.compile(r"each other player gains (?:an? )?(.+?)(?: card)?"), Op.OthersGain),
+    (re.compile(r"each other player draws (\d+|a) cards?"), Op.OthersDraw),
+    (re.compile(r"blocks attacks"), Op.Block),
+)
+
+
+class Effect(typing.NamedTuple):
+    """A parsed statement of the language.
+
+    Attributes:
+        op: The opcode.
+        arg: The argument, which is a card name for `Op.OthersGain`.
+    """
+
+    op: Op
+    arg: int | str = 0
+
+
+def parse(line: str) -> Effect:
+    """Parse one statement of the language.
+
+    Raises:
+        ValueError: If the statement is not in the language.
+    """
+    text = " ".join(line.strip().rstrip(".").split()).lower()
+    for pattern, op in _GRAMMAR:
+        match = pattern.fullmatch(text)
+        if match is None:
+            continue
+        if op is None:
+            return Effect(_PLUS[match[2]], int(match[1]))
+        if op == Op.OthersGain:
+            # Card names are capitalized in the catalog.
+            return Effect(op, match[1].title())
+        if op == Op.Block:
+            return Effect(op)
+        return Effect(op, 1 if match[1] == "a" else int(match[1]))
+
+    msg = f"{line!r} is not a valid effect."
+    raise ValueError(msg)
+
+
+class Program(typing.NamedTuple):
+    """The compiled effects of every card, indexed by card id.
+
+    The effects of the card with id `c` are `op[offsets[c]:offsets[c + 1]]`,
+    with their arguments in `arg`. A card name in an argument is compiled to the
+    id of the card.
+
+    Attributes:
+        op: (K,) the opcodes of all cards, concatenated.
+        arg: (K,) the argument of each opcode.
+        offsets: (C + 1,) where the effects of each card start.
+        plus: (C, 4) the sum of the arguments of each card's opcodes in `PLUS`.
+        special: (C,) whether each card has opcodes other than those in `PLUS`
+            and `Op.Block`.
+        blocks: (C,) whether each card blocks attacks.
+    """
+
+    op: np.ndarray
+    arg: np.ndarray
+    offsets: np.ndarray
+    plus: np.ndarray
+    special: np.ndarray
+    blocks: np.ndarray
+
+    def effects(self, card_id: int) -> list[Effect]:
+        """Return the compiled effects of a card."""
+        start, stop = self.offsets[card_id], self.offsets[card_id + 1]
+        return [
+            Effect(Op(op), int(arg))
+            for op, arg in zip(self.op[start:stop], self.arg[start:stop], strict=True)
+        ]
+
+
+@functools.cache
+def program() -> Program:
+    """Return the compiled effects of every card in the registry."""
+    reg = registry()
+    ops: list[int] = []
+    args: list[int] = []
+    offsets = [0]
+    for card in reg.by_id:
+        for op, arg in map(parse, card.effects):
+            ops.append(op)
+            args.append(reg.ids[arg] if isinstance(arg, str) else arg)
+        offsets.append(len(ops))
+
+    codes, values = np.array(ops, dtype=np.int32), np.array(args, dtype=np.int32)
+    owners = np.repeat(np.arange(len(reg.by_id)), np.diff(offsets))
+    plus = np.zeros((len(reg.by_id), len(PLUS)), dtype=np.int32)
+    special = np.zeros(len(reg.by_id), dtype=bool)
+    blocks = np.zeros(len(reg.by_id), dtype=bool)
+    for column, code in enumerate(PLUS):
+        np.add.at(plus[:, column], owners[codes == code], values[codes == code])
+    special[owners[~np.isin(codes, [*PLUS, Op.Block])]] = True
+    blocks[owners[codes == Op.Block]] = True
+
+    tables = Program(
+        op=codes,
+        arg=values,
+        offsets=np.array(offsets, dtype=np.int32),
+        plus=plus,
+        special=special,
+        blocks=blocks,
+    )
+    for table in tables:
+        table.flags.writeable = False
+    return tables
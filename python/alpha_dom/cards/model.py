@@ -1,8 +1,10 @@
 """Implements Dominion cards as a pydantic model."""
 
 import enum
+import functools
 import json
 import pathlib
+import types
 import typing
 
 import pydantic
@@ -18,6 +20,78 @@ class Type(str, enum.Enum):
     Reaction = "Reaction"
     Curse = "Curse"
 
+    @property
+    def flag(self) -> "TypeFlag":
+        """Return the bit flag of the type."""
+        return TypeFlag[self.value]
+
+
+class TypeFlag(enum.IntFlag):
+    """The types of a card as bit flags, with the same names as `Type`.
+
+    Testing whether a card has a type is a single bitwise and, instead of a scan
+    of its list of types. This also works on arrays of flags, e.g. those of
+    `flag_vector`.
+    """
+
+    Victory = enum.auto()
+    Treasure = enum.auto()
+    Action = enum.auto()
+    Attack = enum.auto()
+    Reaction = enum.auto()
+    Curse = enum.auto()
+
+    @classmethod
+    def from_types(cls, card_types: typing.Iterable[Type]) -> "TypeFlag":
+        """Return the flags of a list of types."""
+        flags = cls(0)
+        for t in card_types:
+            flags |= t.flag
+        return flags
+
+
+class _TypePredicates:
+    """Predicates on the types of a card with precomputed `flags`."""
+
+    __slots__ = ()
+
+    if typing.TYPE_CHECKING:
+        flags: TypeFlag
+
+    def has_type(self, flags: TypeFlag) -> bool:
+        """Return whether the card has any of the given types."""
+        return bool(self.flags & flags)
+
+    @property
+    def is_victory(self) -> bool:
+        """Return whether the card is a Victory card."""
+        return bool(self.flags & TypeFlag.Victory)
+
+    @property
+    def is_treasure(self) -> bool:
+        """Return whether the card is a Treasure."""
+        return bool(self.flags & TypeFlag.Treasure)
+
+    @property
+    def is_action(self) -> bool:
+        """Return whether the card is an Action."""
+        return bool(self.flags & TypeFlag.Action)
+
+    @property
+    def is_attack(self) -> bool:
+        """Return whether the card is an Attack."""
+        return bool(self.flags & TypeFlag.Attack)
+
+    @property
+    def is_reaction(self) -> bool:
+        """Return whether the card is a Reaction."""
+        return bool(self.flags & TypeFlag.Reaction)
+
+    @property
+    def is_curse(self) -> bool:
+        """Return whether the card is a Curse."""
+        return bool(self.flags & TypeFlag.Curse)
+
 
 class Expansion(str, enum.Enum):
     """The expansions of Dominion."""
@@ -69,7 +143,23 @@ class Expansion(str, enum.Enum):
                 ]
 
 
-class Card(pydantic.BaseModel):
+class Pile(typing.NamedTuple):
+    """The number of copies of a card in the supply, as a function of players.
+
+    Attributes:
+        base: The number of copies, before those per player.
+        per_player: The number of copies added for each player.
+    """
+
+    base: int = 10
+    per_player: int = 0
+
+    def size(self, num_players: int) -> int:
+        """Return the number of copies in a game with the given number of players."""
+        return self.base + self.per_player * num_players
+
+
+class Card(_TypePredicates, pydantic.BaseModel):
     """A pydantic model for a card in Dominion.
 
     Attributes:
@@ -79,14 +169,29 @@ class Card(pydantic.BaseModel):
         description: The description of the card.
         expansion: The expansion of the card.
         associated_cards: Additional cards that are associated with the card.
+        coins: The number of coins a treasure produces when it is played.
+        points: The number of victory points the card is worth.
+        points_per_cards: If positive, the card is also worth 1 victory point
+            per this many cards in its owner's deck (rounded down).
+        effects: The effects of playing the card, in the language of
+            `alpha_dom.cards.effects`.
+        pile: The size of the card's pile in the supply. Kingdom cards have 10
+            copies by default.
     """
 
+    model_config = pydantic.ConfigDict(frozen=True)
+
     name: str
     cost: int
     types: list[Type]
     description: str
     expansion: Expansion
     associated_cards: list["Card"] = []
+    coins: int = 0
+    points: int = 0
+    points_per_cards: int = 0
+    effects: list[str] = []
+    pile: Pile = Pile()
 
     def __str__(self) -> str:
         """Return the name of the card."""
@@ -128,19 +233,111 @@ class Card(pydantic.BaseModel):
     def __init__(self, **kwargs: typing.Any) -> None:  # noqa: ANN401
         """Initialize the card."""
         if "associated_cards" in kwargs:
-            kwargs["associated_cards"] = list(map(load, kwargs["associated_cards"]))
+            kwargs["associated_cards"] = [
+                c if isinstance(c, Card) else load(c)
+                for c in kwargs["associated_cards"]
+            ]
         else:
             kwargs["associated_cards"] = []
         super().__init__(**kwargs)
 
+    @pydantic.field_validator("effects")
+    @classmethod
+    def _parse_effects(cls, effects: list[str]) -> list[str]:
+        """Check that every effect is in the language of effects."""
+        # Imported here because the effects module needs the registry from this one.
+        from . import effects as language
+
+        for line in effects:
+            language.parse(line)
+        return effects
+
+    @property
+    def id(self) -> int:  # noqa: A003
+        """Return the integer id of the card in the registry."""
+        return registry().ids[self.name]
+
+    @functools.cached_property
+    def flags(self) -> TypeFlag:  # type: ignore[override]
+        """Return the types of the card as bit flags."""
+        return TypeFlag.from_types(self.types)
+
     def save(self, dir_path: pathlib.Path) -> None:
         """Save the card to a json file."""
         with dir_path.joinpath(f"{self.name}.json").open("w") as f:
             json.dump(self.model_dump(), f, indent=2)
 
 
+class Registry(typing.NamedTuple):
+    """An immutable index of every card in the game.
+
+    Each card is loaded exactly once and the same `Card` instance is shared by
+    every caller, so cards can be compared by identity as well as by name.
+
+    Attributes:
+        cards: Maps the name of each card to its interned instance.
+        expansions: Maps the name of each card to the expansion it was found in.
+        members: Maps each expansion to its cards, in `list_names` order.
+        ids: Maps the name of each card to its integer id.
+        by_id: The cards, indexed by their integer ids.
+
+    Integer ids are assigned in catalog order, i.e. by `Expansion` and then by
+    `list_names`, so adding, removing or renaming a card can change the ids of
+    other cards. Anything that stores ids records `fingerprint` and checks it
+    when it is read back.
+    """
+
+    cards: types.MappingProxyType[str, Card]
+    expansions: types.MappingProxyType[str, Expansion]
+    members: types.MappingProxyType[Expansion, tuple[Card, ...]]
+    ids: types.MappingProxyType[str, int]
+    by_id: tuple[Card, ...]
+
+
+@functools.cache
+def registry() -> Registry:
+    """Return the process-wide registry of cards.
+
+    The registry is built from the compiled catalog (or the json files for each
+    card, if the catalog is stale) on the first call. Every later call returns
+    the same registry without touching the disk.
+    """
+    # Imported here because the catalog module needs `Expansion` from this one.
+    from . import catalog
+
+    raw = {
+        data["name"]: (expansion, data)
+        for expansion, expansion_data in catalog.load_raw().items()
+        for data in expansion_data
+    }
+    interned: dict[str, Card] = {}
+
+    def intern(name: str) -> Card:
+        # Associated cards are interned first so that they are shared too.
+        if name not in interned:
+            data = dict(raw[name][1])
+            data["associated_cards"] = list(
+                map(intern, data.get("associated_cards", [])),
+            )
+            interned[name] = Card(**data)
+        return interned[name]
+
+    by_name = {name: intern(name) for name in raw}
+    return Registry(
+        cards=types.MappingProxyType(by_name),
+        expansions=types.MappingProxyType(
+            {name: expansion for name, (expansion, _) in raw.items()},
+        ),
+        members=types.MappingProxyType(
+            {e: tuple(by_name[name] for name in e.list_names()) for e in Expansion},
+        ),
+        ids=types.MappingProxyType({name: i for i, name in enumerate(by_name)}),
+        by_id=tuple(by_name.values()),
+    )
+
+
 def load(name: str, expansion: Expansion | None = None) -> Card:
-    """Load a card from a json file.
+    """Load a card from the registry.
 
     Args:
         name: The name of the card.
@@ -152,27 +349,30 @@ def load(name: str, expansion: Expansion | None = None) -> Card:
     Raises:
         FileNotFoundError: If the card does not exist.
     """
-    if expansion is None:
-        for e in Expansion:
-            try:
-                return load(name, e)
-            except FileNotFoundError:
-                pass
+    reg = registry()
+    card = reg.cards.get(name)
 
+    if card is None:
         msg = f"{name} is not a card in any expansion"
         raise FileNotFoundError(msg)
 
-    path = pathlib.Path(__file__).parent.joinpath(
-        "expansions",
-        expansion.value,
-        f"{name}.json",
-    )
-    if path.exists():
-        with path.open() as f:
-            return Card(**json.load(f))
+    if expansion is not None and reg.expansions[name] != expansion:
+        msg = f"{name} is not a card in {expansion}"
+        raise FileNotFoundError(msg)
+
+    return card
 
-    msg = f"{name} is not a card in {expansion}"
-    raise FileNotFoundError(msg)
+
+def from_id(card_id: int) -> Card:
+    """Return the card with the given integer id.
+
+    Args:
+        card_id: The integer id of the card.
+
+    Raises:
+        IndexError: If no card has the given id.
+    """
+    return registry().by_id[card_id]
 
 
 def load_expansion(
@@ -185,12 +385,11 @@ def load_expansion(
         expansion: The expansion to load.
         exclude: Optional list of names of cards to exclude.
     """
+    members = registry().members[expansion]
     if exclude is None:
-        return [load(name, expansion) for name in expansion.list_names()]
+        return list(members)
 
-    return [
-        load(name, expansion) for name in expansion.list_names() if name not in exclude
-    ]
+    return [card for card in members if card.name not in exclude]
 
 
 def load_base() -> list[Card]:
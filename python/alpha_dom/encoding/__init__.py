@@ -0,0 +1,6 @@
+"""Provides encoders from game states to observations for neural networks."""
+
+from .observation import BatchEncoder
+from .observation import encode
+from .observation import layout
+from .observation import observation_size
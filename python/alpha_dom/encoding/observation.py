@@ -0,0 +1,246 @@
+"""Encodes the state of a game as a fixed-size observation vector.
+
+An observation is written in place into a caller-provided buffer, so that
+encoding does not allocate per step. Card counts are laid out by card id, and
+each feature has a fixed slice given by `layout`:
+
+- `hand`, `draw_pile`, `discard_pile`, `in_play`: the observer's own zones.
+- `opponent_{k}_deck`, `opponent_{k}_in_play`: the cards owned and in play for
+  the k-th player after the observer. All gains are public, so the deck of an
+  opponent is known even though its order is not.
+- `opponent_{k}_sizes`: the sizes of that opponent's hand, draw pile and
+  discard pile.
+- `supply`, `trash`: the board.
+- `resources`: the actions, money and buys of the current player, the number
+  of turns taken, and whether the observer is the current player.
+"""
+
+import functools
+import types
+import typing
+
+import numpy as np
+
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import player
+from alpha_dom.engine import BatchedGame
+
+OWN_ZONES = ("hand", "draw_pile", "discard_pile", "in_play")
+OPPONENT_SIZES = ("hand", "draw_pile", "discard_pile")
+RESOURCES = ("actions", "money", "buys", "turn", "is_current")
+
+AnyPlayer = player.Player | player.VectorPlayer
+
+
+@functools.cache
+def layout(num_players: int = 2) -> types.MappingProxyType[str, slice]:
+    """Return the slice of each feature in an observation.
+
+    Args:
+        num_players: The number of players in the game.
+    """
+    c = cards.num_cards()
+    sizes = {zone: c for zone in OWN_ZONES}
+    for k in range(1, num_players):
+        sizes[f"opponent_{k}_deck"] = c
+        sizes[f"opponent_{k}_in_play"] = c
+        sizes[f"opponent_{k}_sizes"] = len(OPPONENT_SIZES)
+    sizes["supply"] = c
+    sizes["trash"] = c
+    sizes["resources"] = len(RESOURCES)
+
+    slices, start = {}, 0
+    for name, size in sizes.items():
+        slices[name] = slice(start, start + size)
+        start += size
+    return types.MappingProxyType(slices)
+
+
+def observation_size(num_players: int = 2) -> int:
+    """Return the number of features in an observation."""
+    return layout(num_players)["resources"].stop
+
+
+def _write(
+    out: np.ndarray,
+    zone: np.ndarray | dict | list,
+    *,
+    add: bool = False,
+) -> None:
+    """Write (or add) the card counts of a zone into a slice of an observation."""
+    if isinstance(zone, np.ndarray):
+        if add:
+            np.add(out, zone, out=out, casting="unsafe")
+        else:
+            np.copyto(out, zone, casting="unsafe")
+        return
+
+    if not add:
+        out[:] = 0
+    if isinstance(zone, dict):
+        for card, n in zone.items():
+            out[card.id] += n
+    else:
+        for card in zone:
+            out[card.id] += 1
+
+
+def _zones(p: AnyPlayer) -> dict[str, np.ndarray | dict | list]:
+    """Return the zones of a player of either kind, by feature name."""
+    if isinstance(p, player.VectorPlayer):
+        draw_pile = np.bincount(p.draw_pile, minlength=p.hand.size)
+        return {
+            "hand": p.hand,
+            "draw_pile": draw_pile,
+            "discard_pile": p.discard_pile,
+            "in_play": p.in_play,
+        }
+    return {
+        "hand": p.hand,
+        "draw_pile": p.draw_counts,
+        "discard_pile": p.discard_pile,
+        "in_play": p.cards_in_play,
+    }
+
+
+def encode(  # noqa: PLR0913
+    b: board.Board,
+    players: typing.Sequence[AnyPlayer],
+    observer: int,
+    out: np.ndarray,
+    *,
+    current: int | None = None,
+    turn: int = 0,
+) -> np.ndarray:
+    """Encode a game from the point of view of one of its players.
+
+    Args:
+        b: The board.
+        players: The players, in turn order.
+        observer: The index of the observing player.
+        out: (F,) buffer to write the observation into.
+        current: The index of the current player. Defaults to the observer.
+        turn: The number of turns taken in the game.
+
+    Returns:
+        `out`, for convenience.
+    """
+    slices = layout(len(players))
+    current = observer if current is None else current
+
+    for name, zone in _zones(players[observer]).items():
+        _write(out[slices[name]], zone)
+
+    for k in range(1, len(players)):
+        zones = _zones(players[(observer + k) % len(players)])
+        deck = out[slices[f"opponent_{k}_deck"]]
+        _write(deck, zones["hand"])
+        for name in ("draw_pile", "discard_pile", "in_play"):
+            _write(deck, zones[name], add=True)
+        _write(out[slices[f"opponent_{k}_in_play"]], zones["in_play"])
+        out[slices[f"opponent_{k}_sizes"]] = [
+            _size(zones[zone]) for zone in OPPONENT_SIZES
+        ]
+
+    _write(out[slices["supply"]], b.supply)
+    _write(out[slices["trash"]], b.trash)
+
+    p = players[current]
+    out[slices["resources"]] = [p.actions, p.money, p.buys, turn, current == observer]
+    return out
+
+
+def _size(zone: np.ndarray | dict | list) -> int:
+    """Return the number of cards in a zone."""
+    if isinstance(zone, dict):
+        return sum(zone.values())
+    if isinstance(zone, np.ndarray):
+        return int(zone.sum())
+    return len(zone)
+
+
+class BatchEncoder:
+    """Encodes every game in a `BatchedGame` into an (N, F) buffer.
+
+    The encoder owns the scratch buffers it needs, so that `encode` does not
+    allocate any arrays or Python objects that scale with the batch.
+    """
+
+    def __init__(self, num_games: int, num_players: int = 2) -> None:
+        """Initialize the encoder for batches of the given shape.
+
+        Args:
+            num_games: The number of games in each batch.
+            num_players: The number of players in each game.
+        """
+        self.num_games = num_games
+        self.num_players = num_players
+        self.slices = layout(num_players)
+        self._is_observer = np.zeros((num_players, num_games, 1), dtype=bool)
+        self._scratch = np.zeros(num_games, dtype=np.int32)
+
+    def buffer(self, dtype: np.dtype | type = np.float32) -> np.ndarray:
+        """Return a zeroed buffer for a batch of observations."""
+        return np.zeros((self.num_games, observation_size(self.num_players)), dtype)
+
+    def encode(
+        self,
+        game: BatchedGame,
+        out: np.ndarray,
+        observers: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Encode every game from the point of view of one of its players.
+
+        Args:
+            game: The batch of games.
+            out: (N, F) buffer to write the observations into.
+            observers: (N,) index of the observing player in each game.
+                Defaults to the current player of each game.
+
+        Returns:
+            `out`, for convenience.
+        """
+        observers = game.current if observers is None else observers
+        num_players, s = self.num_players, self.slices
+        for o in range(num_players):
+            np.equal(observers, o, out=self._is_observer[o, :, 0])
+
+        for p in range(num_players):
+            is_own = self._is_observer[p]
+            for zone, source in (
+                ("hand", game.hand),
+                ("draw_pile", game.draw_counts),
+                ("discard_pile", game.discard_pile),
+                ("in_play", game.in_play),
+            ):
+                np.copyto(out[:, s[zone]], source[:, p], where=is_own)
+
+            for k in range(1, num_players):
+                # Player p is the k-th opponent of observer p - k.
+                where = self._is_observer[(p - k) % num_players]
+                deck = out[:, s[f"opponent_{k}_deck"]]
+                np.add(game.hand[:, p], game.discard_pile[:, p], out=deck, where=where)
+                np.add(deck, game.draw_counts[:, p], out=deck, where=where)
+                np.add(deck, game.in_play[:, p], out=deck, where=where)
+                np.copyto(
+                    out[:, s[f"opponent_{k}_in_play"]],
+                    game.in_play[:, p],
+                    where=where,
+                )
+
+                sizes = s[f"opponent_{k}_sizes"].start
+                np.sum(game.hand[:, p], axis=1, out=self._scratch)
+                np.copyto(out[:, sizes], self._scratch, where=where[:, 0])
+                np.copyto(out[:, sizes + 1], game.draw_size[:, p], where=where[:, 0])
+                np.sum(game.discard_pile[:, p], axis=1, out=self._scratch)
+                np.copyto(out[:, sizes + 2], self._scratch, where=where[:, 0])
+
+        np.copyto(out[:, s["supply"]], game.supply)
+        np.copyto(out[:, s["trash"]], game.trash)
+
+        resources = s["resources"].start
+        for i, source in enumerate((game.actions, game.money, game.buys, game.turn)):
+            np.copyto(out[:, resources + i], source)
+        np.equal(observers, game.current, out=out[:, resources + 4], casting="unsafe")
+        return out
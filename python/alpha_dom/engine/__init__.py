@@ -0,0 +1,10 @@
+"""Provides engines that step many games of Dominion at once."""
+
+from .batched import STATE
+from .batched import BatchedGame
+from .batched import Snapshot
+from .batched import supply_vector
+from .effects import Choose
+from .effects import ChooseBatch
+from .effects import execute
+from .effects import execute_batch
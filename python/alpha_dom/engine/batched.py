@@ -0,0 +1,512 @@
+"""A vectorized engine that steps many independent games at once.
+
+`BatchedGame` holds the state of N games as structure-of-arrays, with one row
+per game and card counts indexed by card id. Each operation applies the same
+rule as the corresponding method of `Player` to every unfinished game in a
+single vectorized call.
+
+Only the current player of each game takes a turn, so `actions`, `money` and
+`buys` are stored once per game.
+"""
+
+import typing
+
+import numpy as np
+
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import player
+from alpha_dom import seeding
+
+PROVINCE = board.PROVINCE
+EMPTY_PILES_TO_END = board.EMPTY_PILES_TO_END
+
+# The arrays that hold the state of the games, as opposed to the boards.
+STATE = (
+    "supply",
+    "trash",
+    "hand",
+    "discard_pile",
+    "in_play",
+    "draw_pile",
+    "draw_size",
+    "draw_counts",
+    "current",
+    "turn",
+    "actions",
+    "money",
+    "buys",
+    "done",
+)
+
+Snapshot = dict[str, np.ndarray]
+
+
+class BatchedGame:
+    """N independent games of Dominion, stepped together.
+
+    Attributes:
+        boards: The board for each game.
+        num_players: The number of players in each game.
+        num_cards: The number of cards in the registry.
+        capacity: The maximum number of cards in a draw pile.
+        supply: (N, C) count of each card in the supply.
+        in_supply: (N, C) whether each card has a pile in the supply.
+        trash: (N, C) count of each card in the trash.
+        hand: (N, P, C) count of each card in each player's hand.
+        discard_pile: (N, P, C) count of each card in each discard pile.
+        in_play: (N, P, C) count of each card in each play area.
+        draw_pile: (N, P, D) ids of the cards in each draw pile, with the top
+            card at index `draw_size - 1`.
+        draw_size: (N, P) number of cards in each draw pile.
+        draw_counts: (N, P, C) count of each card in each draw pile.
+        current: (N,) index of the player whose turn it is.
+        turn: (N,) number of turns taken in each game.
+        actions: (N,) actions left for the current player.
+        money: (N,) money left for the current player.
+        buys: (N,) buys left for the current player.
+        done: (N,) whether each game has ended.
+        rng: The random number generator used for shuffling.
+    """
+
+    def __init__(
+        self,
+        boards: typing.Sequence[board.Board],
+        num_players: int = 2,
+        *,
+        rng: seeding.RngLike = None,
+    ) -> None:
+        """Initialize a batch of games, one for each board.
+
+        Args:
+            boards: The board for each game. The same board may be repeated.
+                Only their kingdoms are read, and the games start with their
+                initial supply.
+            num_players: The number of players in each game.
+            rng: The random number generator used for shuffling, or a seed for
+                one. Shuffles are batched, so the games of a batch share one
+                stream. Use `seeding.generator` to derive one per batch.
+        """
+        self.boards = list(boards)
+        self.num_players = num_players
+        self.rng = np.random.default_rng(rng)
+
+        n, p, c = len(self.boards), num_players, cards.num_cards()
+        self._initial_supply = np.zeros((n, c), dtype=np.int32)
+        templates: dict[int, np.ndarray] = {}
+        for g, b in enumerate(self.boards):
+            if id(b) not in templates:
+                templates[id(b)] = b.supply_template(num_players).counts
+            self._initial_supply[g] = templates[id(b)]
+
+        self.num_cards = c
+        # No player can own more cards than the supply and a starting deck.
+        self.capacity = int(self._initial_supply.sum(axis=1).max()) + sum(
+            player.vector.STARTING_DECK.values(),
+        )
+
+        self.supply = np.zeros((n, c), dtype=np.int32)
+        self.in_supply = self._initial_supply > 0
+        self.trash = np.zeros((n, c), dtype=np.int32)
+        self.hand = np.zeros((n, p, c), dtype=np.int32)
+        self.discard_pile = np.zeros((n, p, c), dtype=np.int32)
+        self.in_play = np.zeros((n, p, c), dtype=np.int32)
+        self.draw_pile = np.zeros((n, p, self.capacity), dtype=np.int32)
+        self.draw_size = np.zeros((n, p), dtype=np.int32)
+        self.draw_counts = np.zeros((n, p, c), dtype=np.int32)
+        self.current = np.zeros(n, dtype=np.int32)
+        self.turn = np.zeros(n, dtype=np.int32)
+        self.actions = np.zeros(n, dtype=np.int32)
+        self.money = np.zeros(n, dtype=np.int32)
+        self.buys = np.zeros(n, dtype=np.int32)
+        self.done = np.zeros(n, dtype=bool)
+
+        self._province = cards.load(PROVINCE).id
+        self.reset()
+
+    @classmethod
+    def from_board(
+        cls,
+        b: board.Board,
+        num_games: int,
+        num_players: int = 2,
+        *,
+        rng: seeding.RngLike = None,
+    ) -> "BatchedGame":
+        """Return a batch of games that are all played on the same board."""
+        return cls([b] * num_games, num_players, rng=rng)
+
+    @property
+    def num_games(self) -> int:
+        """Return the number of games in the batch."""
+        return len(self.boards)
+
+    def reset(self, games: np.ndarray | None = None) -> None:
+        """Start new games with the initial supply and shuffled starting decks.
+
+        Args:
+            games: Indices or boolean mask of the games to reset. All games are
+                reset by default.
+        """
+        g = np.arange(self.num_games) if games is None else _indices(games)
+
+        self.supply[g] = self._initial_supply[g]
+        self.trash[g] = 0
+        self.hand[g] = 0
+        self.discard_pile[g] = 0
+        self.in_play[g] = 0
+        self.draw_size[g] = 0
+        self.draw_counts[g] = 0
+        self.current[g] = 0
+        self.turn[g] = 0
+        self.done[g] = False
+
+        for name, count in player.vector.STARTING_DECK.items():
+            self.discard_pile[g, :, cards.load(name).id] = count
+
+        for p in range(self.num_players):
+            pl = np.full(g.size, p, dtype=np.int32)
+            self._reshuffle(g, pl)
+            self._draw(g, pl, player.vector.HAND_SIZE)
+
+        self._start_turn(g)
+
+    def active(self, games: np.ndarray | None = None) -> np.ndarray:
+        """Return the indices of the games that have not ended.
+
+        Args:
+            games: Indices or boolean mask of the games to consider. All games
+                are considered by default.
+        """
+        if games is None:
+            return np.flatnonzero(~self.done)
+        g = _indices(games)
+        return g[~self.done[g]]
+
+    def play_treasures(self, games: np.ndarray | None = None) -> None:
+        """Play all treasures in the current player's hand, in every game.
+
+        See `Player.play_treasures`.
+
+        Args:
+            games: Indices or boolean mask of the games in which to play
+                treasures. All unfinished games by default.
+        """
+        g = self.active(games)
+        p = self.current[g]
+        treasures = self.hand[g, p] * cards.type_vector(cards.Type.Treasure)
+        self.money[g] += treasures @ cards.coin_vector()
+        self.in_play[g, p] += treasures
+        self.hand[g, p] -= treasures
+
+    def buy(self, card_ids: np.ndarray) -> None:
+        """Buy a card for the current player, in every game.
+
+        As for `Player.buy`, this does not check whether the cards can be bought.
+
+        Args:
+            card_ids: (N,) the id of the card to buy in each game, or -1 to not
+                buy a card in that game.
+        """
+        card_ids = np.asarray(card_ids)
+        g = np.flatnonzero(~self.done & (card_ids >= 0))
+        c = card_ids[g]
+        self.money[g] -= cards.cost_vector()[c]
+        self.buys[g] -= 1
+        self.gain(g, c)
+
+    def gain(
+        self,
+        games: np.ndarray,
+        card_ids: np.ndarray,
+        players: np.ndarray | None = None,
+    ) -> None:
+        """Gain cards to the discard piles of players, in the given games.
+
+        See `Player.gain`.
+
+        Args:
+            games: (M,) indices of distinct games.
+            card_ids: (M,) the id of the card to gain in each game.
+            players: (M,) the player who gains the card in each game. The
+                current player by default.
+        """
+        p = self.current[games] if players is None else players
+        self.discard_pile[games, p, card_ids] += 1
+        self.supply[games, card_ids] -= 1
+
+    def play(self, games: np.ndarray, card_ids: np.ndarray) -> None:
+        """Play an action card from the current player's hand, in the given games.
+
+        See `Player.play`. This does not apply the effects of the cards.
+
+        Args:
+            games: (M,) indices of distinct games.
+            card_ids: (M,) the id of the card to play in each game.
+        """
+        p = self.current[games]
+        self.hand[games, p, card_ids] -= 1
+        self.in_play[games, p, card_ids] += 1
+        self.actions[games] -= 1
+
+    def draw(
+        self,
+        games: np.ndarray,
+        n: int,
+        players: np.ndarray | None = None,
+    ) -> None:
+        """Draw up to `n` cards into the hands of players, in the given games.
+
+        See `Player.draw_to_hand`.
+
+        Args:
+            games: (M,) indices of distinct games.
+            n: The number of cards to draw.
+            players: (M,) the player who draws in each game. The current player
+                by default.
+        """
+        self._draw(games, self.current[games] if players is None else players, n)
+
+    def cleanup(self, games: np.ndarray | None = None) -> None:
+        """Clean up the current player's turn and start the next, in every game.
+
+        Games that end with this turn are marked as `done` and are not advanced.
+
+        Args:
+            games: Indices or boolean mask of the games to clean up. All
+                unfinished games by default.
+        """
+        g = self.active(games)
+        p = self.current[g]
+
+        self.discard_pile[g, p] += self.hand[g, p] + self.in_play[g, p]
+        self.hand[g, p] = 0
+        self.in_play[g, p] = 0
+        self._draw(g, p, player.vector.HAND_SIZE)
+
+        self.turn[g] += 1
+        self.done[g] = self.game_over()[g]
+
+        g = g[~self.done[g]]
+        self.current[g] = (self.current[g] + 1) % self.num_players
+        self._start_turn(g)
+
+    def game_over(self) -> np.ndarray:
+        """Return whether each game meets a condition for ending the game.
+
+        A game ends when the Province pile, or any three supply piles, are empty.
+        """
+        empty = ((self.supply == 0) & self.in_supply).sum(axis=1)
+        return (self.supply[:, self._province] == 0) | (empty >= EMPTY_PILES_TO_END)
+
+    def scores(self) -> np.ndarray:
+        """Return the (N, P) victory points of each player."""
+        return player.vector.score(self.deck())
+
+    def outcomes(self) -> np.ndarray:
+        """Return the (N, P) outcome of each game for each player.
+
+        The outcome is 1 for a win, 0 for a shared win and -1 for a loss. Among
+        players tied for the most points, those who had fewer turns win.
+        """
+        scores = self.scores()
+        # Players after the current one had one fewer turn in the game.
+        later = np.arange(self.num_players) > self.current[:, None]
+        best = scores == scores.max(axis=1, keepdims=True)
+        best &= ~(best & later).any(axis=1, keepdims=True) | later
+        winners = best.sum(axis=1, keepdims=True)
+        return np.where(best, np.where(winners == 1, 1, 0), -1)
+
+    def deck(self) -> np.ndarray:
+        """Return the (N, P, C) count of each card that each player owns."""
+        return self.hand + self.discard_pile + self.in_play + self.draw_counts
+
+    def snapshot(self, game: int) -> Snapshot:
+        """Return a copy of the state of one of the games.
+
+        Args:
+            game: The index of the game.
+        """
+        return {name: getattr(self, name)[game].copy() for name in STATE}
+
+    def restore(self, snapshot: Snapshot, games: np.ndarray | None = None) -> None:
+        """Set the state of games from a snapshot, e.g. to restart a search.
+
+        The snapshot must be of a game on the same board as each of the games.
+
+        Args:
+            snapshot: A snapshot from `snapshot`, possibly of another batch.
+            games: Indices or boolean mask of the games to restore. All games
+                are restored by default.
+        """
+        g = slice(None) if games is None else _indices(games)
+        for name in STATE:
+            getattr(self, name)[g] = snapshot[name]
+
+    def to_board(self, game: int) -> board.Board:
+        """Return a copy of the board of one of the games, in its current state.
+
+        Args:
+            game: The index of the game.
+        """
+        b = self.boards[game].model_copy(
+            update={
+                "supply": _to_dict(self.supply[game], self.in_supply[game]),
+                "trash": _to_dict(self.trash[game], self.trash[game] > 0),
+            },
+        )
+        b.rehash()
+        return b
+
+    def to_player(self, game: int, index: int) -> player.Player:
+        """Return a `Player` in the same state as a player in one of the games.
+
+        Args:
+            game: The index of the game.
+            index: The index of the player in the game.
+        """
+        p = player.VectorPlayer(index, deal=False)
+        p.hand[:] = self.hand[game, index]
+        p.discard_pile[:] = self.discard_pile[game, index]
+        p.in_play[:] = self.in_play[game, index]
+        p.draw_pile = self.draw_pile[game, index, : self.draw_size[game, index]]
+        if index == self.current[game]:
+            p.actions = int(self.actions[game])
+            p.money = int(self.money[game])
+            p.buys = int(self.buys[game])
+        return p.to_player()
+
+    def load(  # noqa: PLR0913
+        self,
+        game: int,
+        b: board.Board,
+        players: typing.Sequence[player.Player],
+        *,
+        current: int = 0,
+        turn: int = 0,
+    ) -> None:
+        """Set the state of one of the games from a board and `Player`s.
+
+        This is the inverse of `to_board` and `to_player`. The order of the cards
+        in the `shuffled` part of lazy players is fixed with the generator of
+        the batch, so the generators of the players are left untouched.
+
+        Args:
+            game: The index of the game.
+            b: A board with the same piles as the board of the game.
+            players: The players, in turn order.
+            current: The index of the current player.
+            turn: The number of turns taken in the game.
+
+        Raises:
+            ValueError: If there are not `num_players` players.
+        """
+        if len(players) != self.num_players:
+            msg = f"Expected {self.num_players} players, got {len(players)}."
+            raise ValueError(msg)
+
+        self.supply[game] = supply_vector(b)
+        self.trash[game] = 0
+        for card, n in b.trash.items():
+            self.trash[game, card.id] = n
+        for i, p in enumerate(players):
+            v = player.VectorPlayer.from_player(p, rng=self.rng)
+            size = v.draw_pile.size
+            self.hand[game, i] = v.hand
+            self.discard_pile[game, i] = v.discard_pile
+            self.in_play[game, i] = v.in_play
+            self.draw_pile[game, i, :size] = v.draw_pile
+            self.draw_size[game, i] = size
+            self.draw_counts[game, i] = np.bincount(
+                v.draw_pile,
+                minlength=self.num_cards,
+            )
+
+        self.current[game] = current
+        self.turn[game] = turn
+        self.actions[game] = players[current].actions
+        self.money[game] = players[current].money
+        self.buys[game] = players[current].buys
+        self.done[game] = b.game_over()
+
+    def _start_turn(self, games: np.ndarray) -> None:
+        """Reset the resources of the current player in the given games."""
+        self.actions[games] = 1
+        self.money[games] = 0
+        self.buys[games] = 1
+
+    def _draw(self, games: np.ndarray, players: np.ndarray, n: int) -> None:
+        """Draw up to `n` cards into the hands of the given players.
+
+        As for `Player.cleanup`, the discard pile is shuffled to form a new draw
+        pile when the draw pile runs out.
+
+        Args:
+            games: (M,) indices of distinct games.
+            players: (M,) index of the player in each game.
+            n: The number of cards to draw.
+        """
+        drawn = self._take(games, players, np.full(games.size, n))
+        short = (drawn < n) & self.discard_pile[games, players].any(axis=1)
+        if short.any():
+            games, players = games[short], players[short]
+            self._reshuffle(games, players)
+            self._take(games, players, n - drawn[short])
+
+    def _take(
+        self,
+        games: np.ndarray,
+        players: np.ndarray,
+        n: np.ndarray,
+    ) -> np.ndarray:
+        """Move up to `n` cards from the top of each draw pile into the hand.
+
+        Returns:
+            (M,) the number of cards that were moved for each player.
+        """
+        n = np.minimum(n, self.draw_size[games, players])
+        for j in range(int(n.max(initial=0))):
+            sel = n > j
+            g, p = games[sel], players[sel]
+            self.draw_size[g, p] -= 1
+            top = self.draw_pile[g, p, self.draw_size[g, p]]
+            self.draw_counts[g, p, top] -= 1
+            self.hand[g, p, top] += 1
+        return n
+
+    def _reshuffle(self, games: np.ndarray, players: np.ndarray) -> None:
+        """Shuffle each discard pile to form a new draw pile.
+
+        This assumes that the draw piles are empty.
+        """
+        counts = self.discard_pile[games, players]
+        sizes = counts.sum(axis=1)
+        ids = np.repeat(np.tile(np.arange(self.num_cards), games.size), counts.ravel())
+        rows = np.repeat(np.arange(games.size), sizes)
+        cols = np.arange(ids.size) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+
+        # Sorting by random keys within each row shuffles each pile independently.
+        order = np.lexsort((self.rng.random(ids.size), rows))
+        self.draw_pile[games[rows], players[rows], cols] = ids[order]
+        self.draw_size[games, players] = sizes
+        self.draw_counts[games, players] = counts
+        self.discard_pile[games, players] = 0
+
+
+def supply_vector(b: board.Board) -> np.ndarray:
+    """Return the supply of a board as counts indexed by card id."""
+    supply = np.zeros(cards.num_cards(), dtype=np.int32)
+    for card, count in b.supply.items():
+        supply[card.id] = count
+    return supply
+
+
+def _to_dict(counts: np.ndarray, keep: np.ndarray) -> dict[cards.Card, int]:
+    """Return the counts of the kept cards as a dict keyed by card."""
+    return {cards.from_id(int(i)): int(counts[i]) for i in np.flatnonzero(keep)}
+
+
+def _indices(games: np.ndarray) -> np.ndarray:
+    """Return indices of games from either indices or a boolean mask."""
+    games = np.asarray(games)
+    return np.flatnonzero(games) if games.dtype == bool else games
@@ -0,0 +1,188 @@
+"""Interpreters for the compiled effects of cards.
+
+`execute` applies the effects of a card played by a `Player`, and
+`execute_batch` applies the effects of the cards played in many games of a
+`BatchedGame` at once. Both read the opcode arrays of
+`alpha_dom.cards.effects.program`.
+
+The opcodes in `effects.PLUS` are applied first, as one row of `Program.plus`,
+so cards with only those effects (e.g. Smithy, Village, Market, Festival and
+Laboratory) are executed without looking at their opcodes. The other opcodes
+follow in the order of the card's effects. The batched interpreter steps
+through them by position, with one vectorized call per opcode and position.
+
+Attacks skip the other players who hold a card that blocks attacks, as if they
+always revealed it.
+"""
+
+import typing
+
+import numpy as np
+
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom.cards import effects
+from alpha_dom.player import Player
+
+from .batched import BatchedGame
+
+# Chooses a card for `Player` to gain costing up to the given amount, or None.
+Choose = typing.Callable[[Player, int], cards.Card | None]
+
+# Chooses the id of a card to gain in each of the given games of a batch,
+# costing up to the given amounts, or -1 to gain nothing.
+ChooseBatch = typing.Callable[[BatchedGame, np.ndarray, np.ndarray], np.ndarray]
+
+
+def execute(
+    p: Player,
+    card: cards.Card,
+    b: board.Board,
+    others: typing.Sequence[Player] = (),
+    *,
+    choose: Choose | None = None,
+) -> None:
+    """Apply the effects of a card that a player has played.
+
+    Args:
+        p: The player who played the card, e.g. with `Player.play`.
+        card: The card.
+        b: The board.
+        others: The other players, in turn order.
+        choose: Chooses the cards that the player gains.
+
+    Raises:
+        ValueError: If the card gains a card and there is no `choose`.
+    """
+    program = effects.program()
+    i = card.id
+    draw, actions, buys, coins = program.plus[i].tolist()
+    p.actions += actions
+    p.buys += buys
+    p.money += coins
+    p.draw_to_hand(draw)
+    if not program.special[i]:
+        return
+
+    _execute_special(p, card, b, others, choose)
+
+
+def _execute_special(
+    p: Player,
+    card: cards.Card,
+    b: board.Board,
+    others: typing.Sequence[Player],
+    choose: Choose | None,
+) -> None:
+    """Apply the opcodes of a card that are not in `effects.PLUS`."""
+    program = effects.program()
+    targets = others
+    if card.is_attack:
+        targets = [o for o in others if not _blocks(o, program)]
+
+    for effect in program.effects(card.id):
+        if effect.op == effects.Op.Gain:
+            if choose is None:
+                msg = f"{card.name} gains a card, which needs a choice."
+                raise ValueError(msg)
+            _gain(p, choose(p, int(effect.arg)), b)
+        elif effect.op == effects.Op.OthersGain:
+            for other in targets:
+                _gain(other, cards.from_id(int(effect.arg)), b)
+        elif effect.op == effects.Op.OthersDraw:
+            for other in targets:
+                other.draw_to_hand(int(effect.arg))
+
+
+def execute_batch(
+    game: BatchedGame,
+    games: np.ndarray,
+    card_ids: np.ndarray,
+    *,
+    choose: ChooseBatch | None = None,
+) -> None:
+    """Apply the effects of the cards that the current players have played.
+
+    See `execute`.
+
+    Args:
+        game: The batch of games.
+        games: (M,) indices of distinct games.
+        card_ids: (M,) the id of the card played in each game, e.g. with
+            `BatchedGame.play`.
+        choose: Chooses the cards that the current players gain.
+
+    Raises:
+        ValueError: If a card gains a card and there is no `choose`.
+    """
+    program = effects.program()
+    draw, actions, buys, coins = program.plus[card_ids].T
+    game.actions[games] += actions
+    game.buys[games] += buys
+    game.money[games] += coins
+    for n in np.unique(draw[draw > 0]):
+        game.draw(games[draw == n], int(n))
+
+    special = program.special[card_ids]
+    g, c = games[special], card_ids[special]
+    start = program.offsets[c]
+    length = program.offsets[c + 1] - start
+    attack = cards.type_vector(cards.Type.Attack)[c]
+    for k in range(int(length.max(initial=0))):
+        sel = length > k
+        op, arg = program.op[start[sel] + k], program.arg[start[sel] + k]
+        for code in np.unique(op):
+            m = op == code
+            _execute_op(
+                game,
+                program,
+                effects.Op(code),
+                g[sel][m],
+                arg[m],
+                attack[sel][m],
+                choose,
+            )
+
+
+def _execute_op(  # noqa: PLR0913
+    game: BatchedGame,
+    program: effects.Program,
+    op: effects.Op,
+    games: np.ndarray,
+    args: np.ndarray,
+    attack: np.ndarray,
+    choose: ChooseBatch | None,
+) -> None:
+    """Apply one special opcode in each of the given games."""
+    if op == effects.Op.Gain:
+        if choose is None:
+            msg = "A card gains a card, which needs a choice."
+            raise ValueError(msg)
+        gained = choose(game, games, args)
+        ok = gained >= 0
+        ok[ok] &= game.supply[games[ok], gained[ok]] > 0
+        game.gain(games[ok], gained[ok])
+        return
+
+    for k in range(1, game.num_players):
+        players = (game.current[games] + k) % game.num_players
+        hand = game.hand[games, players][:, program.blocks]
+        hit = ~(attack & (hand > 0).any(axis=1))
+        if op == effects.Op.OthersGain:
+            hit &= game.supply[games, args] > 0
+            game.gain(games[hit], args[hit], players[hit])
+        elif op == effects.Op.OthersDraw:
+            for n in np.unique(args[hit]):
+                drawing = hit & (args == n)
+                game.draw(games[drawing], int(n), players[drawing])
+
+
+def _gain(p: Player, card: cards.Card | None, b: board.Board) -> None:
+    """Gain a card to a player's discard pile, if it is in the supply."""
+    if card is not None and b.supply.get(card, 0) > 0:
+        p.gain(card, "DiscardPile", b)
+
+
+def _blocks(p: Player, program: effects.Program) -> bool:
+    """Return whether a player holds a card that blocks attacks."""
+    return any(n > 0 and program.blocks[card.id] for card, n in p.hand.items())
@@ -0,0 +1,8 @@
+"""Provides reinforcement learning environments for Dominion."""
+
+from .environment import BatchedEnv
+from .environment import Buffers
+from .environment import DominionEnv
+from .environment import action_table
+from .environment import num_actions
+from .vector import VectorEnv
@@ -0,0 +1,291 @@
+"""Gymnasium-style environments for the buy phase of Dominion.
+
+At each step, the current player of a game chooses which card to buy, or to
+pass. The action space is derived from the kingdom cards of the board: action
+`i` buys `board.kingdom_cards[i]` and the last action passes. Treasures are
+played automatically at the start of each turn, and a turn ends when its player
+passes or runs out of buys.
+
+Observations are encoded with `alpha_dom.encoding` from the point of view of
+the player who is about to act.
+"""
+
+import typing
+
+import numpy as np
+
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import encoding
+from alpha_dom import seeding
+from alpha_dom.engine import BatchedGame
+
+MAX_TURNS = 200
+
+
+class Buffers(typing.NamedTuple):
+    """The arrays that an environment writes its results into.
+
+    Attributes:
+        observation: (N, F) observation for the player about to act.
+        action_mask: (N, A) whether each action is legal for that player.
+        reward: (N,) reward for the player who acted in the last step.
+        terminated: (N,) whether the last step ended the game.
+        truncated: (N,) whether the last step hit the turn limit.
+        outcome: (N, P) outcome of each finished game for each player, as in
+            `BatchedGame.outcomes`. Zero for games that did not finish.
+    """
+
+    observation: np.ndarray
+    action_mask: np.ndarray
+    reward: np.ndarray
+    terminated: np.ndarray
+    truncated: np.ndarray
+    outcome: np.ndarray
+
+    @staticmethod
+    def specs(
+        num_envs: int,
+        num_actions: int,
+        num_players: int,
+    ) -> dict[str, tuple[tuple[int, ...], type]]:
+        """Return the shape and dtype of each buffer."""
+        return {
+            "observation": (
+                (num_envs, encoding.observation_size(num_players)),
+                np.float32,
+            ),
+            "action_mask": ((num_envs, num_actions), np.bool_),
+            "reward": ((num_envs,), np.float32),
+            "terminated": ((num_envs,), np.bool_),
+            "truncated": ((num_envs,), np.bool_),
+            "outcome": ((num_envs, num_players), np.int8),
+        }
+
+    @classmethod
+    def allocate(
+        cls,
+        num_envs: int,
+        num_actions: int,
+        num_players: int,
+    ) -> "Buffers":
+        """Return zeroed buffers for the given number of environments."""
+        return cls(
+            **{
+                name: np.zeros(shape, dtype)
+                for name, (shape, dtype) in cls.specs(
+                    num_envs,
+                    num_actions,
+                    num_players,
+                ).items()
+            },
+        )
+
+
+def num_actions(boards: typing.Sequence[board.Board]) -> int:
+    """Return the size of the action space shared by the given boards."""
+    return max(len(b.kingdom_cards) for b in boards) + 1
+
+
+def action_table(boards: typing.Sequence[board.Board]) -> np.ndarray:
+    """Return the (N, A) id of the card bought by each action on each board.
+
+    Passing, and actions beyond the kingdom cards of a board, have an id of -1.
+    """
+    return board.Tables.stack(boards, num_actions(boards)).ids
+
+
+class BatchedEnv:
+    """N environments stepped together, each with its own game.
+
+    Finished games are reset automatically: the results of the finished game
+    are reported by `step`, and the observation is of the new game.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        boards: typing.Sequence[board.Board],
+        num_players: int = 2,
+        *,
+        max_turns: int = MAX_TURNS,
+        rng: seeding.RngLike = None,
+        buffers: Buffers | None = None,
+        width: int | None = None,
+    ) -> None:
+        """Initialize the environments, one for each board.
+
+        Args:
+            boards: The board for each environment.
+            num_players: The number of players in each game.
+            max_turns: The number of turns after which a game is truncated.
+            rng: The random number generator used for shuffling, or a seed for
+                one.
+            buffers: Where to write results. Allocated if not given.
+            width: The size of the action space, e.g. to share buffers with
+                environments on other boards. By default, `num_actions(boards)`.
+
+        Raises:
+            ValueError: If the action space is too small for the boards.
+        """
+        self.game = BatchedGame(boards, num_players, rng=rng)
+        self.max_turns = max_turns
+        self.num_actions = num_actions(boards) if width is None else width
+        if self.num_actions < num_actions(boards):
+            msg = f"The boards need {num_actions(boards)} actions, not {width}."
+            raise ValueError(msg)
+        # The last column of the tables is padding, for passing.
+        self.tables = board.Tables.stack(boards, self.num_actions)
+        self.action_cards = self.tables.ids
+        self.encoder = encoding.BatchEncoder(len(boards), num_players)
+        self.buffers = (
+            Buffers.allocate(len(boards), self.num_actions, num_players)
+            if buffers is None
+            else buffers
+        )
+        self._rows = np.arange(len(boards))
+
+    @property
+    def num_envs(self) -> int:
+        """Return the number of environments."""
+        return self.game.num_games
+
+    def reset(self) -> Buffers:
+        """Start new games in all environments."""
+        self.game.reset()
+        self.game.play_treasures()
+        self.buffers.reward[:] = 0
+        self.buffers.terminated[:] = False
+        self.buffers.truncated[:] = False
+        self.buffers.outcome[:] = 0
+        self._observe()
+        return self.buffers
+
+    def step(self, actions: np.ndarray) -> Buffers:
+        """Take an action for the current player of each game.
+
+        Args:
+            actions: (N,) the action of each environment.
+
+        Raises:
+            ValueError: If any action is illegal.
+        """
+        actions = np.asarray(actions)
+        legal = self.buffers.action_mask[self._rows, actions]
+        if not legal.all():
+            msg = f"Illegal actions in environments {np.flatnonzero(~legal)}."
+            raise ValueError(msg)
+
+        game, out = self.game, self.buffers
+        acting = game.current.copy()
+        bought = self.action_cards[self._rows, actions]
+        game.buy(bought)
+
+        end_turn = (bought < 0) | (game.buys <= 0)
+        game.cleanup(end_turn)
+
+        np.copyto(out.terminated, game.done)
+        np.greater_equal(game.turn, self.max_turns, out=out.truncated)
+        np.logical_and(out.truncated, ~out.terminated, out=out.truncated)
+        finished = out.terminated | out.truncated
+
+        out.outcome[:] = 0
+        out.reward[:] = 0
+        if out.terminated.any():
+            outcomes = game.outcomes()
+            np.copyto(out.outcome, outcomes, where=out.terminated[:, None])
+            np.copyto(out.reward, outcomes[self._rows, acting], where=out.terminated)
+
+        game.reset(finished)
+        game.play_treasures(end_turn | finished)
+        self._observe()
+        return out
+
+    def _observe(self) -> None:
+        """Encode the observations and legal actions of the current players."""
+        game, out = self.game, self.buffers
+        self.encoder.encode(game, out.observation)
+
+        supply = self.tables.gather(game.supply)
+        board.buy_mask(self.tables, supply, game.money, game.buys, out=out.action_mask)
+        out.action_mask[:, -1] = True
+
+
+class DominionEnv:
+    """A single environment for the buy phase of Dominion.
+
+    This follows the Gymnasium API: `reset` returns an observation and an info
+    dict, and `step` returns an observation, a reward, whether the game was
+    terminated or truncated, and an info dict. The info dict holds the legal
+    action mask and the index of the player about to act.
+    """
+
+    def __init__(
+        self,
+        b: board.Board,
+        num_players: int = 2,
+        *,
+        max_turns: int = MAX_TURNS,
+    ) -> None:
+        """Initialize the environment.
+
+        Args:
+            b: The board to play on.
+            num_players: The number of players in the game.
+            max_turns: The number of turns after which a game is truncated.
+        """
+        self.board = b
+        self._env = BatchedEnv([b], num_players, max_turns=max_turns)
+
+    @property
+    def action_cards(self) -> list[cards.Card]:
+        """Return the card bought by each action, except for the last (pass)."""
+        return self.board.kingdom_cards
+
+    @property
+    def num_actions(self) -> int:
+        """Return the number of actions."""
+        return self._env.num_actions
+
+    def _info(self) -> dict[str, typing.Any]:
+        """Return the info dict for the current state."""
+        return {
+            "action_mask": self._env.buffers.action_mask[0],
+            "player": int(self._env.game.current[0]),
+            "outcome": self._env.buffers.outcome[0],
+        }
+
+    def reset(
+        self,
+        *,
+        seed: int | None = None,
+    ) -> tuple[np.ndarray, dict[str, typing.Any]]:
+        """Start a new game.
+
+        Args:
+            seed: If given, reseed the random number generator.
+        """
+        if seed is not None:
+            self._env.game.rng = np.random.default_rng(seed)
+        out = self._env.reset()
+        return out.observation[0], self._info()
+
+    def step(
+        self,
+        action: int,
+    ) -> tuple[np.ndarray, float, bool, bool, dict[str, typing.Any]]:
+        """Take an action for the player about to act.
+
+        When a game ends, a new game is started and its first observation is
+        returned. The outcome of the finished game is in the info dict.
+
+        Args:
+            action: The index of the action.
+        """
+        out = self._env.step(np.array([action]))
+        return (
+            out.observation[0],
+            float(out.reward[0]),
+            bool(out.terminated[0]),
+            bool(out.truncated[0]),
+            self._info(),
+        )
@@ -0,0 +1,243 @@
+"""A pool of environments stepped in parallel by worker processes.
+
+Each worker owns a contiguous slice of the environments as a `BatchedEnv`. The
+observations, action masks, actions and results of all environments live in
+shared memory, so a step only sends a single byte to and from each worker, with
+no pickling of arrays.
+"""
+
+import contextlib
+import itertools
+import multiprocessing
+import multiprocessing.connection
+import multiprocessing.shared_memory
+import traceback
+import typing
+
+import numpy as np
+
+from alpha_dom import board
+from alpha_dom import seeding
+
+from .environment import MAX_TURNS
+from .environment import BatchedEnv
+from .environment import Buffers
+from .environment import num_actions
+
+STEP = b"s"
+RESET = b"r"
+CLOSE = b"c"
+OK = b"k"
+ERROR = b"e"
+
+Specs = dict[str, tuple[tuple[int, ...], type]]
+
+
+def _views(
+    memory: dict[str, multiprocessing.shared_memory.SharedMemory],
+    specs: Specs,
+) -> dict[str, np.ndarray]:
+    """Return numpy arrays backed by blocks of shared memory."""
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=memory[name].buf)
+        for name, (shape, dtype) in specs.items()
+    }
+
+
+def _worker(  # noqa: PLR0913
+    conn: multiprocessing.connection.Connection,
+    names: dict[str, str],
+    specs: Specs,
+    envs: slice,
+    boards: list[board.Board],
+    num_players: int,
+    max_turns: int,
+    seed: np.random.SeedSequence,
+) -> None:
+    """Step a slice of the environments whenever the parent asks."""
+    # The parent owns the shared memory, and unlinks it when it is closed. The
+    # worker only closes its own mappings.
+    memory = {
+        name: multiprocessing.shared_memory.SharedMemory(name=shm_name)
+        for name, shm_name in names.items()
+    }
+    try:
+        _serve(conn, _views(memory, specs), envs, boards, num_players, max_turns, seed)
+    finally:
+        conn.close()
+        for shm in memory.values():
+            # The views are released with `_serve`, unless an error holds them.
+            with contextlib.suppress(BufferError):
+                shm.close()
+
+
+def _serve(  # noqa: PLR0913
+    conn: multiprocessing.connection.Connection,
+    views: dict[str, np.ndarray],
+    envs: slice,
+    boards: list[board.Board],
+    num_players: int,
+    max_turns: int,
+    seed: np.random.SeedSequence,
+) -> None:
+    """Run the commands of the parent on a slice of the environments."""
+    arrays = {name: view[envs] for name, view in views.items()}
+    actions = arrays.pop("actions")
+    env = BatchedEnv(
+        boards,
+        num_players,
+        max_turns=max_turns,
+        rng=seed,
+        buffers=Buffers(**arrays),
+        # The buffers are shared by all the workers, whose boards may need
+        # fewer actions.
+        width=np.shape(arrays["action_mask"])[1],
+    )
+
+    while (command := conn.recv_bytes()) != CLOSE:
+        try:
+            if command == RESET:
+                env.reset()
+            else:
+                env.step(actions)
+        except Exception:  # noqa: BLE001
+            conn.send_bytes(ERROR + traceback.format_exc().encode())
+        else:
+            conn.send_bytes(OK)
+
+
+class VectorEnv:
+    """K environments, split across worker processes.
+
+    The buffers returned by `reset` and `step` are views of shared memory. They
+    are overwritten by the next call, so copy anything that must be kept.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        boards: typing.Sequence[board.Board],
+        num_workers: int,
+        num_players: int = 2,
+        *,
+        max_turns: int = MAX_TURNS,
+        seed: int | None = None,
+        context: str | None = None,
+    ) -> None:
+        """Start the worker processes.
+
+        Args:
+            boards: The board for each environment.
+            num_workers: The number of worker processes.
+            num_players: The number of players in each game.
+            max_turns: The number of turns after which a game is truncated.
+            seed: The master seed. Worker `i` uses `seeding.stream(seed, i)`.
+            context: The multiprocessing start method, e.g. "fork" or "spawn".
+        """
+        self.num_envs = len(boards)
+        self.num_actions = num_actions(boards)
+        self.num_players = num_players
+
+        specs: Specs = dict(
+            Buffers.specs(self.num_envs, self.num_actions, num_players),
+            actions=((self.num_envs,), np.int64),
+        )
+        self._memory = {
+            name: multiprocessing.shared_memory.SharedMemory(
+                create=True,
+                size=max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize),
+            )
+            for name, (shape, dtype) in specs.items()
+        }
+        arrays = _views(self._memory, specs)
+        self._actions = arrays.pop("actions")
+        self.buffers = Buffers(**arrays)
+
+        ctx = multiprocessing.get_context(context)
+        bounds = np.linspace(0, self.num_envs, num_workers + 1).astype(int)
+        self._conns: list[multiprocessing.connection.Connection] = []
+        self._processes: list[multiprocessing.process.BaseProcess] = []
+        for i, (lo, hi) in enumerate(itertools.pairwise(bounds)):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(  # type: ignore[attr-defined]
+                target=_worker,
+                args=(
+                    child,
+                    {name: shm.name for name, shm in self._memory.items()},
+                    specs,
+                    slice(lo, hi),
+                    list(boards[lo:hi]),
+                    num_players,
+                    max_turns,
+                    seeding.stream(seed, i),
+                ),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._conns.append(parent)
+            self._processes.append(process)
+
+    def __enter__(self) -> typing.Self:
+        """Return the environment, to be closed at the end of a with block."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Close the environment."""
+        self.close()
+
+    def _broadcast(self, command: bytes) -> None:
+        """Send a command to every worker and wait for all of them to finish.
+
+        Raises:
+            RuntimeError: If any worker failed.
+        """
+        for conn in self._conns:
+            conn.send_bytes(command)
+        errors = [
+            reply[len(ERROR) :].decode()
+            for reply in (conn.recv_bytes() for conn in self._conns)
+            if reply.startswith(ERROR)
+        ]
+        if errors:
+            msg = "\n".join(errors)
+            raise RuntimeError(msg)
+
+    def reset(self) -> Buffers:
+        """Start new games in all environments."""
+        self._broadcast(RESET)
+        return self.buffers
+
+    def step(self, actions: np.ndarray) -> Buffers:
+        """Take an action for the current player of each game.
+
+        See `BatchedEnv.step`.
+
+        Args:
+            actions: (K,) the action of each environment.
+        """
+        np.copyto(self._actions, actions)
+        self._broadcast(STEP)
+        return self.buffers
+
+    def close(self) -> None:
+        """Stop the workers and release the shared memory.
+
+        Closing the environment again does nothing.
+        """
+        if not self._memory:
+            return
+        for conn, process in zip(self._conns, self._processes, strict=True):
+            if process.is_alive():
+                conn.send_bytes(CLOSE)
+            process.join()
+            conn.close()
+        self._conns, self._processes = [], []
+
+        # Views of the shared memory must be released before it can be closed.
+        del self._actions, self.buffers
+        for shm in self._memory.values():
+            # If the caller still holds a view, the memory stays mapped.
+            with contextlib.suppress(BufferError):
+                shm.close()
+            shm.unlink()
+        self._memory = {}
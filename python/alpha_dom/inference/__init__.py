@@ -0,0 +1,5 @@
+"""Provides a server that evaluates the observations of many workers in batches."""
+
+from .server import Client
+from .server import Server
+from .server import Stats
@@ -0,0 +1,394 @@
+"""A local server that evaluates the observations of many workers in batches.
+
+A model evaluates a batch of observations much faster per observation than one
+at a time. A `Server` runs a model (see `alpha_dom.search.Evaluator`) in a
+thread of the main process, for the `Client`s of worker processes:
+
+1. A client writes its observations and action masks into its own rows of
+   arrays in shared memory, and puts a small request on a queue.
+2. The server takes requests off the queue until it has `max_batch_size` rows,
+   or until `max_latency` seconds have passed since the first request of the
+   batch was made. It copies their rows into one batch.
+3. The server evaluates the batch, writes the priors and values back into the
+   rows of each client, and wakes them up.
+
+Only the requests travel through the queue; the observations and results stay in
+shared memory. Clients are passed to workers when they are started, e.g. as
+arguments of `multiprocessing.Process` or of the initializer of a pool.
+
+    with Server(model, num_features, num_actions, num_clients=4) as server:
+        workers = [ctx.Process(target=work, args=(c,)) for c in server.clients]
+
+The server keeps metrics of its queue, batches and latency, see `Stats`.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+import typing
+
+import numpy as np
+
+from alpha_dom import search
+
+# The number of latencies kept for the percentiles of `Stats`.
+LATENCY_WINDOW = 10_000
+# How often an idle server checks whether it was stopped, in seconds.
+POLL_INTERVAL = 0.05
+
+
+class Request(typing.NamedTuple):
+    """A request of a client, put on the queue of the server.
+
+    Attributes:
+        client: The index of the client.
+        rows: The number of observations in its rows.
+        time: When it was made, from `time.monotonic`.
+    """
+
+    client: int
+    rows: int
+    time: float
+
+
+class Stats(typing.NamedTuple):
+    """The metrics of a server.
+
+    Attributes:
+        requests: The number of requests answered.
+        batches: The number of batches evaluated.
+        queue_depth: The number of requests waiting for a batch.
+        max_queue_depth: The most requests that waited for a batch at once.
+        batch_sizes: (B + 1,) the number of batches of each number of rows.
+        p50_latency: The median time from a request to its results, in seconds.
+        p99_latency: The 99th percentile of that time.
+    """
+
+    requests: int
+    batches: int
+    queue_depth: int
+    max_queue_depth: int
+    batch_sizes: np.ndarray
+    p50_latency: float
+    p99_latency: float
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Return the mean number of rows per batch."""
+        rows = self.batch_sizes @ np.arange(self.batch_sizes.size)
+        return float(rows / self.batches) if self.batches else 0.0
+
+
+class Client:
+    """The handle of a worker on a server.
+
+    A client evaluates observations like a `search.Evaluator`, so it can be
+    passed to `alpha_dom.search.MCTS` in a worker. Each client must be used by
+    one thread at a time.
+
+    Attributes:
+        index: The index of the client on the server.
+        capacity: The most observations per request. Larger calls are split.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        index: int,
+        capacity: int,
+        shapes: tuple[int, int, int],
+        buffers: dict[str, typing.Any],
+        requests: typing.Any,  # noqa: ANN401
+        ready: typing.Any,  # noqa: ANN401
+        submitted: typing.Any,  # noqa: ANN401
+    ) -> None:
+        """Initialize a client. Use `Server.clients` instead."""
+        self.index = index
+        self.capacity = capacity
+        self._shapes = shapes
+        self._buffers = buffers
+        self._requests = requests
+        self._ready = ready
+        self._submitted = submitted
+        self._views: dict[str, np.ndarray] | None = None
+
+    def __getstate__(self) -> dict[str, typing.Any]:
+        """Return the state to pickle, without the views of the buffers."""
+        return {**self.__dict__, "_views": None}
+
+    def __call__(
+        self,
+        observations: np.ndarray,
+        masks: np.ndarray,
+        *,
+        timeout: float | None = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Evaluate observations on the server.
+
+        Args:
+            observations: (N, F) the observations.
+            masks: (N, A) whether each action is legal.
+            timeout: The most seconds to wait for each request.
+
+        Returns:
+            The (N, A) priors and (N,) values of the model.
+
+        Raises:
+            TimeoutError: If the server did not answer in time. The answer may
+                still come, so the client must not be used again.
+            RuntimeError: If the model failed on a batch with the observations.
+        """
+        if self._views is None:
+            self._views = _views(self._buffers, self._shapes)
+        views, k = self._views, self.index
+
+        n = len(observations)
+        priors = np.zeros((n, self._shapes[2]), dtype=np.float32)
+        values = np.zeros(n, dtype=np.float32)
+        for start in range(0, n, self.capacity):
+            rows = min(self.capacity, n - start)
+            views["observations"][k, :rows] = observations[start : start + rows]
+            views["masks"][k, :rows] = masks[start : start + rows]
+            with self._submitted.get_lock():
+                self._submitted.value += 1
+            self._requests.put(Request(k, rows, time.monotonic()))
+
+            if not self._ready.acquire(timeout=timeout):
+                msg = f"The server did not answer client {k} in {timeout} seconds."
+                raise TimeoutError(msg)
+            if views["failed"][k]:
+                msg = "The model failed on a batch with these observations."
+                raise RuntimeError(msg)
+            priors[start : start + rows] = views["priors"][k, :rows]
+            values[start : start + rows] = views["values"][k, :rows]
+        return priors, values
+
+
+class Server:
+    """Evaluates the observations of many clients with a model, in batches.
+
+    Attributes:
+        model: The model.
+        max_batch_size: The most observations per batch.
+        max_latency: The most seconds that a request waits for other requests to
+            join its batch.
+        clients: The handles of the workers.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        model: search.Evaluator,
+        num_features: int,
+        num_actions: int,
+        *,
+        num_clients: int,
+        max_batch_size: int = 256,
+        max_latency: float = 0.002,
+        context: str | None = None,
+    ) -> None:
+        """Initialize a server, and the shared memory of its clients.
+
+        Args:
+            model: The model.
+            num_features: The number of features of each observation.
+            num_actions: The number of actions of each mask.
+            num_clients: The number of clients.
+            max_batch_size: The most observations per batch. It is also the most
+                observations per request of a client.
+            max_latency: The most seconds that a request waits for other
+                requests to join its batch.
+            context: The multiprocessing start method of the workers, e.g. "fork"
+                or "spawn".
+        """
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+
+        ctx = multiprocessing.get_context(context)
+        shapes = (num_clients, num_features, num_actions)
+        size = num_clients * max_batch_size
+        buffers = {
+            "observations": ctx.RawArray("f", size * num_features),
+            "masks": ctx.RawArray("b", size * num_actions),
+            "priors": ctx.RawArray("f", size * num_actions),
+            "values": ctx.RawArray("f", size),
+            "failed": ctx.RawArray("b", num_clients),
+        }
+        self._views = _views(buffers, shapes)
+        self._requests = ctx.Queue()
+        self._ready = [ctx.Semaphore(0) for _ in range(num_clients)]
+        self._submitted: typing.Any = ctx.Value("q", 0)
+        self.clients = [
+            Client(
+                k,
+                max_batch_size,
+                shapes,
+                buffers,
+                self._requests,
+                self._ready[k],
+                self._submitted,
+            )
+            for k in range(num_clients)
+        ]
+
+        self._batch = {
+            "observations": np.zeros((max_batch_size, num_features), np.float32),
+            "masks": np.zeros((max_batch_size, num_actions), bool),
+        }
+        self._lock = threading.Lock()
+        self._taken = self._requests_done = self._batches = self._max_depth = 0
+        self._batch_sizes = np.zeros(max_batch_size + 1, dtype=np.int64)
+        self._latencies = np.zeros(LATENCY_WINDOW)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def __enter__(self) -> "Server":
+        """Start the server."""
+        self.start()
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Stop the server."""
+        self.stop()
+
+    def start(self) -> None:
+        """Start serving requests in a thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._serve, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving requests, after the batch being evaluated."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Stats:
+        """Return the metrics of the server so far."""
+        with self._lock:
+            done = self._requests_done
+            latencies = self._latencies[: min(done, LATENCY_WINDOW)]
+            p50, p99 = np.percentile(latencies, [50, 99]).tolist() if done else [0, 0]
+            return Stats(
+                requests=done,
+                batches=self._batches,
+                queue_depth=self._submitted.value - self._taken,
+                max_queue_depth=self._max_depth,
+                batch_sizes=self._batch_sizes.copy(),
+                p50_latency=float(p50),
+                p99_latency=float(p99),
+            )
+
+    def _serve(self) -> None:
+        """Form batches of requests and evaluate them, until stopped."""
+        held: Request | None = None
+        while not self._stop.is_set():
+            if held is None:
+                try:
+                    held = self._requests.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    continue
+            batch, rows = [held], held.rows
+            held = None
+            self._take(1)
+
+            # Wait for more requests until the first is due, then only take
+            # those already in the queue.
+            due = batch[0].time + self.max_latency
+            while rows < self.max_batch_size:
+                wait = due - time.monotonic()
+                try:
+                    request = (
+                        self._requests.get(timeout=wait)
+                        if wait > 0
+                        else self._requests.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if rows + request.rows > self.max_batch_size:
+                    held = request
+                    break
+                batch.append(request)
+                rows += request.rows
+                self._take(1)
+
+            self._evaluate(batch, rows)
+
+    def _take(self, n: int) -> None:
+        """Count requests taken off the queue, and the depth of the queue."""
+        with self._lock:
+            depth = self._submitted.value - self._taken
+            self._max_depth = max(self._max_depth, depth)
+            self._taken += n
+
+    def _evaluate(self, batch: list[Request], rows: int) -> None:
+        """Evaluate a batch of requests, and send the results to the clients."""
+        views, gathered = self._views, self._batch
+        start = 0
+        for request in batch:
+            stop = start + request.rows
+            for name in ("observations", "masks"):
+                gathered[name][start:stop] = views[name][request.client, : request.rows]
+            start = stop
+
+        failed = False
+        try:
+            priors, values = self.model(
+                gathered["observations"][:rows],
+                gathered["masks"][:rows],
+            )
+        except Exception:  # noqa: BLE001
+            failed = True
+
+        start = 0
+        for request in batch:
+            k, stop = request.client, start + request.rows
+            views["failed"][k] = failed
+            if not failed:
+                views["priors"][k, : request.rows] = priors[start:stop]
+                views["values"][k, : request.rows] = values[start:stop]
+            start = stop
+            self._ready[k].release()
+
+        now = time.monotonic()
+        with self._lock:
+            for request in batch:
+                self._latencies[self._requests_done % LATENCY_WINDOW] = (
+                    now - request.time
+                )
+                self._requests_done += 1
+            self._batches += 1
+            self._batch_sizes[rows] += 1
+
+
+def _views(
+    buffers: dict[str, typing.Any],
+    shapes: tuple[int, int, int],
+) -> dict[str, np.ndarray]:
+    """Return the shared buffers of a server as arrays, with a row per client."""
+    num_clients, num_features, num_actions = shapes
+    rows = len(buffers["values"]) // num_clients
+    return {
+        "observations": np.frombuffer(buffers["observations"], np.float32).reshape(
+            num_clients,
+            rows,
+            num_features,
+        ),
+        "masks": np.frombuffer(buffers["masks"], bool).reshape(
+            num_clients,
+            rows,
+            num_actions,
+        ),
+        "priors": np.frombuffer(buffers["priors"], np.float32).reshape(
+            num_clients,
+            rows,
+            num_actions,
+        ),
+        "values": np.frombuffer(buffers["values"], np.float32).reshape(
+            num_clients,
+            rows,
+        ),
+        "failed": np.frombuffer(buffers["failed"], bool),
+    }
@@ -1 +1,5 @@
 """Provides model for player in dominion."""
+
+from . import events
+from .model import Player
+from .vector import VectorPlayer
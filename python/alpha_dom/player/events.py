@@ -0,0 +1,70 @@
+"""The events that a `Player` reports to its listeners.
+
+Every change to the zones of a player is reported as an `Event`, so that other
+objects, e.g. an `alpha_dom.belief.Beliefs`, can follow a game incrementally.
+Some events are public, and others are only seen by the player:
+
+- `Kind.Gain`, `Kind.TopDeck`, `Kind.Discard`, `Kind.Trash` and `Kind.Play`
+  reveal their card to every player.
+- `Kind.Draw` and `Kind.Look` carry a card that only the player sees. Other
+  players only see that a card was drawn, or nothing at all for a look.
+- `Kind.Cleanup` and `Kind.Reshuffle` carry no card.
+
+Listeners receive every event with its card, and must themselves ignore what
+their observer is not allowed to see.
+"""
+
+import enum
+import typing
+
+from alpha_dom import cards
+
+
+class Kind(enum.Enum):
+    """The kinds of events."""
+
+    # A card was gained to `zone`.
+    Gain = enum.auto()
+    # A card was put from `zone` on top of the draw pile.
+    TopDeck = enum.auto()
+    # A card was discarded from `zone`.
+    Discard = enum.auto()
+    # A card was trashed from `zone`.
+    Trash = enum.auto()
+    # `n` copies of a card were played from the hand.
+    Play = enum.auto()
+    # The top card of the draw pile was drawn into the hand.
+    Draw = enum.auto()
+    # The player looked at the card `n` cards from the top of the draw pile.
+    Look = enum.auto()
+    # The hand and play area were discarded, before drawing a new hand.
+    Cleanup = enum.auto()
+    # The discard pile was shuffled and put under the draw pile.
+    Reshuffle = enum.auto()
+
+
+class Event(typing.NamedTuple):
+    """A change to the zones of a player.
+
+    Attributes:
+        player: The name of the player.
+        kind: The kind of event.
+        card: The card, if any.
+        zone: The zone the card was gained to or taken from, as named by the
+            methods of `Player`, e.g. "Hand" or "DrawPile".
+        n: The number of copies for `Kind.Play`, and the depth for `Kind.Look`.
+        position: The index of the card in the draw pile for `Kind.Discard` and
+            `Kind.Trash`, as passed to `Player.discard` and `Player.trash`, but
+            always counted from the top: -1 is the top card.
+    """
+
+    player: int
+    kind: Kind
+    card: cards.Card | None = None
+    zone: str | None = None
+    n: int = 1
+    position: int = -1
+
+
+# Receives the events of the players it listens to.
+Listener = typing.Callable[[Event], None]
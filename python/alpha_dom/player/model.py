@@ -1,32 +1,74 @@
 """A pydantic model for a player in Dominion."""
 
-import random
+import itertools
 import typing
 
+import numpy as np
 import pydantic
 
 from alpha_dom import board
 from alpha_dom import cards
+from alpha_dom import seeding
+from alpha_dom.state import zobrist
+from alpha_dom.state.undo import Tracked
 
+from . import events
 
-class Player(pydantic.BaseModel):
+# The names of the attributes with the counts of the cards in each zone.
+_COUNTS = {
+    "hand": "hand",
+    "discard_pile": "discard_pile",
+    "draw_pile": "_draw_counts",
+    "in_play": "_play_counts",
+}
+
+
+class Player(Tracked):
     """A pydantic model for a player in Dominion.
 
     Attributes:
         name: A unique identifier for the player.
-        draw_pile: Cards in the player's draw pile.
+        draw_pile: Cards in the player's draw pile whose order is fixed, on top
+            of those in `shuffled`.
+        shuffled: Cards at the bottom of the player's draw pile, in an order
+            that is not fixed yet, and their multiplicity.
         hand: Cards in the player's hand and their multiplicity.
         discard_pile: Cards in the player's discard pile and their multiplicity.
         actions: The number of actions the player has left.
         money: The amount of money the player has left.
         buys: The number of buys the player has left.
         cards_in_play: Cards in the player's play area.
+        rng: The random number generator used for shuffling.
+
+    The methods of the player maintain `state_hash`, a Zobrist hash of the
+    counts of the cards in each zone, as well as the size of the deck and its
+    victory points. Their changes can be undone with an
+    `alpha_dom.state.UndoLog`. After changing the zones directly, call `rehash`.
+    They also report their changes to the listeners of the player, see `listen`.
+
+    A lazy player does not shuffle its discard pile into `draw_pile`. It moves
+    the counts into `shuffled` instead, and samples each card that it draws from
+    them, in proportion to their multiplicity. This is the same distribution as
+    drawing from a shuffled pile, but a reshuffle costs O(distinct cards) rather
+    than O(cards). The order of a card is only fixed when it is revealed, see
+    `reveal`. The draw pile of an eager player is always fully ordered.
     """
 
+    CONTAINERS: typing.ClassVar[tuple[str, ...]] = (
+        "draw_pile",
+        "shuffled",
+        "hand",
+        "discard_pile",
+        "cards_in_play",
+        "_draw_counts",
+        "_play_counts",
+    )
+
     name: int
 
     # deck management
     draw_pile: list[cards.Card] = []
+    shuffled: dict[cards.Card, int] = {}
     hand: dict[cards.Card, int] = {}
     discard_pile: dict[cards.Card, int] = {}
 
@@ -36,18 +78,54 @@ class Player(pydantic.BaseModel):
     buys: int = 1
     cards_in_play: list[cards.Card] = []
 
-    def __init__(self, *args, **kwargs) -> None:  # noqa: ANN002, ANN003
-        """Initialize the player."""
+    _rng: np.random.Generator = pydantic.PrivateAttr(
+        default_factory=np.random.default_rng,
+    )
+    _lazy: bool = pydantic.PrivateAttr(default=False)
+    _listeners: tuple[events.Listener, ...] = pydantic.PrivateAttr(default=())
+    _zobrist: int = pydantic.PrivateAttr(default=0)
+    # The counts of the cards in the play area, and in the whole draw pile.
+    _draw_counts: dict[cards.Card, int] = pydantic.PrivateAttr(default_factory=dict)
+    _play_counts: dict[cards.Card, int] = pydantic.PrivateAttr(default_factory=dict)
+    # Running totals over the deck. `_scaled` counts the cards that are worth
+    # points per cards in the deck by their `points_per_cards`. It is replaced
+    # rather than changed, so forks can share it.
+    _deck_size: int = pydantic.PrivateAttr(default=0)
+    _points: int = pydantic.PrivateAttr(default=0)
+    _scaled: dict[int, int] = pydantic.PrivateAttr(default_factory=dict)
+
+    def __init__(
+        self,
+        *args,  # noqa: ANN002
+        rng: seeding.RngLike = None,
+        lazy: bool = False,
+        **kwargs,  # noqa: ANN003
+    ) -> None:
+        """Initialize the player.
+
+        Args:
+            args: The fields of the player.
+            rng: The random number generator used for shuffling, or a seed for
+                one. See `seeding.generator` to derive one per game.
+            lazy: Whether to sample draws from the counts of the draw pile
+                instead of shuffling it.
+            kwargs: The fields of the player.
+        """
         super().__init__(*args, **kwargs)
+        self._rng = np.random.default_rng(rng)
+        self._lazy = lazy
 
         # Shuffle the starting deck
-        self.draw_pile = [cards.load("Copper")] * 7 + [cards.load("Estate")] * 3
-        random.shuffle(self.draw_pile)
+        copper, estate = cards.load("Copper"), cards.load("Estate")
+        if lazy:
+            self.draw_pile, self.shuffled = [], {copper: 7, estate: 3}
+        else:
+            self.draw_pile = [copper] * 7 + [estate] * 3
+            self._rng.shuffle(self.draw_pile)
+        self.rehash()
 
         # Draw 5 cards for the starting hand
-        for _ in range(5):
-            card: cards.Card = self.draw()  # type: ignore[assignment]
-            self.hand[card] = self.hand.get(card, 0) + 1
+        self.draw_to_hand(5)
 
     def __str__(self) -> str:
         """Return the id of the player."""
@@ -60,6 +138,7 @@ class Player(pydantic.BaseModel):
                 f"name: {self.name}",
                 f"deck: {self.deck}",
                 f"draw_pile: {self.draw_pile}",
+                f"shuffled: {self.shuffled}",
                 f"hand: {self.hand}",
                 f"discard_pile: {self.discard_pile}",
                 f"actions: {self.actions}",
@@ -82,26 +161,254 @@ class Player(pydantic.BaseModel):
         """Returns the hash of the player."""
         return hash(self.name)
 
-    def draw(self) -> cards.Card | None:
-        """Draw a card from the draw pile.
+    @property
+    def rng(self) -> np.random.Generator:
+        """Return the random number generator used for shuffling."""
+        return self._rng
+
+    @property
+    def lazy(self) -> bool:
+        """Return whether the player samples draws instead of shuffling."""
+        return self._get("_lazy")
+
+    @property
+    def draw_counts(self) -> dict[cards.Card, int]:
+        """Return the count of each card in the whole draw pile.
+
+        This is maintained by the player, and must not be changed.
+        """
+        return self._get("_draw_counts")
+
+    def fork(self) -> typing.Self:
+        """Return a copy that shares its zones until they are changed.
+
+        The fork shuffles with a copy of the generator of this player, so both
+        draw the same cards until their decks differ.
+        """
+        clone = super().fork()
+        clone._set_private("_rng", seeding.clone(self._rng))
+        clone._set_private("_listeners", ())
+        return clone
+
+    def listen(self, listener: events.Listener) -> None:
+        """Report the changes to the zones of the player to a listener.
+
+        See `events`. Forks of the player have no listeners, and changes that are
+        undone with an `alpha_dom.state.UndoLog` are not reported.
+        """
+        self._set_private("_listeners", (*self._get("_listeners"), listener))
+
+    def unlisten(self, listener: events.Listener) -> None:
+        """Stop reporting changes to a listener."""
+        listeners = self._get("_listeners")
+        self._set_private("_listeners", tuple(x for x in listeners if x != listener))
+
+    def _emit(  # noqa: PLR0913
+        self,
+        kind: events.Kind,
+        card: cards.Card | None = None,
+        zone: str | None = None,
+        n: int = 1,
+        position: int = -1,
+    ) -> None:
+        """Report an event to the listeners of the player."""
+        listeners = self._get("_listeners")
+        if listeners:
+            event = events.Event(self.name, kind, card, zone, n, position)
+            for listener in listeners:
+                listener(event)
+
+    @property
+    def state_hash(self) -> int:
+        """Return the Zobrist hash of the counts of the cards in each zone.
+
+        See `alpha_dom.state.zobrist`.
+        """
+        return self._zobrist
+
+    def rehash(self) -> int:
+        """Recompute the hash of the zones from scratch, and return it.
+
+        This also recomputes the size of the deck and its victory points.
+        """
+        self._draw_counts = dict(self.shuffled)
+        for card in self.draw_pile:
+            self._draw_counts[card] = self._draw_counts.get(card, 0) + 1
+        self._play_counts = {}
+        for card in self.cards_in_play:
+            self._play_counts[card] = self._play_counts.get(card, 0) + 1
+
+        h = 0
+        for zone in zobrist.PLAYER_ZONES:
+            keys = zobrist.zone_keys(zobrist.zone_index(zone, zobrist.seat(self.name)))
+            for card, n in self._counts(zone).items():
+                h ^= keys[card.id][n % zobrist.NUM_COUNTS]
+        self._zobrist = h
+
+        self._deck_size, self._points, self._scaled = 0, 0, {}
+        for card in self.deck:
+            self._tally(card, 1)
+        return h
+
+    def _counts(self, zone: str) -> dict[cards.Card, int]:
+        """Return the counts of the cards in a zone of `zobrist.PLAYER_ZONES`."""
+        return self._get(_COUNTS[zone])
+
+    def _add(self, zone: str, card: cards.Card, n: int) -> None:
+        """Add (or, if negative, remove) copies of a card to the counts of a zone.
+
+        This updates the hash, and the counts of the hand and discard pile, but
+        not the lists of the draw pile and play area.
+
+        Raises:
+            KeyError: If copies are removed from a zone without the card.
+        """
+        old = self._set_count(_COUNTS[zone], card, n, strict=True)
+        keys = zobrist.zone_keys(zobrist.zone_index(zone, zobrist.seat(self.name)))
+        keys_of_card = keys[card.id]
+        self._set_logged(
+            "_zobrist",
+            self._get("_zobrist")
+            ^ keys_of_card[old % zobrist.NUM_COUNTS]
+            ^ keys_of_card[(old + n) % zobrist.NUM_COUNTS],
+        )
+
+    def _tally(self, card: cards.Card, n: int) -> None:
+        """Add (or, if negative, remove) copies of a card to the running totals."""
+        self._set_logged("_deck_size", self._get("_deck_size") + n)
+        if card.points:
+            self._set_logged("_points", self._get("_points") + card.points * n)
+        if card.points_per_cards:
+            scaled = dict(self._get("_scaled"))
+            scaled[card.points_per_cards] = scaled.get(card.points_per_cards, 0) + n
+            self._set_logged("_scaled", scaled)
+
+    def _push(self, card: cards.Card) -> None:
+        """Put a card on top of the draw pile."""
+        self._append("draw_pile", card)
+        self._add("draw_pile", card, 1)
+
+    def _pop(self, index: int = -1) -> cards.Card:
+        """Remove a card from the draw pile and return it."""
+        card = self._pop_item("draw_pile", index)
+        self._add("draw_pile", card, -1)
+        return card
+
+    def _from_top(self, index: int) -> int:
+        """Return an index of the draw pile as a negative index, from the top.
+
+        Unlike an index from the bottom, it does not depend on the number of
+        cards whose order is not fixed yet, which listeners may not know.
+        """
+        return index - len(self.draw_pile) if index >= 0 else index
+
+    @property
+    def deck(self) -> list[cards.Card]:
+        """Return all the cards the player owns."""
+        return [
+            *(card for card, n in self.shuffled.items() for _ in range(n)),
+            *self.draw_pile,
+            *(card for card, n in self.hand.items() for _ in range(n)),
+            *(card for card, n in self.discard_pile.items() for _ in range(n)),
+            *self.cards_in_play,
+        ]
+
+    @property
+    def deck_size(self) -> int:
+        """Return the number of cards the player owns."""
+        return self._get("_deck_size")
+
+    def victory_points(self) -> int:
+        """Return the number of victory points the player has."""
+        size = self._get("_deck_size")
+        return self._get("_points") + sum(
+            n * (size // per) for per, n in self._get("_scaled").items()
+        )
+
+    def _draw(self) -> cards.Card | None:
+        """Take the top card of the draw pile.
+
+        The card is not put anywhere, and is not reported to the listeners of
+        the player: the caller puts it somewhere and reports it, see
+        `draw_to_hand`. A shuffle of the discard pile is reported.
 
         Returns:
             - next card in the draw pile if a card can be drawn
             - None if the draw pile and discard pile are both empty
         """
-        if not self.draw_pile and not self.discard_pile:
-            return None
+        if not self.draw_pile and not self.shuffled:
+            if not self.discard_pile:
+                return None
+            self._reshuffle()
 
-        if not self.draw_pile:
-            self.draw_pile = [
-                card
-                for card, multiplicity in self.discard_pile.items()
-                for _ in range(multiplicity)
-            ]
-            random.shuffle(self.draw_pile)
-            self.discard_pile = {}
+        if self.draw_pile:
+            card = self._pop()
+        else:
+            card = self._sample()
+            self._add("draw_pile", card, -1)
+        return card
+
+    def reveal(self, n: int) -> list[cards.Card]:
+        """Fix the order of the top `n` cards of the draw pile, and return them.
 
-        return self.draw_pile.pop()
+        As when drawing, the discard pile is shuffled and put under the draw pile
+        if the draw pile has fewer than `n` cards. Cards are then moved from
+        `shuffled` to the bottom of `draw_pile`, so that the revealed cards are
+        the last `n` of `draw_pile`. Call this before taking a card from the draw
+        pile by its index, e.g. with `discard` or `trash`.
+
+        Args:
+            n: The number of cards to reveal.
+
+        Returns:
+            The revealed cards, from the top down. There are fewer than `n` if the
+            player does not have enough cards in its draw and discard piles.
+        """
+        while len(self.draw_pile) < n:
+            if not self.shuffled:
+                if not self.discard_pile:
+                    break
+                self._reshuffle()
+                continue
+            self._insert("draw_pile", 0, self._sample())
+        revealed = self.draw_pile[: -n - 1 : -1] if n else []
+        for depth, card in enumerate(revealed):
+            self._emit(events.Kind.Look, card, n=depth)
+        return revealed
+
+    def _reshuffle(self) -> None:
+        """Put the discard pile, shuffled, under the draw pile.
+
+        This assumes that `shuffled` is empty. A lazy player moves the counts of
+        the discard pile to `shuffled`, without fixing an order.
+        """
+        discarded = {card: n for card, n in self.discard_pile.items() if n}
+        for card, multiplicity in discarded.items():
+            self._add("discard_pile", card, -multiplicity)
+            self._add("draw_pile", card, multiplicity)
+        self.discard_pile = {}
+
+        if self._get("_lazy"):
+            self.shuffled = discarded
+        else:
+            pile = [card for card, n in discarded.items() for _ in range(n)]
+            self._rng.shuffle(pile)
+            self.draw_pile = pile + self.draw_pile
+        self._emit(events.Kind.Reshuffle)
+
+    def _sample(self) -> cards.Card:
+        """Remove a card from `shuffled`, at random, and return it.
+
+        This does not change the counts of the draw pile, of which `shuffled` is
+        a part.
+        """
+        shuffled = self.shuffled
+        r = int(self._rng.integers(sum(shuffled.values())))
+        totals = itertools.accumulate(shuffled.values())
+        card = next(c for c, total in zip(shuffled, totals, strict=True) if total > r)
+        if self._set_count("shuffled", card, -1) == 1:
+            self._delete_key("shuffled", card)
+        return card
 
     def gain(
         self,
@@ -123,15 +430,15 @@ class Player(pydantic.BaseModel):
             board: The board to gain the card from.
         """
         if destination == "DiscardPile":
-            self.discard_pile[card] = self.discard_pile.get(card, 0) + 1
+            self._add("discard_pile", card, 1)
 
         elif destination == "DrawPile":
             # This top-decks the card. We will need to add a way to place the card
             # in an arbitrary position in the draw pile.
-            self.draw_pile.append(card)
+            self._push(card)
 
         elif destination == "Hand":
-            self.hand[card] = self.hand.get(card, 0) + 1
+            self._add("hand", card, 1)
 
         else:
             # TODO: Remove this after implementing an enum for destination
@@ -141,7 +448,9 @@ class Player(pydantic.BaseModel):
             )
             raise ValueError(msg)
 
-        board.supply[card] -= 1
+        self._tally(card, 1)
+        board.update_supply(card, -1)
+        self._emit(events.Kind.Gain, card, destination)
 
     def top_deck(
         self,
@@ -158,12 +467,12 @@ class Player(pydantic.BaseModel):
             source: The location to top-deck the card from.
         """
         if source == "DiscardPile":
-            self.discard_pile[card] -= 1
-            self.draw_pile.append(card)
+            self._add("discard_pile", card, -1)
+            self._push(card)
 
         elif source == "Hand":
-            self.hand[card] -= 1
-            self.draw_pile.append(card)
+            self._add("hand", card, -1)
+            self._push(card)
 
         else:
             # TODO: Remove this after implementing an enum for destination
@@ -173,10 +482,13 @@ class Player(pydantic.BaseModel):
             )
             raise ValueError(msg)
 
+        self._emit(events.Kind.TopDeck, card, source)
+
     def discard(
         self,
         card: cards.Card,
         source: typing.Literal["Hand", "DrawPile"],
+        index: int = -1,
     ) -> None:
         """Discard a card.
 
@@ -186,14 +498,16 @@ class Player(pydantic.BaseModel):
         Args:
             card: The card to discard.
             source: The location to discard the card from.
+            index: The index of the card in the draw pile to discard.
         """
         if source == "Hand":
-            self.hand[card] -= 1
-            self.discard_pile[card] = self.discard_pile.get(card, 0) + 1
+            self._add("hand", card, -1)
+            self._add("discard_pile", card, 1)
 
         elif source == "DrawPile":
-            self.draw_pile.pop(card)
-            self.discard_pile[card] = self.discard_pile.get(card, 0) + 1
+            index = self._from_top(index)
+            self._pop(index)
+            self._add("discard_pile", card, 1)
 
         else:
             # TODO: Remove this after implementing an enum for destination
@@ -203,6 +517,8 @@ class Player(pydantic.BaseModel):
             )
             raise ValueError(msg)
 
+        self._emit(events.Kind.Discard, card, source, position=index)
+
     def buy(self, card: cards.Card, board: board.Board) -> None:
         """Buy a card.
 
@@ -224,20 +540,76 @@ class Player(pydantic.BaseModel):
     def cleanup(self) -> None:
         """Clean up the player's turn."""
         # Discard hand
-        for card, multiplicity in self.hand.items():
-            self.discard_pile[card] = self.discard_pile.get(card, 0) + multiplicity
+        for card, multiplicity in list(self.hand.items()):
+            self._add("hand", card, -multiplicity)
+            self._add("discard_pile", card, multiplicity)
         self.hand = {}
 
+        # Discard the play area, which may have been changed directly.
+        played: dict[cards.Card, int] = {}
         for card in self.cards_in_play:
-            self.discard_pile[card] = self.discard_pile.get(card, 0) + 1
+            played[card] = played.get(card, 0) + 1
+        if played != self._get("_play_counts"):
+            self.rehash()
+        for card, multiplicity in played.items():
+            self._add("in_play", card, -multiplicity)
+            self._add("discard_pile", card, multiplicity)
         self.cards_in_play = []
+        self._play_counts = {}
+        self._emit(events.Kind.Cleanup)
 
         # Draw 5 cards
-        for _ in range(5):
-            card = self.draw()  # type: ignore[assignment]
+        self.draw_to_hand(5)
+
+    def draw_to_hand(self, n: int) -> int:
+        """Draw up to `n` cards into the hand.
+
+        Args:
+            n: The number of cards to draw.
+
+        Returns:
+            The number of cards that were drawn.
+        """
+        for drawn in range(n):
+            card = self._draw()
             if card is None:
-                break
-            self.hand[card] = self.hand.get(card, 0) + 1
+                return drawn
+            self._add("hand", card, 1)
+            self._emit(events.Kind.Draw, card)
+        return n
+
+    def play(self, card: cards.Card) -> None:
+        """Play an action card from the hand, using up an action.
+
+        This moves the card to the play area. It is not responsible for checking
+        if the card can be played, nor for the effects of the card.
+
+        Args:
+            card: The card to play.
+
+        Raises:
+            KeyError: If the card is not in the player's hand.
+        """
+        self._add("hand", card, -1)
+        self._extend("cards_in_play", [card])
+        self._add("in_play", card, 1)
+        self.actions -= 1
+        self._emit(events.Kind.Play, card, "Hand")
+
+    def play_treasures(self) -> None:
+        """Play all the treasures in the player's hand.
+
+        The treasures are moved to the play area and their coins are added to the
+        player's money.
+        """
+        for card, multiplicity in list(self.hand.items()):
+            if card.is_treasure:
+                self.money += card.coins * multiplicity
+                self._extend("cards_in_play", [card] * multiplicity)
+                self._add("hand", card, -multiplicity)
+                self._add("in_play", card, multiplicity)
+                self._delete_key("hand", card)
+                self._emit(events.Kind.Play, card, "Hand", multiplicity)
 
     def start_turn(self) -> None:
         """Start the player's turn."""
@@ -270,10 +642,11 @@ class Player(pydantic.BaseModel):
             KeyError: If the card is not in the player's hand.
         """
         if source == "Hand":
-            self.hand[card] -= 1
+            self._add("hand", card, -1)
 
         elif source == "DrawPile":
-            self.draw_pile.pop(index)
+            index = self._from_top(index)
+            self._pop(index)
 
         else:
             # TODO: Remove this after implementing an enum for source
@@ -283,4 +656,6 @@ class Player(pydantic.BaseModel):
             )
             raise ValueError(msg)
 
-        board.trash[card] = board.trash.get(card, 0) + 1
+        self._tally(card, -1)
+        board.update_trash(card, 1)
+        self._emit(events.Kind.Trash, card, source, position=index)
@@ -0,0 +1,472 @@
+"""An array-backed player for the engine's hot paths.
+
+`VectorPlayer` mirrors the operations of `Player`, but stores the hand, discard
+pile and play area as count vectors indexed by card id, and the draw pile as an
+array of card ids. Reshuffles, cleanup and queries about the composition of the
+deck are vectorized operations on these arrays.
+"""
+
+import typing
+
+import numpy as np
+
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import seeding
+
+from .model import Player
+
+CardLike = cards.Card | cards.CompactCard | int
+
+STARTING_DECK = {"Copper": 7, "Estate": 3}
+HAND_SIZE = 5
+
+
+def card_id(card: CardLike) -> int:
+    """Return the integer id of a card, a compact card or an id."""
+    return card if isinstance(card, int) else card.id
+
+
+def score(deck: np.ndarray) -> np.ndarray:
+    """Return the victory points of decks given as counts indexed by card id.
+
+    Args:
+        deck: (..., C) the number of copies of each card in each deck.
+
+    Returns:
+        (...) the victory points of each deck.
+    """
+    per_cards = cards.points_per_cards_vector()
+    size = deck.sum(axis=-1, keepdims=True)
+    by_size = np.where(per_cards > 0, size // np.maximum(per_cards, 1), 0)
+    return (deck * (cards.points_vector() + by_size)).sum(axis=-1)
+
+
+class VectorPlayer:
+    """A player whose zones are count vectors indexed by card id.
+
+    The top of the draw pile is the last card in `draw_pile`, as for `Player`.
+
+    Attributes:
+        name: A unique identifier for the player.
+        draw_pile: The ids of the cards in the player's draw pile.
+        hand: The number of copies of each card in the player's hand.
+        discard_pile: The number of copies of each card in the discard pile.
+        in_play: The number of copies of each card in the play area.
+        actions: The number of actions the player has left.
+        money: The amount of money the player has left.
+        buys: The number of buys the player has left.
+        rng: The random number generator used for shuffling.
+    """
+
+    __slots__ = (
+        "name",
+        "_draw_pile",
+        "_draw_size",
+        "hand",
+        "discard_pile",
+        "in_play",
+        "actions",
+        "money",
+        "buys",
+        "rng",
+    )
+
+    def __init__(
+        self,
+        name: int,
+        *,
+        rng: seeding.RngLike = None,
+        deal: bool = True,
+    ) -> None:
+        """Initialize the player with a shuffled starting deck.
+
+        Args:
+            name: A unique identifier for the player.
+            rng: The random number generator used for shuffling, or a seed for
+                one.
+            deal: Whether to shuffle the starting deck and draw a starting
+                hand. If False, all zones are empty.
+        """
+        num_cards = cards.num_cards()
+
+        self.name = name
+        self.rng = np.random.default_rng(rng)
+
+        self._draw_pile = np.zeros(4 * sum(STARTING_DECK.values()), dtype=np.int32)
+        self._draw_size = 0
+        self.hand = np.zeros(num_cards, dtype=np.int32)
+        self.discard_pile = np.zeros(num_cards, dtype=np.int32)
+        self.in_play = np.zeros(num_cards, dtype=np.int32)
+
+        self.actions = 1
+        self.money = 0
+        self.buys = 1
+
+        if deal:
+            for name_, count in STARTING_DECK.items():
+                self.discard_pile[cards.load(name_).id] = count
+            self._reshuffle()
+            self.draw_to_hand(HAND_SIZE)
+
+    def __str__(self) -> str:
+        """Return the id of the player."""
+        return str(self.name)
+
+    def __repr__(self) -> str:
+        """Return a string representation of the player."""
+        line = ", ".join(
+            [
+                f"name: {self.name}",
+                f"draw_pile: {self.draw_pile.tolist()}",
+                f"hand: {self.hand.tolist()}",
+                f"discard_pile: {self.discard_pile.tolist()}",
+                f"in_play: {self.in_play.tolist()}",
+                f"actions: {self.actions}",
+                f"money: {self.money}",
+                f"buys: {self.buys}",
+            ],
+        )
+        return f"VectorPlayer({line})"
+
+    @property
+    def draw_pile(self) -> np.ndarray:
+        """Return a view of the ids of the cards in the draw pile."""
+        return self._draw_pile[: self._draw_size]
+
+    @draw_pile.setter
+    def draw_pile(self, card_ids: np.ndarray) -> None:
+        """Replace the draw pile with the given ids, top card last."""
+        size = len(card_ids)
+        if size > self._draw_pile.size:
+            self._draw_pile = np.resize(self._draw_pile, 2 * size)
+        self._draw_pile[:size] = card_ids
+        self._draw_size = size
+
+    @property
+    def deck(self) -> np.ndarray:
+        """Return the number of copies of each card the player owns."""
+        return (
+            self.hand
+            + self.discard_pile
+            + self.in_play
+            + np.bincount(self.draw_pile, minlength=self.hand.size)
+        )
+
+    def victory_points(self) -> int:
+        """Return the number of victory points the player has."""
+        return int(score(self.deck))
+
+    def deck_size(self) -> int:
+        """Return the number of cards the player owns."""
+        return (
+            int(self.hand.sum() + self.discard_pile.sum() + self.in_play.sum())
+            + self._draw_size
+        )
+
+    def _push(self, card: int) -> None:
+        """Put a card on top of the draw pile."""
+        if self._draw_size == self._draw_pile.size:
+            self._draw_pile = np.resize(self._draw_pile, 2 * self._draw_pile.size)
+        self._draw_pile[self._draw_size] = card
+        self._draw_size += 1
+
+    def _pop(self, index: int = -1) -> int:
+        """Remove a card from the draw pile and return its id."""
+        if index < 0:
+            index += self._draw_size
+        card = int(self._draw_pile[index])
+        self._draw_pile[index : self._draw_size - 1] = self._draw_pile[
+            index + 1 : self._draw_size
+        ]
+        self._draw_size -= 1
+        return card  # noqa: RET504
+
+    def _reshuffle(self) -> None:
+        """Shuffle the discard pile to form the draw pile.
+
+        This assumes that the draw pile is empty.
+        """
+        size = int(self.discard_pile.sum())
+        if size > self._draw_pile.size:
+            self._draw_pile = np.resize(self._draw_pile, 2 * size)
+
+        pile = self._draw_pile[:size]
+        pile[:] = np.repeat(np.arange(self.discard_pile.size), self.discard_pile)
+        self.rng.shuffle(pile)
+        self._draw_size = size
+        self.discard_pile[:] = 0
+
+    def draw(self) -> int | None:
+        """Draw a card from the draw pile.
+
+        Returns:
+            - the id of the next card in the draw pile if a card can be drawn
+            - None if the draw pile and discard pile are both empty
+        """
+        if self._draw_size == 0:
+            if not self.discard_pile.any():
+                return None
+            self._reshuffle()
+
+        return self._pop()
+
+    def draw_to_hand(self, n: int) -> int:
+        """Draw up to `n` cards into the hand, reshuffling at most once.
+
+        Args:
+            n: The number of cards to draw.
+
+        Returns:
+            The number of cards that were drawn.
+        """
+        drawn = self._draw_into_hand(n)
+        if drawn < n and self.discard_pile.any():
+            self._reshuffle()
+            drawn += self._draw_into_hand(n - drawn)
+        return drawn
+
+    def _draw_into_hand(self, n: int) -> int:
+        """Move up to `n` cards from the top of the draw pile into the hand."""
+        n = min(n, self._draw_size)
+        start = self._draw_size - n
+        # Cards are drawn from the top, i.e. from the end of the array.
+        self.hand += np.bincount(
+            self._draw_pile[start : self._draw_size],
+            minlength=self.hand.size,
+        )
+        self._draw_size = start
+        return n
+
+    def gain(
+        self,
+        card: CardLike,
+        destination: typing.Literal["DiscardPile", "DrawPile", "Hand"],
+        board: board.Board,
+    ) -> None:
+        """Gain a card to the specified location.
+
+        See `Player.gain`.
+
+        Args:
+            card: The card to gain.
+            destination: The location to gain the card to.
+            board: The board to gain the card from.
+        """
+        i = card_id(card)
+        if destination == "DiscardPile":
+            self.discard_pile[i] += 1
+
+        elif destination == "DrawPile":
+            self._push(i)
+
+        elif destination == "Hand":
+            self.hand[i] += 1
+
+        else:
+            msg = (
+                f"Invalid destination: {destination}. "
+                "Can only gain to 'DiscardPile', 'DrawPile', or 'Hand'."
+            )
+            raise ValueError(msg)
+
+        board.update_supply(cards.from_id(i), -1)
+
+    def top_deck(
+        self,
+        card: CardLike,
+        source: typing.Literal["DiscardPile", "Hand"],
+    ) -> None:
+        """Top deck a card.
+
+        See `Player.top_deck`.
+
+        Args:
+            card: The card to top-deck.
+            source: The location to top-deck the card from.
+        """
+        i = card_id(card)
+        if source == "DiscardPile":
+            self.discard_pile[i] -= 1
+
+        elif source == "Hand":
+            self.hand[i] -= 1
+
+        else:
+            msg = (
+                f"Invalid source: {source}. "
+                "Can only top deck from 'DiscardPile' or 'Hand'."
+            )
+            raise ValueError(msg)
+
+        self._push(i)
+
+    def discard(
+        self,
+        card: CardLike,
+        source: typing.Literal["Hand", "DrawPile"],
+        index: int = -1,
+    ) -> None:
+        """Discard a card.
+
+        See `Player.discard`.
+
+        Args:
+            card: The card to discard.
+            source: The location to discard the card from.
+            index: The index of the card in the draw pile to discard.
+        """
+        i = card_id(card)
+        if source == "Hand":
+            self.hand[i] -= 1
+
+        elif source == "DrawPile":
+            self._pop(index)
+
+        else:
+            msg = (
+                f"Invalid source: {source}. "
+                "Can only discard from 'Hand' or 'DrawPile'."
+            )
+            raise ValueError(msg)
+
+        self.discard_pile[i] += 1
+
+    def buy(self, card: CardLike, board: board.Board) -> None:
+        """Buy a card.
+
+        See `Player.buy`.
+
+        Args:
+            card: The card to buy.
+            board: The board to buy the card from.
+        """
+        i = card_id(card)
+        self.money -= cards.compact_cards()[i].cost
+        self.buys -= 1
+        self.gain(i, "DiscardPile", board)
+
+    def cleanup(self) -> None:
+        """Clean up the player's turn."""
+        self.discard_pile += self.hand
+        self.discard_pile += self.in_play
+        self.hand[:] = 0
+        self.in_play[:] = 0
+
+        self.draw_to_hand(HAND_SIZE)
+
+    def play(self, card: CardLike) -> None:
+        """Play an action card from the hand, using up an action.
+
+        See `Player.play`.
+
+        Args:
+            card: The card to play.
+        """
+        i = card_id(card)
+        self.hand[i] -= 1
+        self.in_play[i] += 1
+        self.actions -= 1
+
+    def play_treasures(self) -> None:
+        """Play all the treasures in the player's hand.
+
+        See `Player.play_treasures`.
+        """
+        treasures = self.hand * cards.type_vector(cards.Type.Treasure)
+        self.money += int(treasures @ cards.coin_vector())
+        self.in_play += treasures
+        self.hand -= treasures
+
+    def start_turn(self) -> None:
+        """Start the player's turn."""
+        self.actions = 1
+        self.money = 0
+        self.buys = 1
+
+    def trash(
+        self,
+        board: board.Board,
+        card: CardLike,
+        source: typing.Literal["Hand", "DrawPile"],
+        index: int = -1,
+    ) -> None:
+        """Trash a card.
+
+        See `Player.trash`.
+
+        Args:
+            board: The board in which to trash the card.
+            card: The card to trash.
+            source: From where to trash the card.
+            index: The index of the card in the draw pile to trash.
+        """
+        i = card_id(card)
+        if source == "Hand":
+            self.hand[i] -= 1
+
+        elif source == "DrawPile":
+            self._pop(index)
+
+        else:
+            msg = (
+                f"Invalid source: {source}. "
+                "Can only trash from 'Hand' or 'DrawPile'."
+            )
+            raise ValueError(msg)
+
+        board.update_trash(cards.from_id(i), 1)
+
+    @classmethod
+    def from_player(
+        cls,
+        player: Player,
+        *,
+        rng: seeding.RngLike = None,
+    ) -> "VectorPlayer":
+        """Return a vector player in the same state as a `Player`.
+
+        Args:
+            player: The player to copy.
+            rng: The random number generator used for shuffling. Defaults to
+                that of the player.
+        """
+        p = cls(player.name, rng=player.rng if rng is None else rng, deal=False)
+        # The order of the cards in `shuffled` is fixed here, under the others.
+        bottom = [c.id for c, n in player.shuffled.items() for _ in range(n)]
+        p.rng.shuffle(bottom)
+        top = [c.id for c in player.draw_pile]
+        p.draw_pile = np.array(bottom + top, dtype=np.int32)
+        for c, n in player.hand.items():
+            p.hand[c.id] += n
+        for c, n in player.discard_pile.items():
+            p.discard_pile[c.id] += n
+        for c in player.cards_in_play:
+            p.in_play[c.id] += 1
+
+        p.actions = player.actions
+        p.money = player.money
+        p.buys = player.buys
+        return p
+
+    def to_player(self) -> Player:
+        """Return a `Player` in the same state as this vector player."""
+
+        def to_dict(counts: np.ndarray) -> dict[cards.Card, int]:
+            return {cards.from_id(int(i)): int(counts[i]) for i in counts.nonzero()[0]}
+
+        p = Player.model_construct(
+            name=self.name,
+            draw_pile=list(map(cards.from_id, self.draw_pile.tolist())),
+            hand=to_dict(self.hand),
+            discard_pile=to_dict(self.discard_pile),
+            actions=self.actions,
+            money=self.money,
+            buys=self.buys,
+            cards_in_play=[
+                cards.from_id(i)
+                for i in np.repeat(np.arange(self.in_play.size), self.in_play).tolist()
+            ],
+        )
+        p.rehash()
+        return p
@@ -0,0 +1,6 @@
+"""Provides a compact binary log of games, and a replayer of their states."""
+
+from .log import Header
+from .log import Log
+from .log import Recorder
+from .replay import Replayer
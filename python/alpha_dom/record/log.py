@@ -0,0 +1,262 @@
+"""A compact binary log of the events of a game.
+
+A log starts with a header, which holds what is needed to set the game up
+again: the board, the number of players, whether they draw lazily, and the seed
+from which the generator of player `i` is `seeding.generator(seed, i)`. The
+header is followed by one fixed-size record per event of a player (see
+`alpha_dom.player.events`), with card ids and player indices rather than names:
+
+    kind    u1  the `events.Kind` of the event, or `RESOURCES`
+    player  u1  the index of the player
+    card    u1  the id of the card, or `NO_CARD`
+    zone    u1  the index of the zone in `ZONES`
+    arg     i2  `Event.n` or `Event.position`, depending on the kind
+
+Changes to the actions, money and buys of players are not events. When they
+differ from the last record, a `RESOURCES` record that holds the new actions in
+`card`, the buys in `zone` (both as signed bytes) and the money in `arg` is
+written before the next event of the player, and by `Recorder.log`.
+
+On disk, a log is `MAGIC`, the length of the header, the header as json and the
+records, see `Log.to_bytes`.
+"""
+
+import json
+import pathlib
+import struct
+import typing
+
+import numpy as np
+
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import seeding
+from alpha_dom.player import Player
+from alpha_dom.player import events
+
+MAGIC = b"ADLOG\x01"
+
+RECORD = np.dtype(
+    [
+        ("kind", "u1"),
+        ("player", "u1"),
+        ("card", "u1"),
+        ("zone", "u1"),
+        ("arg", "<i2"),
+    ],
+)
+
+# The kind of the records that hold the resources of a player.
+RESOURCES = 0
+NO_CARD = 255
+ZONES = (None, "Hand", "DiscardPile", "DrawPile")
+_ZONE_CODES = {zone: code for code, zone in enumerate(ZONES)}
+
+# The events whose `arg` is `Event.position` rather than `Event.n`.
+_INDEXED = (events.Kind.Discard, events.Kind.Trash)
+
+Record = tuple[int, int, int, int, int]
+
+
+class Header(typing.NamedTuple):
+    """How to set up a game again before replaying its events.
+
+    Attributes:
+        name: The name of the board.
+        kingdom: The names of the kingdom cards of the board.
+        num_players: The number of players.
+        seed: The seed of the generators of the players.
+        lazy: Whether the players draw lazily, see `Player`.
+        registry: The `cards.fingerprint` of the registry, which the card ids
+            depend on.
+    """
+
+    name: str
+    kingdom: list[str]
+    num_players: int
+    seed: int
+    lazy: bool
+    registry: str
+
+    def setup(self) -> tuple[board.Board, list[Player]]:
+        """Return the board and players of the game, before its first event.
+
+        Raises:
+            ValueError: If the registry of cards has changed since the log was
+                written.
+        """
+        if self.registry != cards.fingerprint():
+            msg = (
+                f"The log was written with the registry {self.registry}, "
+                f"not {cards.fingerprint()}."
+            )
+            raise ValueError(msg)
+
+        b = board.load_custom(list(self.kingdom), name=self.name)
+        b.set_initial_supply(self.num_players)
+        players = [
+            Player(name=i, rng=seeding.generator(self.seed, i), lazy=self.lazy)
+            for i in range(self.num_players)
+        ]
+        return b, players
+
+
+class Log(typing.NamedTuple):
+    """The header and records of a game.
+
+    Attributes:
+        header: The header.
+        records: (E,) the records, of dtype `RECORD`.
+    """
+
+    header: Header
+    records: np.ndarray
+
+    def to_bytes(self) -> bytes:
+        """Return the log in its binary format."""
+        header = json.dumps(self.header._asdict(), separators=(",", ":")).encode()
+        return b"".join(
+            [
+                MAGIC,
+                struct.pack("<I", len(header)),
+                header,
+                self.records.astype(RECORD, copy=False).tobytes(),
+            ],
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Log":
+        """Return a log from its binary format.
+
+        Raises:
+            ValueError: If the data is not a log.
+        """
+        if not data.startswith(MAGIC):
+            msg = "The data is not a game log."
+            raise ValueError(msg)
+        start = len(MAGIC) + 4
+        (size,) = struct.unpack_from("<I", data, len(MAGIC))
+        header = Header(**json.loads(data[start : start + size]))
+        records = np.frombuffer(data, dtype=RECORD, offset=start + size)
+        return cls(header, records)
+
+    def save(self, path: pathlib.Path) -> None:
+        """Write the log to a file."""
+        path.write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path: pathlib.Path) -> "Log":
+        """Read a log from a file."""
+        return cls.from_bytes(path.read_bytes())
+
+
+def encode(event: events.Event, player: int) -> Record:
+    """Return the record of an event of the player with the given index."""
+    arg = event.position if event.kind in _INDEXED else event.n
+    card = NO_CARD if event.card is None else event.card.id
+    return event.kind.value, player, card, _ZONE_CODES[event.zone], arg
+
+
+def resources(p: Player, player: int) -> Record:
+    """Return the record of the resources of the player with the given index.
+
+    Raises:
+        ValueError: If the resources do not fit in their fields.
+    """
+    if not (
+        -128 <= p.actions < 128
+        and -128 <= p.buys < 128
+        and -(2**15) <= p.money < 2**15
+    ):
+        msg = (
+            f"The resources of player {player} are out of range: actions "
+            f"{p.actions}, money {p.money}, buys {p.buys}."
+        )
+        raise ValueError(msg)
+    return RESOURCES, player, p.actions % 256, p.buys % 256, p.money
+
+
+def unpack_resources(record: typing.Sequence[int]) -> tuple[int, int, int]:
+    """Return the actions, money and buys of a `RESOURCES` record."""
+    _, _, actions, buys, money = record
+    return actions - 256 * (actions >= 128), money, buys - 256 * (buys >= 128)
+
+
+class Recorder:
+    """Sets up a game, and records the events of its players.
+
+    Attributes:
+        header: The header of the log.
+        board: The board, with its initial supply.
+        players: The players, in turn order. Their generators are derived from
+            the seed, and must not be replaced.
+    """
+
+    def __init__(
+        self,
+        b: board.Board,
+        num_players: int = 2,
+        *,
+        seed: int,
+        lazy: bool = False,
+    ) -> None:
+        """Set up a game like a board, and start recording.
+
+        Args:
+            b: The board, whose name and kingdom are recorded. The game is played
+                on a new board with its initial supply, see `board`.
+            num_players: The number of players.
+            seed: The seed of the generators of the players.
+            lazy: Whether the players draw lazily, see `Player`.
+        """
+        self.header = Header(
+            name=b.name,
+            kingdom=[card.name for card in b.kingdom_supply_cards],
+            num_players=num_players,
+            seed=seed,
+            lazy=lazy,
+            registry=cards.fingerprint(),
+        )
+        self.board, self.players = self.header.setup()
+        self._records: list[Record] = []
+        self._resources = [resources(p, i) for i, p in enumerate(self.players)]
+        for p in self.players:
+            p.listen(self._observe)
+
+    def __len__(self) -> int:
+        """Return the number of records so far."""
+        return len(self._records)
+
+    def _observe(self, event: events.Event) -> None:
+        """Record an event, after the resources of its player if they changed.
+
+        The resources are those after the change that the event reports, e.g.
+        with the action used by `Player.play`.
+        """
+        i = event.player
+        self._record_resources(i)
+        self._records.append(encode(event, i))
+
+    def _record_resources(self, i: int) -> None:
+        """Record the resources of a player if they changed."""
+        record = resources(self.players[i], i)
+        if record != self._resources[i]:
+            self._records.append(record)
+            self._resources[i] = record
+
+    def log(self) -> Log:
+        """Return the log of the game so far.
+
+        The resources that changed since the last event are recorded first, so
+        the length of the log is a position of `Replayer.at`.
+        """
+        for i in range(len(self.players)):
+            self._record_resources(i)
+        return Log(self.header, np.array(self._records, dtype=RECORD))
+
+    def stop(self) -> Log:
+        """Stop recording, and return the log of the game."""
+        log = self.log()
+        for p in self.players:
+            p.unlisten(self._observe)
+        return log
@@ -0,0 +1,272 @@
+"""Rebuild the states of a recorded game from its log.
+
+A `Replayer` sets the game up again from the header of a log, and re-executes
+its events on seeded players: each record is turned back into a call to a method
+of `Player`, e.g. `Player.gain` or `Player.cleanup`, and the events that the call
+reports must match the next records of the log. Draws and shuffles are redone by
+the generators of the players, so the log does not need to store the order of
+the draw piles.
+
+One call, with the records it consumes, is a step, and so is each resource
+record written between calls. Resources are set by their records only: the
+changes that the calls make to them, e.g. `Player.play` using an action, are
+undone after each step.
+
+The replayer keeps a `state.snapshot` of the game, and the states of the
+generators, every `interval` records, so that the state after any step is
+rebuilt by restoring the nearest snapshot and replaying at most `interval`
+records.
+"""
+
+import bisect
+import typing
+
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import state
+from alpha_dom.player import Player
+from alpha_dom.player import events
+
+from .log import NO_CARD
+from .log import RESOURCES
+from .log import ZONES
+from .log import Log
+from .log import encode
+from .log import unpack_resources
+
+
+class Checkpoint(typing.NamedTuple):
+    """The state of a game, and of the generators of its players."""
+
+    snapshot: state.Snapshot
+    rngs: tuple[typing.Mapping[str, typing.Any], ...]
+
+
+class Replayer:
+    """Rebuilds the state of a recorded game after any step.
+
+    Attributes:
+        log: The log of the game.
+        interval: The most records between two snapshots.
+        steps: The number of records consumed by the first `k` steps, for each
+            `k`. The state after `k` steps is the state at `steps[k]` records.
+    """
+
+    def __init__(self, log: Log, *, interval: int = 256) -> None:
+        """Replay a log once, keeping snapshots along the way.
+
+        Args:
+            log: The log of the game.
+            interval: The most records between two snapshots.
+
+        Raises:
+            ValueError: If the log does not match the game it sets up, e.g.
+                because it was corrupted.
+        """
+        self.log = log
+        self.interval = interval
+        self._records = log.records.tolist()
+        self._board, self._players = log.header.setup()
+        for p in self._players:
+            p.listen(self._check)
+        self._cursor = 0
+        self._resources_of = [_resources(p) for p in self._players]
+
+        self.steps = [0]
+        self._checkpoints = {0: self._checkpoint()}
+        while self._cursor < len(self._records):
+            self._step()
+            self.steps.append(self._cursor)
+            if self._cursor // interval > self.steps[-2] // interval:
+                self._checkpoints[self._cursor] = self._checkpoint()
+
+    def __len__(self) -> int:
+        """Return the number of steps."""
+        return len(self.steps) - 1
+
+    def state(self, step: int) -> tuple[board.Board, list[Player]]:
+        """Return the board and players after a number of steps.
+
+        Args:
+            step: The number of steps, from 0 to `len(self)`.
+
+        Returns:
+            Forks of the board and players, which can be changed freely.
+        """
+        return self.at(self.steps[step])
+
+    def at(self, position: int) -> tuple[board.Board, list[Player]]:
+        """Return the board and players after a number of records.
+
+        Args:
+            position: The number of records. It must be in `steps`, e.g. the
+                length of the log of a `Recorder` between two calls.
+
+        Returns:
+            Forks of the board and players, which can be changed freely.
+
+        Raises:
+            ValueError: If the position falls inside a step.
+        """
+        k = bisect.bisect_left(self.steps, position)
+        if k == len(self.steps) or self.steps[k] != position:
+            msg = f"Record {position} is not at the end of a step."
+            raise ValueError(msg)
+
+        start = max(k for k in self._checkpoints if k <= position)
+        if not start <= self._cursor <= position:
+            self._restore(start)
+        while self._cursor < position:
+            self._step()
+        return self._board.fork(), [p.fork() for p in self._players]
+
+    def _checkpoint(self) -> Checkpoint:
+        """Return the state of the game at the cursor."""
+        return Checkpoint(
+            state.snapshot(self._board, self._players),
+            tuple(p.rng.bit_generator.state for p in self._players),
+        )
+
+    def _restore(self, position: int) -> None:
+        """Restore the game to its snapshot at a position."""
+        checkpoint = self._checkpoints[position]
+        state.restore(checkpoint.snapshot, self._board, self._players)
+        for p, rng in zip(self._players, checkpoint.rngs, strict=True):
+            p.rng.bit_generator.state = rng
+        self._cursor = position
+        self._resources_of = [_resources(p) for p in self._players]
+
+    def _step(self) -> None:
+        """Replay the call that starts at the cursor.
+
+        Raises:
+            ValueError: If the call does not report the next records.
+        """
+        start = self._cursor
+        kind, i, card_id, zone_id, arg = self._records[start]
+        if kind == RESOURCES:
+            # Each resource record between calls is a step of its own.
+            self._apply_resources(limit=1)
+            return
+        if not self._valid(self._records[start]):
+            msg = f"Record {start} is not valid: {self._records[start]}."
+            raise ValueError(msg)
+
+        p = self._players[i]
+        card = cards.from_id(card_id) if card_id != NO_CARD else None
+        first, event = start, events.Kind(kind)
+        if event == events.Kind.Reshuffle:
+            # A shuffle is part of the draw or look that follows it.
+            first, event = start + 1, self._next_kind(start + 1)
+        if event == events.Kind.Look:
+            depth = 1
+            while self._is_look(first + depth, i, depth):
+                depth += 1
+            p.reveal(depth)
+        elif event == events.Kind.Draw:
+            p.draw_to_hand(1)
+        elif event == events.Kind.Cleanup:
+            p.cleanup()
+        elif card is None:
+            msg = f"Record {start} has no card: {self._records[start]}."
+            raise ValueError(msg)
+        else:
+            self._apply(p, event, card, ZONES[zone_id], arg)
+
+        # The resources are only changed by the records, not by the calls that
+        # replay them, e.g. the action used by `Player.play`.
+        p.actions, p.money, p.buys = self._resources_of[i]
+        if self._cursor == start:
+            msg = f"Record {start} was not reported by its call."
+            raise ValueError(msg)
+
+    def _apply(  # noqa: PLR0913
+        self,
+        p: Player,
+        kind: events.Kind,
+        card: cards.Card,
+        zone: str | None,
+        arg: int,
+    ) -> None:
+        """Replay a call that moves a card."""
+        where: typing.Any = zone
+        if kind == events.Kind.Gain:
+            p.gain(card, where, self._board)
+        elif kind == events.Kind.TopDeck:
+            p.top_deck(card, where)
+        elif kind == events.Kind.Discard:
+            p.discard(card, where, arg)
+        elif kind == events.Kind.Trash:
+            p.trash(self._board, card, where, arg)
+        elif card.is_treasure:
+            p.play_treasures()
+        else:
+            p.play(card)
+
+    def _valid(self, record: list[int]) -> bool:
+        """Return whether the fields of a record are in range."""
+        _, i, card_id, zone_id, _ = record
+        return (
+            0 <= i < len(self._players)
+            and (card_id < cards.num_cards() or card_id == NO_CARD)
+            and zone_id < len(ZONES)
+        )
+
+    def _next_kind(self, position: int) -> events.Kind:
+        """Return the kind of the first event from a position."""
+        while position < len(self._records):
+            kind = self._records[position][0]
+            if kind != RESOURCES:
+                return events.Kind(kind)
+            position += 1
+        msg = "The log ends with a shuffle."
+        raise ValueError(msg)
+
+    def _is_look(self, position: int, i: int, depth: int) -> bool:
+        """Return whether a record is a look of a player at a depth."""
+        if position >= len(self._records):
+            return False
+        kind, player, _, _, arg = self._records[position]
+        return kind == events.Kind.Look.value and player == i and arg == depth
+
+    def _check(self, event: events.Event) -> None:
+        """Check an event against the record at the cursor, and consume it.
+
+        The resource records before the event are applied first.
+
+        Raises:
+            ValueError: If the event does not match the record.
+        """
+        self._apply_resources()
+        position = self._cursor
+        if position >= len(self._records):
+            msg = f"The log ends before {event}."
+            raise ValueError(msg)
+        record = self._records[position]
+        if tuple(record) != encode(event, event.player):
+            msg = f"Record {position} is {record}, but the replay reported {event}."
+            raise ValueError(msg)
+        self._cursor += 1
+
+    def _apply_resources(self, limit: int | None = None) -> None:
+        """Apply the resource records at the cursor, up to a limit."""
+        end = len(self._records) if limit is None else self._cursor + limit
+        while (
+            self._cursor < min(end, len(self._records))
+            and self._records[self._cursor][0] == RESOURCES
+        ):
+            record = self._records[self._cursor]
+            i = record[1]
+            if not 0 <= i < len(self._players):
+                msg = f"Record {self._cursor} has no player {i}."
+                raise ValueError(msg)
+            p = self._players[i]
+            p.actions, p.money, p.buys = self._resources_of[i] = unpack_resources(
+                record,
+            )
+            self._cursor += 1
+
+
+def _resources(p: Player) -> tuple[int, int, int]:
+    """Return the actions, money and buys of a player."""
+    return p.actions, p.money, p.buys
@@ -0,0 +1,7 @@
+"""Provides tree search over games of Dominion."""
+
+from .mcts import MCTS
+from .mcts import Evaluator
+from .mcts import Node
+from .mcts import Tree
+from .mcts import uniform_evaluator
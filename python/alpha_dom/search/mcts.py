@@ -0,0 +1,396 @@
+"""Monte Carlo Tree Search over the buy phase of Dominion.
+
+The actions are those of `alpha_dom.env`: buying one of the kingdom cards of
+the board, or passing. Nodes are stored in a transposition table keyed by the
+Zobrist hash of the state (see `alpha_dom.state.zobrist`), so states reached by
+different orders of buys share statistics, and different draws after a shuffle
+lead to different nodes.
+
+Simulations run in lockstep, one per row of a `BatchedGame`: each round
+restores the root snapshot into every row, descends the tree in every row with
+virtual losses to spread the rows over different leaves, and then scores all
+the new leaves with a single call to the evaluator.
+
+The root snapshot includes the hidden zones of every player and the order of
+each draw pile. To search without knowing them, search from samples of
+`alpha_dom.belief.Beliefs.determinize` instead (determinization).
+"""
+
+import typing
+
+import numpy as np
+
+from alpha_dom import board
+from alpha_dom import encoding
+from alpha_dom import seeding
+from alpha_dom.engine import BatchedGame
+from alpha_dom.engine import Snapshot
+from alpha_dom.state import zobrist
+
+# An evaluator scores a batch of states from their (B, F) observations and (B, A)
+# legal action masks. It returns the (B, A) prior probability of each action, and
+# the (B,) value of each state for the player about to act, in [-1, 1].
+Evaluator = typing.Callable[
+    [np.ndarray, np.ndarray],
+    tuple[np.ndarray, np.ndarray],
+]
+
+VIRTUAL_LOSS = 1.0
+
+
+def uniform_evaluator(
+    observations: np.ndarray,
+    masks: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return uniform priors over the legal actions, and a value of 0."""
+    del observations
+    priors = masks / masks.sum(axis=1, keepdims=True)
+    return priors, np.zeros(len(masks))
+
+
+class Node(typing.NamedTuple):
+    """The statistics of the actions from a state.
+
+    Attributes:
+        player: The index of the player about to act.
+        mask: (A,) whether each action is legal.
+        prior: (A,) the prior probability of each action.
+        visits: (A,) the number of simulations through each action.
+        value_sum: (A,) the total value of those simulations for `player`.
+    """
+
+    player: int
+    mask: np.ndarray
+    prior: np.ndarray
+    visits: np.ndarray
+    value_sum: np.ndarray
+
+    def q(self) -> np.ndarray:
+        """Return the mean value of each action, or 0 if it was not visited."""
+        return self.value_sum / np.maximum(self.visits, 1)
+
+
+class Tree:
+    """The nodes of a search, as rows of arrays.
+
+    Storing the statistics of all nodes in a few arrays lets the actions of
+    many simulations be selected, and their values backed up, in vectorized
+    operations. Nodes are found by state hash through `index`, which makes the
+    tree a transposition table.
+
+    Attributes:
+        index: Maps the hash of each state to the row of its node.
+        player: (M,) the index of the player about to act at each node.
+        mask: (M, A) whether each action is legal.
+        prior: (M, A) the prior probability of each action.
+        visits: (M, A) the number of simulations through each action.
+        value_sum: (M, A) the total value of those simulations for the player.
+        total: (M,) the number of simulations through each node.
+    """
+
+    def __init__(self, num_actions: int, capacity: int = 1024) -> None:
+        """Initialize an empty tree.
+
+        Args:
+            num_actions: The number of actions from each state.
+            capacity: The initial number of rows. The arrays grow as needed.
+        """
+        self.index: dict[int, int] = {}
+        self.player = np.zeros(capacity, dtype=np.int32)
+        self.mask = np.zeros((capacity, num_actions), dtype=bool)
+        self.prior = np.zeros((capacity, num_actions))
+        self.visits = np.zeros((capacity, num_actions))
+        self.value_sum = np.zeros((capacity, num_actions))
+        self.total = np.zeros(capacity)
+
+    def __len__(self) -> int:
+        """Return the number of nodes."""
+        return len(self.index)
+
+    def node(self, key: int) -> Node:
+        """Return a copy of the statistics of the node of a state."""
+        i = self.index[key]
+        return Node(
+            int(self.player[i]),
+            self.mask[i].copy(),
+            self.prior[i].copy(),
+            self.visits[i].copy(),
+            self.value_sum[i].copy(),
+        )
+
+    def clear(self) -> None:
+        """Remove all nodes."""
+        self.index.clear()
+
+    def add(
+        self,
+        keys: list[int],
+        players: np.ndarray,
+        masks: np.ndarray,
+        priors: np.ndarray,
+    ) -> None:
+        """Add unvisited nodes for states that are not in the tree yet.
+
+        Args:
+            keys: The hash of each state.
+            players: (K,) the index of the player about to act.
+            masks: (K, A) whether each action is legal.
+            priors: (K, A) the prior probability of each action.
+        """
+        new = {k: j for j, k in enumerate(keys) if k not in self.index}
+        if not new:
+            return
+
+        start = len(self.index)
+        rows = np.arange(start, start + len(new))
+        if rows[-1] >= self.total.size:
+            self._grow(2 * (rows[-1] + 1))
+        self.index.update(zip(new, rows.tolist(), strict=True))
+
+        j = np.fromiter(new.values(), dtype=np.int64, count=len(new))
+        prior = np.where(masks[j], priors[j], 0)
+        prior /= np.maximum(prior.sum(axis=1, keepdims=True), 1e-12)
+        self.player[rows] = players[j]
+        self.mask[rows] = masks[j]
+        self.prior[rows] = prior
+        self.visits[rows] = 0
+        self.value_sum[rows] = 0
+        self.total[rows] = 0
+
+    def select(self, nodes: np.ndarray, c_puct: float) -> np.ndarray:
+        """Return the legal action with the highest PUCT score at each node.
+
+        Args:
+            nodes: (R,) the rows of distinct nodes.
+            c_puct: The weight of the prior.
+        """
+        visits = self.visits[nodes]
+        q = self.value_sum[nodes] / np.maximum(visits, 1)
+        u = np.sqrt(self.total[nodes] + 1)[:, None] * self.prior[nodes] / (1 + visits)
+        score = np.where(self.mask[nodes], q + c_puct * u, -np.inf)
+        return score.argmax(axis=1)
+
+    def _grow(self, capacity: int) -> None:
+        """Resize the arrays to hold the given number of nodes."""
+        for name in ("player", "mask", "prior", "visits", "value_sum", "total"):
+            old = getattr(self, name)
+            new = np.zeros((capacity, *old.shape[1:]), dtype=old.dtype)
+            new[: old.shape[0]] = old
+            setattr(self, name, new)
+
+
+class MCTS:
+    """A Monte Carlo Tree Search with batched leaf evaluation.
+
+    Attributes:
+        board: The board of the games to search.
+        evaluator: Scores batches of leaves.
+        batch_size: The number of simulations per round, and the most leaves
+            per call to the evaluator.
+        c_puct: The weight of the prior in the selection of actions.
+        tree: The nodes of the search, keyed by state hash.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        b: board.Board,
+        evaluator: Evaluator = uniform_evaluator,
+        num_players: int = 2,
+        *,
+        batch_size: int = 64,
+        c_puct: float = 1.25,
+        rng: seeding.RngLike = None,
+    ) -> None:
+        """Initialize the search.
+
+        Args:
+            b: The board of the games to search.
+            evaluator: Scores batches of leaves.
+            num_players: The number of players in each game.
+            batch_size: The number of simulations per round.
+            c_puct: The weight of the prior in the selection of actions.
+            rng: The random number generator used for shuffles in simulations,
+                or a seed for one.
+        """
+        self.board = b
+        self.evaluator = evaluator
+        self.batch_size = batch_size
+        self.c_puct = c_puct
+
+        self.game = BatchedGame.from_board(b, batch_size, num_players, rng=rng)
+        # The last column of the tables is padding, for passing.
+        self.tables = board.Tables.stack([b], len(b.kingdom_cards) + 1)
+        self.action_cards = self.tables.ids[0]
+        self.tree = Tree(self.num_actions)
+        self.encoder = encoding.BatchEncoder(batch_size, num_players)
+        self._observations = self.encoder.buffer()
+
+    @property
+    def num_actions(self) -> int:
+        """Return the number of actions, including passing."""
+        return self.action_cards.size
+
+    def clear(self) -> None:
+        """Forget all nodes, e.g. between games."""
+        self.tree.clear()
+
+    def search(self, root: Snapshot, num_simulations: int) -> Node:
+        """Run simulations from a state, and return the node of that state.
+
+        The visit counts of the root are the search policy. Nodes are kept in
+        the tree between calls, so later searches reuse earlier simulations. A
+        root that is not in the tree yet is expanded first, so that every
+        simulation reaches a leaf below it.
+
+        Args:
+            root: A snapshot of the state to search from, from
+                `BatchedGame.snapshot`, in its buy phase.
+            num_simulations: The minimum number of simulations to run. This is
+                rounded up to a multiple of `batch_size`.
+
+        Raises:
+            ValueError: If the game of the root has ended.
+        """
+        if root["done"]:
+            msg = "Cannot search from a finished game."
+            raise ValueError(msg)
+
+        first = np.zeros(1, dtype=np.int64)
+        self.game.restore(root, first)
+        key = int(zobrist.hash_games(self.game, first)[0])
+        if key not in self.tree.index:
+            self._expand([key] * self.batch_size, first)
+        for _ in range(-(-num_simulations // self.batch_size)):
+            self._simulate(root)
+        return self.tree.node(key)
+
+    def _simulate(self, root: Snapshot) -> None:
+        """Run one simulation from the root in each row of the batch."""
+        game, tree, n = self.game, self.tree, self.batch_size
+        game.restore(root)
+
+        # The (rows, nodes, actions) of each step of the descent.
+        steps: list[tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        keys = zobrist.hash_games(game).tolist()
+        rows = np.arange(n)
+
+        while True:
+            nodes = np.fromiter(
+                (tree.index.get(keys[i], -1) for i in rows.tolist()),
+                dtype=np.int64,
+                count=rows.size,
+            )
+            inner = (nodes >= 0) & ~game.done[rows]
+            rows, nodes = rows[inner], nodes[inner]
+            if rows.size == 0:
+                break
+
+            actions = self._select(nodes)
+            steps.append((rows, nodes, actions))
+
+            bought = np.full(n, -1, dtype=np.int32)
+            bought[rows] = self.action_cards[actions]
+            game.buy(bought)
+            end_turn = np.zeros(n, dtype=bool)
+            end_turn[rows] = (bought[rows] < 0) | (game.buys[rows] <= 0)
+            game.cleanup(end_turn)
+            game.play_treasures(end_turn)
+
+            new_keys = zobrist.hash_games(game, rows).tolist()
+            for i, key in zip(rows.tolist(), new_keys, strict=True):
+                keys[i] = key
+
+        values = self._expand(keys)
+        for rows, nodes, actions in steps:
+            player_values = values[rows, tree.player[nodes]]
+            np.add.at(tree.value_sum, (nodes, actions), player_values + VIRTUAL_LOSS)
+
+    def _select(self, nodes: np.ndarray) -> np.ndarray:
+        """Select an action at each node, and add a virtual loss to it.
+
+        Simulations at the same node are selected one after the other, so that
+        the virtual losses of earlier ones steer later ones to other actions.
+
+        Args:
+            nodes: (R,) the row of the node of each simulation, not distinct.
+        """
+        tree = self.tree
+        unique, inverse, counts = np.unique(
+            nodes,
+            return_inverse=True,
+            return_counts=True,
+        )
+        actions = np.zeros(nodes.size, dtype=np.int64)
+
+        single = counts[inverse] == 1
+        if single.any():
+            at = nodes[single]
+            actions[single] = tree.select(at, self.c_puct)
+            tree.total[at] += 1
+            tree.visits[at, actions[single]] += 1
+            tree.value_sum[at, actions[single]] -= VIRTUAL_LOSS
+
+        for u in np.flatnonzero(counts > 1).tolist():
+            at = int(unique[u])
+            visits, value_sum = tree.visits[at], tree.value_sum[at]
+            prior = np.where(tree.mask[at], self.c_puct * tree.prior[at], -np.inf)
+            picks = np.flatnonzero(inverse == u)
+            for i in picks.tolist():
+                u_score = np.sqrt(tree.total[at] + 1) * prior / (1 + visits)
+                a = int((value_sum / np.maximum(visits, 1) + u_score).argmax())
+                tree.total[at] += 1
+                visits[a] += 1
+                value_sum[a] -= VIRTUAL_LOSS
+                actions[i] = a
+        return actions
+
+    def _expand(self, keys: list[int], rows: np.ndarray | None = None) -> np.ndarray:
+        """Add the leaves of the batch to the tree, and return their values.
+
+        Args:
+            keys: The hash of the state of each row.
+            rows: The rows of the leaves. By default, all rows.
+
+        Returns:
+            (B, P) the value of the leaf of each row for each player, or 0 for
+            the other rows.
+        """
+        game = self.game
+        num_players = game.num_players
+        values = np.zeros((self.batch_size, num_players))
+        selected = np.ones(self.batch_size, dtype=bool)
+        if rows is not None:
+            selected[:] = False
+            selected[rows] = True
+
+        finished = game.done & selected
+        if finished.any():
+            values[finished] = game.outcomes()[finished]
+
+        leaves = np.flatnonzero(~game.done & selected)
+        if leaves.size:
+            self.encoder.encode(game, self._observations)
+            masks = board.buy_mask(
+                self.tables,
+                self.tables.gather(game.supply),
+                game.money,
+                game.buys,
+            )
+            masks[:, -1] = True
+            priors, leaf_values = self.evaluator(
+                self._observations[leaves],
+                masks[leaves],
+            )
+
+            # Zero-sum: the other players share the opposite of the value.
+            leaf_values = np.asarray(leaf_values, dtype=np.float64)
+            values[leaves] = (-leaf_values / max(num_players - 1, 1))[:, None]
+            values[leaves, game.current[leaves]] = leaf_values
+
+            self.tree.add(
+                [keys[i] for i in leaves.tolist()],
+                game.current[leaves],
+                masks[leaves],
+                np.asarray(priors, dtype=np.float64),
+            )
+        return values
@@ -0,0 +1,7 @@
+"""Provides reproducible random number streams for games and players."""
+
+from .streams import RngLike
+from .streams import clone
+from .streams import game_generators
+from .streams import generator
+from .streams import stream
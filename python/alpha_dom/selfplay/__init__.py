@@ -0,0 +1,9 @@
+"""Provides parallel self-play that writes training positions to disk."""
+
+from . import shards
+from .replay import Batch
+from .replay import ReplayBuffer
+from .runner import Config
+from .runner import Throughput
+from .runner import play_shard
+from .runner import run
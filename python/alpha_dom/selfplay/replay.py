@@ -0,0 +1,358 @@
+"""A replay buffer of training positions in memory-mapped files.
+
+The buffer is a directory holding one `.npy` file per column of
+`alpha_dom.selfplay.shards.COLUMNS`, each with room for `capacity` rows, a
+header, a sum tree of the priority of each row, and the end of each append.
+The header records the `cards.fingerprint` of the registry that the policies
+are indexed by:
+
+    root/
+        header.npy
+        observation.npy
+        policy.npy
+        outcome.npy
+        game.npy
+        priority.npy
+        ends.npy
+        lock
+
+The observations follow `encoding.layout` and the policies are indexed by card
+id, so rows from different boards share columns. The rows form a ring: appends
+overwrite the oldest rows once the buffer is full, and `evict` drops the oldest
+rows early. Positions are numbered by the order in which they were appended,
+and position `i` is stored in row `i % capacity`. Positions, not rows, identify
+samples, so a position that was overwritten is not mistaken for the new one in
+its row. `evict_shards` drops whole appends, e.g. shards of whole games, rather
+than a number of positions that may split a game.
+
+Any number of processes can open the same buffer, and appends and samples take
+a lock on the directory, so writers never interleave and samples never see rows
+that are half written.
+
+The files are mapped, not read: sampling a minibatch gathers its rows from the
+maps with one fancy index per column, and prioritized sampling walks the sum
+tree for all samples at once, reading O(log(capacity)) priorities per sample.
+"""
+
+import contextlib
+import fcntl
+import pathlib
+import typing
+
+import numpy as np
+
+from alpha_dom import cards
+from alpha_dom import encoding
+
+from . import shards
+
+HEADER = np.dtype(
+    [
+        ("total", np.int64),
+        ("start", np.int64),
+        ("appends", np.int64),
+        ("max_priority", np.float64),
+        ("registry", "S16"),
+    ],
+)
+
+
+def _specs(capacity: int, num_players: int) -> dict[str, tuple[tuple[int, ...], type]]:
+    """Return the shape and dtype of each column."""
+    return {
+        "observation": ((capacity, encoding.observation_size(num_players)), np.float32),
+        "policy": ((capacity, cards.num_cards() + 1), np.float32),
+        "outcome": ((capacity,), np.int8),
+        "game": ((capacity,), np.int64),
+    }
+
+
+class Batch(typing.NamedTuple):
+    """A minibatch of positions.
+
+    Attributes:
+        indices: (B,) the positions, to update their priorities.
+        observation: (B, F) observations.
+        policy: (B, C + 1) policy targets.
+        outcome: (B,) outcomes.
+        weight: (B,) importance sampling weights, all ones for uniform samples.
+    """
+
+    indices: np.ndarray
+    observation: np.ndarray
+    policy: np.ndarray
+    outcome: np.ndarray
+    weight: np.ndarray
+
+
+class ReplayBuffer:
+    """A ring of training positions in memory-mapped files."""
+
+    def __init__(self, root: pathlib.Path) -> None:
+        """Open an existing buffer. See `create` to make a new one.
+
+        Args:
+            root: The directory of the buffer.
+
+        Raises:
+            ValueError: If the buffer was created with another registry of cards.
+        """
+        self.root = root
+        self._header = np.load(root / "header.npy", mmap_mode="r+")
+        registry = self._header["registry"][0].decode()
+        if registry != cards.fingerprint():
+            msg = f"{root} has the registry {registry}, not {cards.fingerprint()}."
+            raise ValueError(msg)
+        self.columns: dict[str, np.ndarray] = {
+            name: np.load(root / f"{name}.npy", mmap_mode="r+")
+            for name in shards.COLUMNS
+        }
+        self._tree = np.load(root / "priority.npy", mmap_mode="r+")
+        # The end position of append `k` is at `_ends[k % capacity]`. Appends
+        # keep at least one position, so at most `capacity` of them are live.
+        self._ends = np.load(root / "ends.npy", mmap_mode="r+")
+        self.capacity = len(self.columns["game"])
+        # The leaves of the sum tree start at `_leaves`, a power of two.
+        self._leaves = len(self._tree) // 2
+        self._depth = self._leaves.bit_length() - 1
+        self._lock = (root / "lock").open("a")
+
+    @classmethod
+    def create(
+        cls,
+        root: pathlib.Path,
+        capacity: int,
+        num_players: int = 2,
+    ) -> "ReplayBuffer":
+        """Create an empty buffer, replacing any buffer in the directory.
+
+        Args:
+            root: The directory of the buffer.
+            capacity: The number of positions that the buffer holds.
+            num_players: The number of players in the games of the positions.
+        """
+        root.mkdir(parents=True, exist_ok=True)
+        for name, (shape, dtype) in _specs(capacity, num_players).items():
+            np.lib.format.open_memmap(root / f"{name}.npy", "w+", dtype, shape)
+        leaves = 1 << max(capacity - 1, 0).bit_length()
+        np.lib.format.open_memmap(
+            root / "priority.npy",
+            "w+",
+            np.float64,
+            (2 * leaves,),
+        )
+        np.lib.format.open_memmap(root / "ends.npy", "w+", np.int64, (capacity,))
+        header = np.lib.format.open_memmap(root / "header.npy", "w+", HEADER, (1,))
+        header["max_priority"] = 1.0
+        header["registry"] = cards.fingerprint()
+        header.flush()
+        return cls(root)
+
+    def close(self) -> None:
+        """Release the lock file. The maps are released with the buffer."""
+        self._lock.close()
+
+    def __enter__(self) -> typing.Self:
+        """Return the buffer, to be closed at the end of a with block."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Close the buffer."""
+        self.close()
+
+    @contextlib.contextmanager
+    def _locked(self, *, exclusive: bool) -> typing.Iterator[tuple[int, int]]:
+        """Hold the lock of the directory, and yield the first and end rows."""
+        fcntl.flock(self._lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield int(self._header["start"][0]), int(self._header["total"][0])
+        finally:
+            fcntl.flock(self._lock, fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        """Return the number of positions in the buffer."""
+        with self._locked(exclusive=False) as (start, end):
+            return end - start
+
+    @property
+    def total(self) -> int:
+        """Return the number of positions ever appended."""
+        return int(self._header["total"][0])
+
+    def append(
+        self,
+        columns: typing.Mapping[str, np.ndarray],
+        priority: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Append positions, overwriting the oldest positions if full.
+
+        Args:
+            columns: An array for each of `shards.COLUMNS`, with one row per
+                position.
+            priority: The priority of each position. By default, the highest
+                priority seen so far, so new positions are sampled soon.
+
+        Returns:
+            The positions that were kept, as in `Batch.indices`: only the last
+            `capacity` positions are kept if more are appended.
+        """
+        m = len(columns["game"])
+        keep = slice(max(0, m - self.capacity), m)
+        with self._locked(exclusive=True) as (start, end):
+            kept = end + np.arange(m)[keep]
+            rows = kept % self.capacity
+            for name, column in self.columns.items():
+                column[rows] = columns[name][keep]
+
+            if priority is None:
+                priority = np.full(m, self._header["max_priority"][0])
+            self._set_priority(rows, np.asarray(priority)[keep])
+
+            if m:
+                appends = int(self._header["appends"][0])
+                self._ends[appends % self.capacity] = end + m
+                self._header["appends"] = appends + 1
+            self._header["total"] = end + m
+            self._header["start"] = max(start, end + m - self.capacity)
+        return kept
+
+    def append_shard(self, path: pathlib.Path) -> np.ndarray:
+        """Append the positions of a self-play shard. See `append`.
+
+        The shard is a single append, so `evict_shards` drops it whole.
+        """
+        return self.append(shards.read_shard(path))
+
+    def evict(self, num_positions: int) -> None:
+        """Drop the oldest positions.
+
+        This can split an append, and so a shard or a game. See `evict_shards`.
+
+        Args:
+            num_positions: The number of positions to drop.
+        """
+        with self._locked(exclusive=True) as (start, end):
+            self._evict(start, min(end, start + num_positions))
+
+    def evict_shards(self, num_shards: int) -> None:
+        """Drop the positions of the oldest appends, e.g. of `append_shard`.
+
+        An append whose oldest positions were already overwritten or evicted
+        counts as one, and its remaining positions are dropped.
+
+        Args:
+            num_shards: The number of appends to drop.
+        """
+        if num_shards <= 0:
+            return
+        with self._locked(exclusive=True) as (start, end):
+            appends = int(self._header["appends"][0])
+            live = np.arange(max(0, appends - self.capacity), appends)
+            ends = self._ends[live % self.capacity]
+            ends = ends[ends > start]
+            stop = int(ends[num_shards - 1]) if num_shards < len(ends) else end
+            self._evict(start, stop)
+
+    def update_priorities(self, indices: np.ndarray, priority: np.ndarray) -> None:
+        """Set the priorities of some positions.
+
+        Positions that were evicted or overwritten since they were sampled are
+        skipped, so that they are not sampled again and the positions that
+        replaced them keep their priorities.
+
+        Args:
+            indices: The positions, as in `Batch.indices`.
+            priority: The new priority of each position.
+        """
+        indices, priority = np.asarray(indices), np.asarray(priority)
+        with self._locked(exclusive=True) as (start, end):
+            live = (start <= indices) & (indices < end)
+            self._set_priority(indices[live] % self.capacity, priority[live])
+
+    def sample(
+        self,
+        batch_size: int,
+        rng: np.random.Generator,
+        *,
+        prioritized: bool = False,
+        beta: float = 0.4,
+    ) -> Batch:
+        """Sample a minibatch of positions, with replacement.
+
+        Args:
+            batch_size: The number of positions.
+            rng: The random number generator.
+            prioritized: Whether to sample in proportion to the priorities,
+                instead of uniformly.
+            beta: How much the importance sampling weights correct for the
+                priorities, from 0 (not at all) to 1 (fully).
+
+        Raises:
+            ValueError: If the buffer is empty, or if all its priorities are zero
+                when sampling by priority.
+        """
+        with self._locked(exclusive=False) as (start, end):
+            size = end - start
+            if size == 0:
+                msg = "Cannot sample from an empty replay buffer."
+                raise ValueError(msg)
+
+            if prioritized:
+                if not self._tree[1] > 0:
+                    msg = "Cannot sample when all the priorities are zero."
+                    raise ValueError(msg)
+                rows = self._descend(rng.random(batch_size) * self._tree[1])
+                probability = self._tree[self._leaves + rows] / self._tree[1]
+                weight = (size * probability) ** -beta
+                weight /= weight.max()
+                # Only live rows have a priority, and each holds the one live
+                # position at or after `start` in it.
+                indices = start + (rows - start) % self.capacity
+            else:
+                indices = start + rng.integers(size, size=batch_size)
+                rows = indices % self.capacity
+                weight = np.ones(batch_size)
+
+            return Batch(
+                indices=indices,
+                observation=self.columns["observation"][rows],
+                policy=self.columns["policy"][rows],
+                outcome=self.columns["outcome"][rows],
+                weight=weight.astype(np.float32),
+            )
+
+    def _evict(self, start: int, stop: int) -> None:
+        """Drop the positions from `start` to `stop`, holding the lock."""
+        rows = np.arange(start, stop) % self.capacity
+        self._set_priority(rows, np.zeros(len(rows)))
+        self._header["start"] = stop
+
+    def _descend(self, targets: np.ndarray) -> np.ndarray:
+        """Return the row at which the cumulative priority exceeds each target.
+
+        Rounding errors can push a target past the sum of the right subtree, so
+        the walk never takes a subtree without priority. It only reaches rows
+        with a positive priority, if the sum of the tree is positive.
+        """
+        tree, nodes = self._tree, np.ones(len(targets), dtype=np.int64)
+        for _ in range(self._depth):
+            left = 2 * nodes
+            right = (targets >= tree[left]) & (tree[left + 1] > 0)
+            targets = targets - np.where(right, tree[left], 0.0)
+            nodes = left + right
+        return nodes - self._leaves
+
+    def _set_priority(self, rows: np.ndarray, priority: np.ndarray) -> None:
+        """Set the priorities of some rows, and update their sums in the tree."""
+        if not len(rows):
+            return
+        tree = self._tree
+        nodes = rows + self._leaves
+        tree[nodes] = priority
+        self._header["max_priority"] = max(
+            float(self._header["max_priority"][0]),
+            float(priority.max()),
+        )
+        for _ in range(self._depth):
+            nodes = np.unique(nodes // 2)
+            tree[nodes] = tree[2 * nodes] + tree[2 * nodes + 1]
@@ -0,0 +1,268 @@
+"""Parallel self-play that writes training positions to disk.
+
+The games of a run are split into shards of `games_per_shard` games each (see
+`alpha_dom.selfplay.shards`). Shard `k` is generated from `seeding.stream(seed,
+k)` alone: its boards are drawn and its games are played with that stream.
+So any worker can generate any shard, the output does not depend on the number
+of workers, and a crashed run is resumed by generating only the shards missing
+from the index.
+
+A worker plays the games of a shard in a `BatchedEnv` of `num_envs` concurrent
+games. With `num_simulations` set, each position is searched with `MCTS` (see
+`alpha_dom.search`), and the action is sampled from the visit counts of the
+root, which are recorded as the policy target. Otherwise the action is sampled
+from the priors of the evaluator, and the priors are recorded instead. Those
+targets are only a placeholder for bootstrapping: a network trained on its own
+priors learns nothing new. The search sees the hidden zones of every player,
+so its targets are those of a perfect-information game.
+
+The shard keeps the first `games_per_shard` games to start, and plays until
+they have all finished. Finished environments start new games, which are not
+recorded, so that short games are not favored over long ones.
+"""
+
+import contextlib
+import functools
+import multiprocessing
+import pathlib
+import time
+import typing
+
+import numpy as np
+
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import search
+from alpha_dom import seeding
+from alpha_dom.env import BatchedEnv
+from alpha_dom.env.environment import MAX_TURNS
+
+from . import shards
+
+
+class Config(typing.NamedTuple):
+    """The settings of a self-play run.
+
+    Attributes:
+        root: The directory of the dataset.
+        num_shards: The number of shards to generate.
+        games_per_shard: The number of games in each shard.
+        num_envs: The number of games that a worker plays concurrently.
+        num_players: The number of players in each game.
+        suggested: The board to play on. Each shard draws random boards if None.
+        max_turns: The number of turns after which a game is truncated.
+        seed: The master seed.
+        evaluator: The source of the priors and values of the search, or of
+            the priors that actions are sampled from without one. It must be
+            picklable, e.g. a module-level function.
+        num_simulations: The number of simulations of the search at each
+            position. If 0, the priors of the evaluator are recorded as policy
+            targets, which is only a placeholder until a search is used.
+    """
+
+    root: pathlib.Path
+    num_shards: int
+    games_per_shard: int = 64
+    num_envs: int = 16
+    num_players: int = 2
+    suggested: board.SuggestedSet | None = None
+    max_turns: int = MAX_TURNS
+    seed: int = 0
+    evaluator: search.Evaluator = search.uniform_evaluator
+    num_simulations: int = 0
+
+
+class Throughput(typing.NamedTuple):
+    """The work done by a run, and how long it took."""
+
+    games: int
+    positions: int
+    seconds: float
+
+    @property
+    def games_per_second(self) -> float:
+        """Return the number of games generated per second."""
+        return self.games / self.seconds if self.seconds else 0.0
+
+    @property
+    def positions_per_second(self) -> float:
+        """Return the number of positions generated per second."""
+        return self.positions / self.seconds if self.seconds else 0.0
+
+
+def _boards(config: Config, rng: np.random.Generator) -> list[board.Board]:
+    """Return the board of each environment of a shard."""
+    if config.suggested is not None:
+        return [board.load_suggested(config.suggested)] * config.num_envs
+    return [board.load_random(rng) for _ in range(config.num_envs)]
+
+
+def _sample(priors: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Return an action sampled from each row of (N, A) priors."""
+    cumulative = priors.cumsum(axis=1)
+    threshold = rng.random(len(priors)) * cumulative[:, -1]
+    # The first action whose cumulative prior exceeds the threshold has a positive
+    # prior, even with rounding errors in the sum.
+    return (cumulative > threshold[:, None]).argmax(axis=1)
+
+
+def _search(  # noqa: PLR0913
+    config: Config,
+    env: BatchedEnv,
+    searches: dict[int, search.MCTS],
+    live: np.ndarray,
+    priors: np.ndarray,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    """Return the search policy of the live environments.
+
+    Returns:
+        (N, A) the normalized visit counts of the root in each live environment,
+        and the `priors` of the others, whose positions are not recorded.
+    """
+    visits = priors.copy()
+    for i in np.flatnonzero(live):
+        b = env.game.boards[i]
+        if id(b) not in searches:
+            searches[id(b)] = search.MCTS(
+                b,
+                config.evaluator,
+                config.num_players,
+                batch_size=min(config.num_simulations, 64),
+                rng=rng,
+            )
+        node = searches[id(b)].search(env.game.snapshot(i), config.num_simulations)
+        # The search has no padding: its last action is passing.
+        visits[i] = 0
+        visits[i, : node.visits.size - 1] = node.visits[:-1]
+        visits[i, -1] = node.visits[-1]
+        visits[i] /= node.visits.sum()
+    return visits
+
+
+def play_shard(config: Config, shard: int) -> dict[str, np.ndarray]:
+    """Play the games of a shard and return its columns.
+
+    The positions are grouped by game, in the order in which the games started.
+    See `shards.COLUMNS`.
+
+    Args:
+        config: The settings of the run.
+        shard: The index of the shard.
+    """
+    rng = seeding.generator(config.seed, shard)
+    env = BatchedEnv(
+        _boards(config, rng),
+        config.num_players,
+        max_turns=config.max_turns,
+        rng=rng,
+    )
+    n, c = env.num_envs, cards.num_cards()
+    rows = np.arange(n)[:, None]
+    # The policy column of each action: the id of the card it buys, or passing.
+    columns = np.where(env.action_cards < 0, c, env.action_cards)
+
+    steps: dict[str, list[np.ndarray]] = {
+        "observation": [],
+        "policy": [],
+        "player": [],
+        "game": [],
+    }
+    # Games are numbered in the order in which they start, and only the first
+    # `games_per_shard` are kept.
+    kept = config.games_per_shard
+    game_of_env = np.arange(n)
+    next_game = n
+    outcome = np.zeros((kept, config.num_players), dtype=np.int8)
+    num_finished = 0
+    # One search per board. Their trees are kept for the whole shard, so that
+    # positions that recur across games reuse earlier simulations.
+    searches: dict[int, search.MCTS] = {}
+
+    out = env.reset()
+    while num_finished < kept:
+        live = game_of_env < kept
+        priors, _ = config.evaluator(out.observation, out.action_mask)
+        priors = np.where(out.action_mask, priors, 0.0)
+        priors /= priors.sum(axis=1, keepdims=True)
+        if config.num_simulations > 0:
+            priors = _search(config, env, searches, live, priors, rng)
+        policy = np.zeros((n, c + 1), dtype=np.float32)
+        np.add.at(policy, (rows, columns), priors)
+
+        steps["observation"].append(out.observation[live])
+        steps["policy"].append(policy[live])
+        steps["player"].append(env.game.current[live])
+        steps["game"].append(game_of_env[live])
+
+        out = env.step(_sample(priors, rng))
+        for i in np.flatnonzero(out.terminated | out.truncated):
+            if game_of_env[i] < kept:
+                outcome[game_of_env[i]] = out.outcome[i]
+                num_finished += 1
+            game_of_env[i] = next_game
+            next_game += 1
+
+    game = np.concatenate(steps["game"])
+    player = np.concatenate(steps["player"])
+    order = np.argsort(game, kind="stable")
+    return {
+        "observation": np.concatenate(steps["observation"])[order],
+        "policy": np.concatenate(steps["policy"])[order],
+        "outcome": outcome[game, player][order],
+        "game": shard * kept + game[order],
+    }
+
+
+def _generate(config: Config, shard: int) -> shards.Entry:
+    """Play the games of a shard and write it to disk."""
+    start = time.perf_counter()
+    columns = play_shard(config, shard)
+    shards.write_shard(config.root, shard, columns)
+    return shards.Entry(
+        shard=shard,
+        games=config.games_per_shard,
+        positions=len(columns["game"]),
+        seconds=time.perf_counter() - start,
+    )
+
+
+def run(
+    config: Config,
+    num_workers: int = 1,
+    *,
+    context: str | None = None,
+) -> Throughput:
+    """Generate the shards of a run that are missing from its index.
+
+    Args:
+        config: The settings of the run.
+        num_workers: The number of worker processes. With one, the shards are
+            generated in this process.
+        context: The multiprocessing start method, e.g. "fork" or "spawn".
+
+    Returns:
+        The games and positions generated by this call, and the time taken.
+    """
+    config.root.mkdir(parents=True, exist_ok=True)
+    done = shards.read_index(config.root)
+    pending = [k for k in range(config.num_shards) if k not in done]
+    generate = functools.partial(_generate, config)
+
+    start = time.perf_counter()
+    games = positions = 0
+    entries: typing.Iterable[shards.Entry]
+    with contextlib.ExitStack() as stack:
+        if num_workers > 1:
+            ctx = multiprocessing.get_context(context)
+            pool = stack.enter_context(ctx.Pool(num_workers))
+            entries = pool.imap_unordered(generate, pending)
+        else:
+            entries = map(generate, pending)
+
+        for entry in entries:
+            shards.append_index(config.root, entry)
+            games += entry.games
+            positions += entry.positions
+
+    return Throughput(games, positions, time.perf_counter() - start)
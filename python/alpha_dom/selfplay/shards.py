@@ -0,0 +1,154 @@
+"""Columnar shards of self-play positions on disk.
+
+A dataset is a directory of shards and an index:
+
+    root/
+        index.jsonl
+        shard-000000/observation.npy
+        shard-000000/policy.npy
+        shard-000000/outcome.npy
+        shard-000000/game.npy
+        shard-000000/registry
+        ...
+
+Each shard holds the positions of a fixed number of complete games, one `.npy`
+file per column, so that columns can be memory-mapped on their own. The policy
+columns are indexed by card id, so a shard also records the `cards.fingerprint`
+of the registry, and is only read with the same registry. A shard is
+written to a temporary directory and renamed into place, and its line is
+appended to the index only once it is complete. The index is therefore the
+record of finished work: a shard without a line in the index is redone.
+"""
+
+import json
+import os
+import pathlib
+import shutil
+import typing
+
+import numpy as np
+
+from alpha_dom import cards
+
+INDEX = "index.jsonl"
+
+# The columns of a shard, with one row per position:
+#   observation: (M, F) float32 observation of the player about to act.
+#   policy: (M, C + 1) float32 probability of buying each card, by card id, with
+#       passing in the last column.
+#   outcome: (M,) int8 outcome of the game for the player who acted.
+#   game: (M,) int64 index of the game in the dataset.
+COLUMNS = ("observation", "policy", "outcome", "game")
+
+
+class Entry(typing.NamedTuple):
+    """The line of a finished shard in the index.
+
+    Attributes:
+        shard: The index of the shard.
+        games: The number of games in the shard.
+        positions: The number of positions in the shard.
+        seconds: The time taken to generate the shard.
+    """
+
+    shard: int
+    games: int
+    positions: int
+    seconds: float
+
+
+def shard_path(root: pathlib.Path, shard: int) -> pathlib.Path:
+    """Return the directory of a shard."""
+    return root / f"shard-{shard:06d}"
+
+
+def write_shard(
+    root: pathlib.Path,
+    shard: int,
+    columns: dict[str, np.ndarray],
+) -> pathlib.Path:
+    """Write the columns of a shard, replacing any partial copy of it.
+
+    Args:
+        root: The directory of the dataset.
+        shard: The index of the shard.
+        columns: An array for each of `COLUMNS`, with the same number of rows.
+
+    Returns:
+        The directory of the shard.
+
+    Raises:
+        ValueError: If a column is missing or the columns differ in length.
+    """
+    if sorted(columns) != sorted(COLUMNS):
+        msg = f"Expected the columns {COLUMNS}, got {tuple(columns)}."
+        raise ValueError(msg)
+    if len({len(a) for a in columns.values()}) != 1:
+        msg = "The columns of a shard must have the same number of rows."
+        raise ValueError(msg)
+
+    path = shard_path(root, shard)
+    tmp = path.with_name(f".{path.name}.tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    for name, array in columns.items():
+        np.save(tmp / f"{name}.npy", array)
+    (tmp / "registry").write_text(cards.fingerprint())
+    shutil.rmtree(path, ignore_errors=True)
+    tmp.rename(path)
+    return path
+
+
+def read_shard(path: pathlib.Path, *, mmap: bool = True) -> dict[str, np.ndarray]:
+    """Read the columns of a shard.
+
+    Args:
+        path: The directory of the shard.
+        mmap: Whether to memory-map the columns instead of reading them.
+
+    Raises:
+        ValueError: If the shard was written with another registry of cards.
+    """
+    registry = (path / "registry").read_text()
+    if registry != cards.fingerprint():
+        msg = f"{path} has the registry {registry}, not {cards.fingerprint()}."
+        raise ValueError(msg)
+    mode: typing.Literal["r"] | None = "r" if mmap else None
+    return {name: np.load(path / f"{name}.npy", mmap_mode=mode) for name in COLUMNS}
+
+
+def read_index(root: pathlib.Path) -> dict[int, Entry]:
+    """Return the entries of the finished shards of a dataset, by shard.
+
+    A line cut short by a crash is ignored, so its shard is redone.
+    """
+    path = root / INDEX
+    if not path.exists():
+        return {}
+
+    entries = {}
+    with path.open() as f:
+        for line in f:
+            try:
+                entry = Entry(**json.loads(line))
+            except (json.JSONDecodeError, TypeError):
+                continue
+            entries[entry.shard] = entry
+    return entries
+
+
+def append_index(root: pathlib.Path, entry: Entry) -> None:
+    """Record a finished shard in the index of a dataset."""
+    path = root / INDEX
+    line = json.dumps(entry._asdict()) + "\n"
+    if path.exists() and path.stat().st_size:
+        with path.open("rb") as f:
+            f.seek(-1, os.SEEK_END)
+            # Start a new line after a line cut short by a crash.
+            if f.read() != b"\n":
+                line = "\n" + line
+
+    with path.open("a") as f:
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
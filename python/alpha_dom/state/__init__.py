@@ -0,0 +1,10 @@
+"""Provides snapshots, undo logs and hashes of the state of games."""
+
+from . import codec
+from . import zobrist
+from .snapshot import PlayerSnapshot
+from .snapshot import Snapshot
+from .snapshot import restore
+from .snapshot import snapshot
+from .undo import Tracked
+from .undo import UndoLog
@@ -0,0 +1,236 @@
+"""A compact binary codec of the states of games, for many states at a time.
+
+Each state, a `Snapshot`, is encoded into one record of a fixed layout, see
+`dtype`. A batch of states is a structured array of such records, so it can be
+written to one buffer with `tobytes` and read back with `np.frombuffer`, e.g. to
+checkpoint many games or to send them to another process:
+
+    buffer = codec.encode(snapshots).tobytes()
+    snapshots = codec.decode(np.frombuffer(buffer, codec.dtype(num_players)))
+
+The zones that a `Board` or `Player` keeps as counts (the supply, the trash, and
+the hand, discard pile and `shuffled` cards of each player) are stored as the
+count of each card id, with the ids of their keys in order. The draw pile and the
+play area are stored as ids in order. Nothing is lost: a decoded snapshot equals
+the original, and its dicts iterate in the same order, so a player restored from
+it shuffles and draws exactly like the original.
+"""
+
+import functools
+import typing
+
+import numpy as np
+
+from alpha_dom import cards
+
+from .snapshot import PlayerSnapshot
+from .snapshot import Snapshot
+
+# The most cards in the draw pile or the play area of a player.
+CAPACITY = 128
+# The zones of a player that are stored as counts, in the order of
+# `PlayerSnapshot`.
+COUNT_ZONES = ("shuffled", "hand", "discard_pile")
+
+
+@functools.cache
+def dtype(num_players: int, capacity: int = CAPACITY) -> np.dtype:
+    """Return the layout of the records of states.
+
+    A record has these fields, where `Z` is the number of zones stored as counts
+    (the supply, the trash, then `COUNT_ZONES` of each player) and `C` is the
+    number of cards:
+
+        registry       ()                       the `cards.fingerprint` of the ids
+        num_keys       (Z,)                     the number of keys of each zone
+        keys           (Z, C)                   the ids of the keys, in order
+        counts         (Z, C)                   the count of each card
+        draw_size      (num_players,)           the length of `draw_pile`
+        draw_pile      (num_players, capacity)  the ids of the draw pile
+        play_size      (num_players,)           the length of `cards_in_play`
+        cards_in_play  (num_players, capacity)  the ids of the play area
+        resources      (num_players, 3)         the actions, money and buys
+
+    Args:
+        num_players: The number of players.
+        capacity: The most cards in the draw pile or the play area of a player.
+    """
+    zones = 2 + len(COUNT_ZONES) * num_players
+    c = cards.num_cards()
+    return np.dtype(
+        [
+            ("registry", "S16"),
+            ("num_keys", "u1", (zones,)),
+            ("keys", "u1", (zones, c)),
+            ("counts", "u1", (zones, c)),
+            ("draw_size", "<u2", (num_players,)),
+            ("draw_pile", "u1", (num_players, capacity)),
+            ("play_size", "<u2", (num_players,)),
+            ("cards_in_play", "u1", (num_players, capacity)),
+            ("resources", "<i2", (num_players, 3)),
+        ],
+    )
+
+
+def _count_zones(s: Snapshot) -> list[dict[cards.Card, int]]:
+    """Return the zones of a snapshot that are stored as counts, in order."""
+    return [
+        s.supply,
+        s.trash,
+        *(getattr(ps, zone) for ps in s.players for zone in COUNT_ZONES),
+    ]
+
+
+@functools.cache
+def _card_ids() -> dict[int, int]:
+    """Return the id of each card in the registry, keyed by the `id` of the object.
+
+    Cards are interned, and looking them up by identity is several times faster
+    than by `Card.id` or by their hash.
+    """
+    return {id(card): i for i, card in enumerate(cards.registry().by_id)}
+
+
+def encode(
+    snapshots: typing.Sequence[Snapshot],
+    *,
+    capacity: int = CAPACITY,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Encode states into records.
+
+    Args:
+        snapshots: The states, with the same number of players.
+        capacity: The most cards in the draw pile or the play area of a player.
+        out: The array to write the records to, e.g. a view of shared memory.
+            It must have the dtype of the states, and one record per state.
+
+    Returns:
+        (N,) the records, of `dtype(num_players, capacity)`.
+
+    Raises:
+        ValueError: If a state does not fit the layout.
+    """
+    n = len(snapshots)
+    num_players = len(snapshots[0].players) if snapshots else 0
+    if any(len(s.players) != num_players for s in snapshots):
+        msg = "The states do not have the same number of players."
+        raise ValueError(msg)
+    layout = dtype(num_players, capacity)
+    if out is None:
+        out = np.zeros(n, dtype=layout)
+    elif out.dtype != layout or out.shape != (n,):
+        msg = f"Expected {n} records of {layout}, got {out.dtype}."
+        raise ValueError(msg)
+
+    # Gather the fields of all the states into flat buffers, and write each
+    # field of the records at once.
+    num_cards = cards.num_cards()
+    card_ids = _card_ids().__getitem__
+    keys = bytearray(n * out["keys"][0].size)
+    piles = bytearray(n * num_players * 2 * capacity)
+    num_keys: list[int] = []
+    counts: list[int] = []
+    sizes: list[int] = []
+    resources: list[int] = []
+    for s in snapshots:
+        for zone in _count_zones(s):
+            start = len(num_keys) * num_cards
+            keys[start : start + len(zone)] = bytes(map(card_ids, map(id, zone)))
+            num_keys.append(len(zone))
+            counts.extend(zone.values())
+        for ps in s.players:
+            for pile in (ps.draw_pile, ps.cards_in_play):
+                if len(pile) > capacity:
+                    msg = f"A pile has {len(pile)} cards, but room for {capacity}."
+                    raise ValueError(msg)
+                start = len(sizes) * capacity
+                piles[start : start + len(pile)] = bytes(map(card_ids, map(id, pile)))
+                sizes.append(len(pile))
+            resources.extend((ps.actions, ps.money, ps.buys))
+
+    try:
+        values = np.frombuffer(bytes(counts), dtype=np.uint8)
+    except ValueError as e:
+        msg = f"A count of the states is out of range: {e}"
+        raise ValueError(msg) from e
+
+    out["registry"] = cards.fingerprint()
+    out["num_keys"] = np.reshape(num_keys, out["num_keys"].shape)
+    key_ids = np.frombuffer(keys, dtype=np.uint8).reshape(out["keys"].shape)
+    out["keys"] = key_ids
+    valid = np.arange(num_cards) < out["num_keys"][..., np.newaxis]
+    rows, zones, _ = np.nonzero(valid)
+    out["counts"] = 0
+    out["counts"][rows, zones, key_ids[valid]] = values
+    both = np.reshape(sizes, (n, num_players, 2))
+    out["draw_size"], out["play_size"] = both[..., 0], both[..., 1]
+    both = np.frombuffer(piles, dtype=np.uint8).reshape(n, num_players, 2, capacity)
+    out["draw_pile"], out["cards_in_play"] = both[:, :, 0], both[:, :, 1]
+    out["resources"] = np.reshape(resources, (n, num_players, 3))
+    return out
+
+
+def decode(records: np.ndarray) -> list[Snapshot]:
+    """Decode records into states.
+
+    Args:
+        records: (N,) the records, of the dtype of `encode`.
+
+    Returns:
+        The states.
+
+    Raises:
+        ValueError: If the records were encoded with another registry of cards.
+    """
+    layout: np.dtype = records.dtype
+    num_players, capacity = layout["draw_pile"].shape
+    if layout != dtype(num_players, capacity):
+        msg = f"The records do not have the layout of {cards.num_cards()} cards."
+        raise ValueError(msg)
+    if (records["registry"] != cards.fingerprint().encode()).any():
+        msg = f"The records were not encoded with the registry {cards.fingerprint()}."
+        raise ValueError(msg)
+
+    # Slices of bytes are much faster to read than lists of numpy scalars.
+    by_id = cards.registry().by_id.__getitem__
+    num_cards = cards.num_cards()
+    zones_per_state = layout["keys"].shape[0]
+    num_keys = records["num_keys"].tolist()
+    keys = records["keys"].tobytes()
+    counts = records["counts"].tobytes()
+    draw_size = records["draw_size"].tolist()
+    draw_pile = records["draw_pile"].tobytes()
+    play_size = records["play_size"].tolist()
+    cards_in_play = records["cards_in_play"].tobytes()
+    resources = records["resources"].tolist()
+
+    snapshots = []
+    for row in range(len(records)):
+        zones = []
+        for z, size in enumerate(num_keys[row]):
+            start = (row * zones_per_state + z) * num_cards
+            ids = keys[start : start + size]
+            zone_counts = counts[start : start + num_cards].__getitem__
+            zones.append(dict(zip(map(by_id, ids), map(zone_counts, ids), strict=True)))
+        players = []
+        for i in range(num_players):
+            start = (row * num_players + i) * capacity
+            draw = draw_pile[start : start + draw_size[row][i]]
+            play = cards_in_play[start : start + play_size[row][i]]
+            shuffled, hand, discard_pile = zones[2 + 3 * i : 5 + 3 * i]
+            actions, money, buys = resources[row][i]
+            players.append(
+                PlayerSnapshot(
+                    tuple(map(by_id, draw)),
+                    shuffled,
+                    hand,
+                    discard_pile,
+                    tuple(map(by_id, play)),
+                    actions,
+                    money,
+                    buys,
+                ),
+            )
+        snapshots.append(Snapshot(zones[0], zones[1], tuple(players)))
+    return snapshots
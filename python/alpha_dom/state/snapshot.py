@@ -0,0 +1,89 @@
+"""Cheap snapshots of the state of a `Board` and its `Player`s.
+
+Cards are interned and immutable, so a snapshot only needs shallow copies of the
+dicts and lists of each zone, instead of a deep copy of the pydantic models.
+"""
+
+import typing
+
+from alpha_dom import cards
+
+if typing.TYPE_CHECKING:
+    from alpha_dom import board
+    from alpha_dom import player
+
+
+class PlayerSnapshot(typing.NamedTuple):
+    """The zones and resources of a player."""
+
+    draw_pile: tuple[cards.Card, ...]
+    shuffled: dict[cards.Card, int]
+    hand: dict[cards.Card, int]
+    discard_pile: dict[cards.Card, int]
+    cards_in_play: tuple[cards.Card, ...]
+    actions: int
+    money: int
+    buys: int
+
+
+class Snapshot(typing.NamedTuple):
+    """The supply and trash of a board, and the state of each player."""
+
+    supply: dict[cards.Card, int]
+    trash: dict[cards.Card, int]
+    players: tuple[PlayerSnapshot, ...]
+
+
+def snapshot(b: "board.Board", players: typing.Sequence["player.Player"]) -> Snapshot:
+    """Return a snapshot of a board and its players.
+
+    Args:
+        b: The board.
+        players: The players.
+    """
+    return Snapshot(
+        supply=dict(b.supply),
+        trash=dict(b.trash),
+        players=tuple(
+            PlayerSnapshot(
+                draw_pile=tuple(p.draw_pile),
+                shuffled=dict(p.shuffled),
+                hand=dict(p.hand),
+                discard_pile=dict(p.discard_pile),
+                cards_in_play=tuple(p.cards_in_play),
+                actions=p.actions,
+                money=p.money,
+                buys=p.buys,
+            )
+            for p in players
+        ),
+    )
+
+
+def restore(
+    s: Snapshot,
+    b: "board.Board",
+    players: typing.Sequence["player.Player"],
+) -> None:
+    """Restore a board and its players to a snapshot.
+
+    The snapshot is not modified, so it can be restored any number of times.
+
+    Args:
+        s: The snapshot.
+        b: The board.
+        players: The players, in the same order as when the snapshot was taken.
+    """
+    b.supply = dict(s.supply)
+    b.trash = dict(s.trash)
+    for p, ps in zip(players, s.players, strict=True):
+        p.draw_pile = list(ps.draw_pile)
+        p.shuffled = dict(ps.shuffled)
+        p.hand = dict(ps.hand)
+        p.discard_pile = dict(ps.discard_pile)
+        p.cards_in_play = list(ps.cards_in_play)
+        p.actions = ps.actions
+        p.money = ps.money
+        p.buys = ps.buys
+        p.rehash()
+    b.rehash()
@@ -0,0 +1,225 @@
+"""Undo logs and copy-on-write forks of boards and players.
+
+Rollouts try a move and then revert it. Instead of deep-copying the pydantic
+models before each try, the models can be tracked by an `UndoLog`: each of
+their mutations then records a compact inverse operation, and `rollback`
+replays the inverses to return to a checkpoint.
+
+    log = UndoLog()
+    log.track(b, *players)
+    checkpoint = log.checkpoint()
+    players[0].buy(card, b)
+    log.rollback(to=checkpoint)
+
+For branching, `Tracked.fork` returns a copy of a model that shares its zones
+with the original until either of them changes a zone, at which point that zone
+alone is copied.
+
+Both mechanisms see the mutations made through the methods of the models and
+assignments to their attributes. Zones changed directly in place, e.g. with
+`player.hand[card] += 1`, are neither logged nor copied on write.
+"""
+
+import copy
+import typing
+
+import pydantic
+
+Inverse = tuple[typing.Callable[..., typing.Any], tuple[typing.Any, ...]]
+
+
+class UndoLog:
+    """A log of the inverses of the mutations of the models it tracks."""
+
+    __slots__ = ("_entries",)
+
+    def __init__(self) -> None:
+        """Initialize an empty log."""
+        self._entries: list[Inverse] = []
+
+    def __len__(self) -> int:
+        """Return the number of logged mutations."""
+        return len(self._entries)
+
+    def track(self, *models: "Tracked") -> None:
+        """Start logging the mutations of the given models."""
+        for m in models:
+            m._set_private("_undo", self)
+
+    def untrack(self, *models: "Tracked") -> None:
+        """Stop logging the mutations of the given models."""
+        for m in models:
+            m._set_private("_undo", None)
+
+    def record(self, inverse: typing.Callable[..., typing.Any], *args: object) -> None:
+        """Record the inverse of a mutation, to be called as `inverse(*args)`."""
+        self._entries.append((inverse, args))
+
+    def checkpoint(self) -> int:
+        """Return a checkpoint to which the models can be rolled back."""
+        return len(self._entries)
+
+    def rollback(self, to: int = 0) -> None:
+        """Undo the mutations since a checkpoint, most recent first.
+
+        Args:
+            to: The checkpoint. By default, all logged mutations are undone.
+        """
+        entries = self._entries
+        while len(entries) > to:
+            inverse, args = entries.pop()
+            inverse(*args)
+
+    def clear(self) -> None:
+        """Forget all logged mutations, e.g. to commit a move."""
+        self._entries.clear()
+
+
+def _truncate(items: list, size: int) -> None:
+    """Remove the items of a list beyond the given size."""
+    del items[size:]
+
+
+class Tracked(pydantic.BaseModel):
+    """A model whose mutations can be logged, and which can be forked.
+
+    Subclasses list their mutable containers in `CONTAINERS`, and must get each
+    container through `_own` before changing it in place.
+    """
+
+    CONTAINERS: typing.ClassVar[tuple[str, ...]] = ()
+
+    _undo: UndoLog | None = pydantic.PrivateAttr(default=None)
+    _shared: frozenset[str] = pydantic.PrivateAttr(default=frozenset())
+
+    def __setattr__(self, name: str, value: typing.Any) -> None:  # noqa: ANN401
+        """Set an attribute, logging its old value if the model is tracked."""
+        private = typing.cast(dict[str, typing.Any], self.__pydantic_private__)
+        undo = private["_undo"]
+        if undo is not None:
+            undo.record(self._restore, name, self._get(name))
+        if name in private["_shared"]:
+            self._set_shared(private["_shared"] - {name})
+        super().__setattr__(name, value)
+
+    def _get(self, name: str) -> typing.Any:  # noqa: ANN401
+        """Return an attribute, bypassing the slower lookup of private ones."""
+        if name[0] == "_":
+            return self.__pydantic_private__[name]  # type: ignore[index]
+        return self.__dict__[name]
+
+    def _restore(self, name: str, value: object) -> None:
+        """Set an attribute without logging, to undo a mutation."""
+        super().__setattr__(name, value)
+
+    def _set_private(self, name: str, value: object) -> None:
+        """Set a private attribute without logging it."""
+        self.__pydantic_private__[name] = value  # type: ignore[index]
+
+    def _set_logged(self, name: str, value: object) -> None:
+        """Set a private attribute, logging its old value if the model is tracked."""
+        self._record(self._set_private, name, self._get(name))
+        self._set_private(name, value)
+
+    def _set_shared(self, shared: frozenset[str]) -> None:
+        """Set the names of the containers that are shared with forks."""
+        self._set_logged("_shared", shared)
+
+    def _record(self, inverse: typing.Callable[..., typing.Any], *args: object) -> None:
+        """Record the inverse of a mutation if the model is tracked."""
+        undo = self.__pydantic_private__["_undo"]  # type: ignore[index]
+        if undo is not None:
+            undo.record(inverse, *args)
+
+    def _own(self, name: str) -> typing.Any:  # noqa: ANN401
+        """Return a container to change in place, copying it if it is shared."""
+        container = self._get(name)
+        if name in self.__pydantic_private__["_shared"]:  # type: ignore[index]
+            container = copy.copy(container)
+            setattr(self, name, container)
+        return container
+
+    def _set_count(
+        self,
+        name: str,
+        key: object,
+        delta: int,
+        *,
+        strict: bool = False,
+    ) -> int:
+        """Add to a count in a container dict, logging the change.
+
+        Args:
+            name: The name of the container.
+            key: The key of the count.
+            delta: The change in the count.
+            strict: Whether decreasing a missing count is an error.
+
+        Returns:
+            The count before the change.
+
+        Raises:
+            KeyError: If `strict` and a count without the key is decreased.
+        """
+        counts = self._own(name)
+        if key in counts:
+            self._record(counts.__setitem__, key, counts[key])
+        elif strict and delta < 0:
+            raise KeyError(key)
+        else:
+            self._record(counts.pop, key)
+        old = counts.get(key, 0)
+        counts[key] = old + delta
+        return old
+
+    def _append(self, name: str, item: object) -> None:
+        """Append an item to a container list, logging the change."""
+        items = self._own(name)
+        items.append(item)
+        self._record(items.pop)
+
+    def _extend(self, name: str, new: list) -> None:
+        """Extend a container list, logging the change."""
+        items = self._own(name)
+        self._record(_truncate, items, len(items))
+        items.extend(new)
+
+    def _insert(self, name: str, index: int, item: object) -> None:
+        """Insert an item into a container list, logging the change."""
+        items = self._own(name)
+        items.insert(index, item)
+        self._record(items.pop, index)
+
+    def _pop_item(self, name: str, index: int = -1) -> typing.Any:  # noqa: ANN401
+        """Remove and return an item of a container list, logging the change."""
+        items = self._own(name)
+        if index < 0:
+            index += len(items)
+        item = items.pop(index)
+        self._record(items.insert, index, item)
+        return item
+
+    def _delete_key(self, name: str, key: object) -> None:
+        """Remove a key from a container dict, logging the change."""
+        counts = self._own(name)
+        self._record(counts.__setitem__, key, counts.pop(key))
+
+    def fork(self) -> typing.Self:
+        """Return a copy that shares its containers until they are changed.
+
+        The fork is not tracked by the undo log of this model. Since rolling back
+        changes the containers in place, a fork of a tracked model gets copies of
+        them instead.
+        """
+        clone = self.model_copy()
+        clone._set_private("_undo", None)
+        if self._undo is not None:
+            clone._set_private("_shared", frozenset())
+            for name in self.CONTAINERS:
+                clone._restore(name, copy.copy(getattr(self, name)))
+            return clone
+
+        shared = frozenset(self.CONTAINERS)
+        self._set_private("_shared", shared)
+        clone._set_private("_shared", shared)
+        return clone
@@ -0,0 +1,219 @@
+"""Zobrist hashing of game states from card counts.
+
+The state of a game is described by the count of each card in each zone (the
+supply, the trash, and the hand, draw pile, discard pile and play area of each
+player), and by a few resources (whose turn it is, the number of turns taken,
+and the actions, money and buys of the current player). Each (zone, card,
+count) and (resource, value) has a random 64-bit key, and the hash of a state
+is the XOR of the keys of all its counts and resources.
+
+A count of zero has a key of zero, so empty zones contribute nothing, and a
+change of one count updates the hash with two XORs: one to remove the key of the
+old count and one to add the key of the new count.
+
+`Board` and `Player` maintain the hashes of their zones in this way as they are
+mutated, and `hash_state` combines them into the hash of a game. `hash_games`
+computes the same hashes for all the games of a `BatchedGame` at once.
+
+Counts and values are taken modulo `NUM_COUNTS`, which no count reaches in a
+game of Dominion. The order of the draw pile is not part of the hash.
+"""
+
+import functools
+import typing
+
+import numpy as np
+
+from alpha_dom import cards
+from alpha_dom import seeding
+
+if typing.TYPE_CHECKING:
+    from alpha_dom import board
+    from alpha_dom import player
+
+# The seed of the keys. Hashes are stable across processes and runs.
+SEED = 0x2B992DDFA23249D6
+NUM_COUNTS = 256
+MAX_PLAYERS = 6
+
+BOARD_ZONES = ("supply", "trash")
+PLAYER_ZONES = ("hand", "draw_pile", "discard_pile", "in_play")
+RESOURCES = ("current", "turn", "actions", "money", "buys")
+
+
+class _Zones(typing.Protocol):
+    """The arrays of a batch of games that are hashed, e.g. a `BatchedGame`."""
+
+    num_players: int
+    supply: np.ndarray
+    trash: np.ndarray
+    hand: np.ndarray
+    draw_counts: np.ndarray
+    discard_pile: np.ndarray
+    in_play: np.ndarray
+    current: np.ndarray
+    turn: np.ndarray
+    actions: np.ndarray
+    money: np.ndarray
+    buys: np.ndarray
+
+
+def zone_index(zone: str, player: int | None = None) -> int:
+    """Return the index of a zone in the key table.
+
+    Args:
+        zone: The name of a zone in `BOARD_ZONES` or `PLAYER_ZONES`.
+        player: The index of the player, for a player zone.
+    """
+    if player is None:
+        return BOARD_ZONES.index(zone)
+    return len(BOARD_ZONES) + PLAYER_ZONES.index(zone) * MAX_PLAYERS + player
+
+
+@functools.cache
+def _zone_indices(num_players: int) -> np.ndarray:
+    """Return the index of each zone hashed by `hash_games`, in its order."""
+    return np.array(
+        [zone_index(zone) for zone in BOARD_ZONES]
+        + [zone_index(z, p) for z in PLAYER_ZONES for p in range(num_players)],
+    )
+
+
+@functools.cache
+def card_keys() -> np.ndarray:
+    """Return the (Z, C, NUM_COUNTS) keys of each count of each card in each zone.
+
+    Zones are indexed by `zone_index`.
+    """
+    num_zones = len(BOARD_ZONES) + MAX_PLAYERS * len(PLAYER_ZONES)
+    table = seeding.generator(SEED, 0).integers(
+        np.iinfo(np.uint64).max,
+        size=(num_zones, cards.num_cards(), NUM_COUNTS),
+        dtype=np.uint64,
+        endpoint=True,
+    )
+    table[:, :, 0] = 0
+    table.flags.writeable = False
+    return table
+
+
+@functools.cache
+def resource_keys() -> np.ndarray:
+    """Return the (R, NUM_COUNTS) keys of each value of each resource."""
+    table = seeding.generator(SEED, 1).integers(
+        np.iinfo(np.uint64).max,
+        size=(len(RESOURCES), NUM_COUNTS),
+        dtype=np.uint64,
+        endpoint=True,
+    )
+    table[:, 0] = 0
+    table.flags.writeable = False
+    return table
+
+
+@functools.cache
+def zone_keys(zone: int) -> tuple[tuple[int, ...], ...]:
+    """Return the keys of a zone as Python ints, indexed by card id and count.
+
+    Scalar lookups in these tuples are much cheaper than indexing `card_keys`,
+    for incremental updates of the hashes of `Board`s and `Player`s.
+    """
+    return tuple(map(tuple, card_keys()[zone].tolist()))
+
+
+def card_key(zone: int, card_id: int, count: int) -> int:
+    """Return the key of a count of a card in a zone, as a Python int."""
+    return zone_keys(zone)[card_id][count % NUM_COUNTS]
+
+
+def resource_key(resource: str, value: int) -> int:
+    """Return the key of a value of a resource, as a Python int."""
+    return int(resource_keys()[RESOURCES.index(resource), value % NUM_COUNTS])
+
+
+def seat(name: int) -> int:
+    """Return the index of the keys of the player with the given name.
+
+    Players are keyed by their name, which is their index in the game.
+    """
+    return name % MAX_PLAYERS
+
+
+def hash_state(
+    b: "board.Board",
+    players: typing.Sequence["player.Player"],
+    current: int = 0,
+    turn: int = 0,
+) -> int:
+    """Return the hash of a game of `Board` and `Player`s.
+
+    This combines the incrementally maintained hashes of the board and players
+    with the resources of the current player, and equals the hash of the same
+    state in a `BatchedGame` (see `hash_games`).
+
+    Args:
+        b: The board.
+        players: The players, in turn order.
+        current: The index of the player whose turn it is.
+        turn: The number of turns taken in the game.
+    """
+    h = b.state_hash
+    for p in players:
+        h ^= p.state_hash
+    p = players[current]
+    for name, value in zip(
+        RESOURCES,
+        (current, turn, p.actions, p.money, p.buys),
+        strict=True,
+    ):
+        h ^= resource_key(name, value)
+    return h
+
+
+def hash_counts(zone: int, counts: np.ndarray) -> np.ndarray:
+    """Return the hash of the card counts of a zone.
+
+    Args:
+        zone: The index of the zone.
+        counts: (..., C) the count of each card in the zone.
+
+    Returns:
+        (...) the XOR of the keys of the counts.
+    """
+    keys = card_keys()[zone][np.arange(cards.num_cards()), counts % NUM_COUNTS]
+    return np.bitwise_xor.reduce(keys, axis=-1)
+
+
+def hash_games(
+    game: _Zones,
+    games: np.ndarray | None = None,
+) -> np.ndarray:
+    """Return the hash of the state of each game in a batch.
+
+    Args:
+        game: The batch of games, e.g. a `BatchedGame`.
+        games: Indices of the games to hash. All games by default.
+
+    Returns:
+        (M,) the hash of each game.
+    """
+    g = np.arange(len(game.current)) if games is None else games
+    counts = np.concatenate(
+        [
+            game.supply[g, None],
+            game.trash[g, None],
+            game.hand[g],
+            game.draw_counts[g],
+            game.discard_pile[g],
+            game.in_play[g],
+        ],
+        axis=1,
+    )
+    zones = _zone_indices(game.num_players)[:, None]
+    keys = card_keys()[zones, np.arange(cards.num_cards()), counts % NUM_COUNTS]
+    h = np.bitwise_xor.reduce(keys, axis=(1, 2))
+
+    values = resource_keys()
+    for i, name in enumerate(RESOURCES):
+        h ^= values[i, getattr(game, name)[g] % NUM_COUNTS]
+    return h
@@ -0,0 +1,162 @@
+"""Differential tests of the batched engine against `Board` and `Player`."""
+
+import numpy as np
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import player
+from alpha_dom.engine import BatchedGame
+
+NUM_GAMES = 16
+
+
+def counts(zone: dict[cards.Card, int] | list[cards.Card]) -> list[int]:
+    """Return the counts of a zone as a list indexed by card id."""
+    result = [0] * cards.num_cards()
+    items = zone.items() if isinstance(zone, dict) else ((c, 1) for c in zone)
+    for card, n in items:
+        result[card.id] += n
+    return result
+
+
+def big_money(game: BatchedGame) -> np.ndarray:
+    """Return the card each game buys when following Big Money."""
+    choices = [
+        (8, cards.load("Province").id),
+        (6, cards.load("Gold").id),
+        (3, cards.load("Silver").id),
+    ]
+    buy = np.full(game.num_games, -1)
+    for cost, card_id in reversed(choices):
+        buy = np.where(game.money >= cost, card_id, buy)
+    in_stock = game.supply[np.arange(game.num_games), np.maximum(buy, 0)] > 0
+    return np.where(in_stock, buy, -1)
+
+
+def unseen(p: player.Player) -> list[int]:
+    """Return the counts of the cards in a player's hand and draw pile."""
+    return [h + d for h, d in zip(counts(p.hand), counts(p.draw_pile), strict=True)]
+
+
+def check_player(game: BatchedGame, g: int, p: player.Player) -> None:
+    """Check that a player matches the state of the current player of a game."""
+    c = int(game.current[g])
+    assert counts(p.hand) == game.hand[g, c].tolist(), "Hands differ."
+    assert (
+        counts(p.discard_pile) == game.discard_pile[g, c].tolist()
+    ), "Discard piles differ."
+    assert counts(p.cards_in_play) == game.in_play[g, c].tolist(), "Plays differ."
+    assert (p.actions, p.money, p.buys) == (
+        game.actions[g],
+        game.money[g],
+        game.buys[g],
+    ), "Turn resources differ."
+
+
+def test_batched_game_matches_objects() -> None:
+    """Test that each batched operation matches the scalar object model."""
+    boards = [board.load_suggested(s) for s in board.SuggestedSet]
+    game = BatchedGame(
+        [boards[g % len(boards)] for g in range(NUM_GAMES)],
+        rng=np.random.default_rng(0),
+    )
+
+    while not game.done.all():
+        active = game.active()
+        before = {
+            g: (game.to_board(g), game.to_player(g, game.current[g])) for g in active
+        }
+
+        game.play_treasures()
+        for g, (_, p) in before.items():
+            p.play_treasures()
+            check_player(game, g, p)
+
+        choice = big_money(game)
+        game.buy(choice)
+        for g, (b, p) in before.items():
+            if choice[g] >= 0:
+                p.buy(cards.from_id(int(choice[g])), b)
+            check_player(game, g, p)
+            assert counts(b.supply) == game.supply[g].tolist(), "Supplies differ."
+
+        current = game.current.copy()
+        game.cleanup()
+        for g, (b, p) in before.items():
+            reshuffled = len(p.draw_pile) < 5
+            p.cleanup()
+
+            after = game.to_player(g, current[g])
+            assert counts(after.discard_pile) == counts(
+                p.discard_pile,
+            ), "Discard piles differ."
+            if reshuffled:
+                # Shuffles are random, so only compare the cards that were drawn
+                # from or left in the new draw pile.
+                assert sum(after.hand.values()) == sum(
+                    p.hand.values(),
+                ), "Hand sizes differ."
+                assert unseen(after) == unseen(p), "Reshuffled cards differ."
+            else:
+                assert counts(after.hand) == counts(p.hand), "Hands differ."
+                assert after.draw_pile == p.draw_pile, "Draw piles differ."
+
+            empty = sum(n == 0 for n in b.supply.values())
+            over = b.supply[cards.load("Province")] == 0 or empty >= 3
+            assert game.done[g] == over, "Game end differs."
+            if not over:
+                assert game.current[g] == (current[g] + 1) % 2, "Turn did not pass."
+
+    assert (game.turn > 0).all(), "Games ended without any turns."
+
+    scores = game.scores()
+    for g in range(NUM_GAMES):
+        for i in range(2):
+            points = game.to_player(g, i).victory_points()
+            assert scores[g, i] == points, "Victory points differ."
+
+
+def test_outcomes() -> None:
+    """Test that ties are broken in favor of players with fewer turns."""
+    b = board.load_suggested(board.SuggestedSet.SizeDistortion)
+    game = BatchedGame.from_board(b, 3, rng=np.random.default_rng(0))
+    for zone in (game.hand, game.discard_pile, game.in_play, game.draw_counts):
+        zone[:] = 0
+
+    estate, gardens = cards.load("Estate").id, cards.load("Gardens").id
+    game.discard_pile[:, :, estate] = 3
+    game.discard_pile[0, 0, gardens] = 1
+    game.discard_pile[0, 0, estate] = 9
+    game.current[:] = [1, 0, 1]
+
+    assert game.scores().tolist() == [[10, 3], [3, 3], [3, 3]], "Incorrect scores."
+    assert game.outcomes().tolist() == [[1, -1], [-1, 1], [0, 0]], "Bad outcomes."
+
+
+def test_batched_game_conserves_cards() -> None:
+    """Test that the batched engine never creates or destroys cards."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    game = BatchedGame.from_board(b, NUM_GAMES, rng=np.random.default_rng(1))
+    total = game.supply.sum(axis=1) + game.deck().sum(axis=(1, 2))
+
+    for _ in range(20):
+        game.play_treasures()
+        game.buy(big_money(game))
+        game.cleanup()
+        owned = game.supply.sum(axis=1) + game.deck().sum(axis=(1, 2))
+        assert (owned == total).all(), "Cards were created or destroyed."
+        assert (game.hand.sum(axis=2) <= 5).all(), "Hand has too many cards."
+
+    game.reset(game.done)
+    assert not game.done.any(), "Games were not reset."
+
+
+def test_boards_are_not_changed() -> None:
+    """Test that a batch starts with the initial supply, without resetting boards."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    player.Player(name=0).buy(cards.load("Silver"), b)
+    supply, state_hash = dict(b.supply), b.state_hash
+
+    game = BatchedGame.from_board(b, 2)
+    assert (b.supply, b.state_hash) == (supply, state_hash), "The board was reset."
+    assert (game.supply == b.supply_template().counts).all(), "Bad initial supply."
@@ -0,0 +1,187 @@
+"""Tests for the beliefs of players and the sampling of hidden states."""
+
+import collections
+
+import numpy as np
+import pytest
+from alpha_dom import board
+from alpha_dom import bots
+from alpha_dom import cards
+from alpha_dom import encoding
+from alpha_dom.belief import Beliefs
+from alpha_dom.engine import BatchedGame
+from alpha_dom.player import Player
+from alpha_dom.player import events
+
+NUM_SAMPLES = 64
+
+
+def counts(zone: dict | list) -> np.ndarray:
+    """Return the counts of the cards in a zone of a `Player`, by card id."""
+    out = np.zeros(cards.num_cards(), dtype=np.int32)
+    items = (
+        zone.items() if isinstance(zone, dict) else collections.Counter(zone).items()
+    )
+    for card, n in items:
+        out[card.id] += n
+    return out
+
+
+def check(beliefs: Beliefs, players: list[Player]) -> None:
+    """Check beliefs against the true zones of the players."""
+    beliefs.validate()
+    for i, p in enumerate(players):
+        hand, discard = counts(p.hand), counts(p.discard_pile)
+        assert (beliefs.deck[i] == counts(p.deck)).all(), "Bad deck."
+        assert (beliefs.known[i, 2] == counts(p.cards_in_play)).all(), "Bad play."
+        assert (beliefs.known[i, 0] <= hand).all(), "Bad known hand."
+        assert (beliefs.known[i, 1] <= discard).all(), "Bad known discard pile."
+        assert beliefs.sizes[i].tolist() == [
+            sum(p.hand.values()),
+            sum(p.discard_pile.values()),
+            len(p.cards_in_play),
+            len(p.draw_pile) + sum(p.shuffled.values()),
+        ], "Bad sizes."
+        top = beliefs.top[i]
+        assert [
+            c.id for c in p.draw_pile[len(p.draw_pile) - len(top) :]
+        ] == top, "Bad top."
+        if i == beliefs.observer:
+            assert (beliefs.known[i, 0] == hand).all(), "Own hand not known."
+            assert (beliefs.known[i, 1] == discard).all(), "Own discards not known."
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_game(lazy: bool) -> None:
+    """Test that beliefs follow a game with attacks, and that samples agree."""
+    strategies = [bots.WITCH_BM, bots.SMITHY_BM]
+    b = bots.board_for(strategies)
+    b.set_initial_supply()
+    rng = np.random.default_rng(0)
+    players = [Player(name=i, rng=rng, lazy=lazy) for i in range(2)]
+    beliefs = [Beliefs(players, i) for i in range(2)]
+
+    game = BatchedGame.from_board(b, NUM_SAMPLES)
+    encoder = encoding.BatchEncoder(NUM_SAMPLES)
+    for turn in range(40):
+        i = turn % 2
+        bots.play_turn(strategies[i], players[i], b, players[1 - i : 2 - i])
+        for o in range(2):
+            check(beliefs[o], players)
+
+        if turn % 8 == 7:
+            game.load(0, b, players, current=1 - i, turn=turn + 1)
+            truth = encoder.encode(game, encoder.buffer())[0]
+            root = game.snapshot(0)
+            o = 1 - i
+            game.restore(beliefs[o].determinize(root, NUM_SAMPLES, rng=turn))
+            decks = game.deck()
+            for p in range(2):
+                assert (decks[:, p] == beliefs[o].deck[p]).all(), "Bad decks."
+            assert (game.draw_size == root["draw_size"]).all(), "Bad draw piles."
+            assert (game.hand[:, o] == root["hand"][o]).all(), "Own hand changed."
+            assert (
+                game.hand[:, 1 - o] != root["hand"][1 - o]
+            ).any(), "The hidden hand was not sampled."
+            observations = encoder.encode(game, encoder.buffer())
+            assert (observations == truth).all(), "The samples leak."
+
+    for o in range(2):
+        beliefs[o].detach()
+    before = beliefs[0].deck.copy()
+    players[0].gain(cards.load("Copper"), "DiscardPile", b)
+    assert (beliefs[0].deck == before).all(), "Beliefs still listen."
+
+
+def test_distribution() -> None:
+    """Test that samples deal the hidden cards uniformly."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    players = [Player(name=i, rng=i) for i in range(2)]
+    beliefs = Beliefs(players, 0)
+    game = BatchedGame.from_board(b, 1)
+    game.load(0, b, players)
+
+    samples = beliefs.determinize(game.snapshot(0), 4000, rng=0)
+    copper = cards.load("Copper").id
+    mean = samples["hand"][:, 1, copper].mean()
+    assert abs(mean - 3.5) < 0.05, "Bad distribution of the hidden hand."
+    assert (samples["draw_counts"][:, 0] == beliefs.hidden[0]).all(), "Bad draw pile."
+    top = samples["draw_pile"][:, 0, 4]
+    assert (
+        abs((top == copper).mean() - beliefs.hidden[0, copper] / 5) < 0.05
+    ), "Bad order of the draw pile."
+
+
+def test_draw_events() -> None:
+    """Test that cards are reported as draws once they are in the hand."""
+    p = Player(name=0, rng=0)
+    reported: list[events.Event] = []
+    p.listen(reported.append)
+    hand = dict(p.hand)
+    p.draw_to_hand(1)
+    (drawn,) = (c for c, n in p.hand.items() if n > hand.get(c, 0))
+    assert reported == [events.Event(0, events.Kind.Draw, drawn)], "Bad events."
+
+
+def test_known_cards() -> None:
+    """Test that top-decked and revealed cards are known."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    players = [Player(name=i, rng=i, lazy=True) for i in range(2)]
+    beliefs = Beliefs(players, 0)
+    gold = cards.load("Gold")
+
+    players[1].gain(gold, "DrawPile", b)
+    assert beliefs.top[1] == [gold.id], "The top-decked card is not known."
+    players[1].draw_to_hand(1)
+    assert beliefs.known[1, 0, gold.id] == 1, "The drawn card is not known."
+    players[1].play_treasures()
+    assert beliefs.known[1, 0].sum() == 0, "The played card is still in the hand."
+
+    revealed = players[0].reveal(3)
+    assert beliefs.top[0] == [c.id for c in reversed(revealed)], "Bad look."
+    players[1].reveal(3)
+    assert not beliefs.top[1], "Looked at another player's cards."
+    check(beliefs, players)
+
+    players[0].discard(revealed[1], "DrawPile", index=-2)
+    players[0].trash(b, revealed[0], "DrawPile")
+    check(beliefs, players)
+
+    other = Beliefs(players, 1, listen=False)
+    other.sizes[0, 0] += 1
+    with pytest.raises(ValueError, match="sizes"):
+        other.validate()
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_taken_from_draw_pile(lazy: bool) -> None:
+    """Test that cards taken from the draw pile are found by their position."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    players = [Player(name=i, rng=i, lazy=lazy) for i in range(2)]
+    beliefs = Beliefs(players, 0)
+    copper, silver = cards.load("Copper"), cards.load("Silver")
+
+    # Copies of a card must not be mistaken for each other.
+    for p in players:
+        for card in (copper, silver, copper):
+            p.gain(card, "DrawPile", b)
+        p.trash(b, copper, "DrawPile", index=-3)
+        p.discard(silver, "DrawPile", index=len(p.draw_pile) - 2)
+        check(beliefs, players)
+
+    rng = np.random.default_rng(0)
+    for _ in range(100):
+        p = players[rng.integers(2)]
+        revealed = p.reveal(int(rng.integers(1, 6)))
+        if not revealed:
+            p.cleanup()
+            continue
+        depth = int(rng.integers(len(revealed)))
+        if rng.random() < 0.5:
+            p.discard(revealed[depth], "DrawPile", index=-1 - depth)
+        else:
+            p.trash(b, revealed[depth], "DrawPile", index=-1 - depth)
+        check(beliefs, players)
@@ -0,0 +1,214 @@
+"""Benchmarks of the hot paths of the engine.
+
+These run once, as plain tests, in the normal suite. To time them, and to gate
+changes on a stored baseline, see the Benchmarks section of the README.
+"""
+
+import collections
+import functools
+
+import numpy as np
+import pytest
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import state
+from alpha_dom.belief import Beliefs
+from alpha_dom.cards import model
+from alpha_dom.engine import BatchedGame
+from alpha_dom.player import Player
+from alpha_dom.state import codec
+from pytest_benchmark.fixture import BenchmarkFixture
+
+SEED = 0
+MAX_TURNS = 100
+
+
+def big_money_game(seed: int) -> int:
+    """Play a game of Big Money between two players, and return its turns.
+
+    Each turn, a player buys a Province with 8 coins, a Gold with 6 or 7, and a
+    Silver with 3 to 5.
+    """
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    players = [Player(name=i, rng=np.random.default_rng([seed, i])) for i in range(2)]
+    province, gold, silver = map(cards.load, ("Province", "Gold", "Silver"))
+
+    for turn in range(MAX_TURNS):
+        p = players[turn % 2]
+        p.start_turn()
+        p.play_treasures()
+        for card in (province, gold, silver):
+            if p.money >= card.cost:
+                p.buy(card, b)
+                break
+        p.cleanup()
+
+        empty = sum(b.supply[c] == 0 for c in b.kingdom_cards)
+        if b.supply[province] == 0 or empty >= 3:
+            return turn + 1
+    return MAX_TURNS
+
+
+def fresh_registry(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Replace the cached registry of cards with an empty cache."""
+    monkeypatch.setattr(model, "registry", functools.cache(model.registry.__wrapped__))
+
+
+@pytest.mark.parametrize("load", [cards.load, cards.load_all], ids=["load", "all"])
+def test_load_cold(
+    benchmark: BenchmarkFixture,
+    monkeypatch: pytest.MonkeyPatch,
+    load: object,
+) -> None:
+    """Load cards when the registry has to be built first."""
+    args = ("Province",) if load is cards.load else ()
+    benchmark.pedantic(
+        load,
+        args=args,
+        setup=functools.partial(fresh_registry, monkeypatch),
+        rounds=20,
+    )
+
+
+@pytest.mark.parametrize("load", [cards.load, cards.load_all], ids=["load", "all"])
+def test_load_warm(benchmark: BenchmarkFixture, load: object) -> None:
+    """Load cards from the registry."""
+    args = ("Province",) if load is cards.load else ()
+    benchmark(load, *args)
+
+
+def test_board(benchmark: BenchmarkFixture) -> None:
+    """Construct a board."""
+    b = benchmark(board.load_custom, cards.Expansion.Base.list_names()[:10])
+    assert len(b.kingdom_supply_cards) == 10, "Incorrect board."
+
+
+def test_set_initial_supply(benchmark: BenchmarkFixture) -> None:
+    """Set the initial supply of a board."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    benchmark(b.set_initial_supply)
+
+
+def test_player(benchmark: BenchmarkFixture) -> None:
+    """Construct a player, which shuffles its deck and draws a hand."""
+    benchmark(Player, name=0, rng=SEED)
+
+
+def test_draw_with_reshuffle(benchmark: BenchmarkFixture) -> None:
+    """Draw a card from an empty draw pile, which shuffles the discard pile."""
+
+    def setup() -> tuple[tuple[Player, int], dict]:
+        p = Player(name=0, rng=SEED)
+        p.discard_pile = dict(collections.Counter(p.deck))
+        p.draw_pile, p.hand = [], {}
+        p.rehash()
+        return (p, 1), {}
+
+    benchmark.pedantic(Player.draw_to_hand, setup=setup, rounds=200)
+
+
+def test_cleanup(benchmark: BenchmarkFixture) -> None:
+    """Clean up a turn."""
+
+    def setup() -> tuple[tuple[Player], dict]:
+        p = Player(name=0, rng=SEED)
+        p.play_treasures()
+        return (p,), {}
+
+    benchmark.pedantic(Player.cleanup, setup=setup, rounds=200)
+
+
+@pytest.mark.parametrize("method", ["buy", "gain"])
+def test_buy_and_gain(benchmark: BenchmarkFixture, method: str) -> None:
+    """Buy or gain a card."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    silver = cards.load("Silver")
+    p = Player(name=0, rng=SEED)
+
+    def setup() -> None:
+        b.update_supply(silver, 1)
+        p.money, p.buys = 3, 1
+
+    call, args = (
+        (p.buy, (silver, b))
+        if method == "buy"
+        else (p.gain, (silver, "DiscardPile", b))
+    )
+    benchmark.pedantic(call, args=args, setup=setup, rounds=500)
+
+
+def test_big_money_game(benchmark: BenchmarkFixture) -> None:
+    """Play a full scripted game of Big Money."""
+    turns = benchmark(big_money_game, SEED)
+    assert turns < MAX_TURNS, "Big Money did not finish."
+
+
+def test_determinize(benchmark: BenchmarkFixture) -> None:
+    """Sample 1000 hidden states of a game from the beliefs of a player."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    players = [Player(name=i, rng=np.random.default_rng([SEED, i])) for i in range(2)]
+    beliefs = Beliefs(players, 0)
+    silver = cards.load("Silver")
+    for turn in range(10):
+        p = players[turn % 2]
+        p.start_turn()
+        p.play_treasures()
+        if p.money >= silver.cost:
+            p.buy(silver, b)
+        p.cleanup()
+
+    game = BatchedGame.from_board(b, 1)
+    game.load(0, b, players)
+    benchmark(beliefs.determinize, game.snapshot(0), 1000, rng=SEED)
+
+
+def big_money_states(n: int) -> tuple[list[board.Board], list[list[Player]]]:
+    """Return the boards and players of a game of Big Money after each turn."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    players = [Player(name=i, rng=np.random.default_rng([SEED, i])) for i in range(2)]
+    silver = cards.load("Silver")
+    boards, forks = [], []
+    for turn in range(n):
+        p = players[turn % 2]
+        p.start_turn()
+        p.play_treasures()
+        if p.money >= silver.cost and b.supply[silver]:
+            p.buy(silver, b)
+        p.cleanup()
+        boards.append(b.fork())
+        forks.append([q.fork() for q in players])
+    return boards, forks
+
+
+@pytest.mark.parametrize("codec_name", ["binary", "json"])
+def test_encode_states(benchmark: BenchmarkFixture, codec_name: str) -> None:
+    """Serialize 100 states of a game, with the state codec or pydantic json."""
+    boards, players = big_money_states(100)
+
+    def binary() -> bytes:
+        snapshots = [
+            state.snapshot(b, ps) for b, ps in zip(boards, players, strict=True)
+        ]
+        return codec.encode(snapshots).tobytes()
+
+    def pydantic_json() -> bytes:
+        return b"".join(
+            m.model_dump_json().encode()
+            for b, ps in zip(boards, players, strict=True)
+            for m in (b, *ps)
+        )
+
+    benchmark(binary if codec_name == "binary" else pydantic_json)
+
+
+def test_decode_states(benchmark: BenchmarkFixture) -> None:
+    """Deserialize 100 states of a game with the state codec."""
+    boards, players = big_money_states(100)
+    snapshots = [state.snapshot(b, ps) for b, ps in zip(boards, players, strict=True)]
+    buffer = codec.encode(snapshots).tobytes()
+    decoded = benchmark(codec.decode, np.frombuffer(buffer, codec.dtype(2)))
+    assert decoded == snapshots, "Bad states."
@@ -4,6 +4,7 @@
 import pathlib
 import tempfile
 
+import pytest
 from alpha_dom import board
 from alpha_dom import cards
 
@@ -142,3 +143,32 @@ def test_saving() -> None:
         b.save(path.parent)
 
         assert path.exists(), "Board not saved."
+
+
+@pytest.mark.parametrize("num_players", [2, 3, 4])
+def test_initial_supply(num_players: int) -> None:
+    """Test that the initial supply follows the piles of the cards."""
+    b = board.load_custom(["Gardens", "Smithy", "Witch"])
+    b.set_initial_supply(num_players)
+    victory = 4 + 2 * num_players
+    expected = {
+        "Gardens": victory,
+        "Smithy": 10,
+        "Witch": 10,
+        "Copper": 60,
+        "Curse": 10 * (num_players - 1),
+        "Duchy": victory,
+        "Estate": victory,
+        "Gold": 30,
+        "Province": victory,
+        "Silver": 40,
+    }
+    assert {c.name: n for c, n in b.supply.items()} == expected, "Bad supply."
+    assert b.state_hash == b.rehash(), "Stale hash."
+
+    template = b.supply_template(num_players)
+    assert template is b.supply_template(num_players), "Template not cached."
+    assert b.supply is not template.supply, "The template is shared."
+    for card, n in b.supply.items():
+        assert template.counts[card.id] == n, f"Bad count for {card}."
+    assert template.counts.sum() == sum(expected.values()), "Extra cards."
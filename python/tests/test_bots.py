@@ -0,0 +1,60 @@
+"""Tests for the baseline bots and tournaments."""
+
+import numpy as np
+import pytest
+from alpha_dom import bots
+from alpha_dom import cards
+from alpha_dom.player import Player
+
+
+def test_choose() -> None:
+    """Test that a strategy buys the first card whose rule holds."""
+    b = bots.board_for([bots.SMITHY_BM])
+    b.set_initial_supply()
+    p = Player(name=0, rng=0)
+
+    def choice(money: int) -> str | None:
+        p.money = money
+        card = bots.choose(bots.SMITHY_BM, p, b)
+        return None if card is None else card.name
+
+    assert choice(4) == "Smithy", "No Smithy."
+    p.gain(cards.load("Smithy"), "DiscardPile", b)
+    assert choice(4) == "Silver", "Two Smithies."
+    assert choice(8) == "Gold", "Early Province."
+    assert choice(1) is None, "Bought with no money."
+
+
+def test_play_game() -> None:
+    """Test that a game between bots ends, and that unknown actions are rejected."""
+    strategies = [bots.WITCH_BM, bots.BIG_MONEY]
+    outcome = bots.play_game(strategies, rng=0)
+    assert sorted(outcome.tolist()) in ([-1, 1], [0, 0]), "Incorrect outcome."
+
+    with pytest.raises(ValueError, match="cannot play"):
+        bots.compile_strategies([bots.Strategy("Bad", (), ("Militia",))])
+
+
+def test_play_games() -> None:
+    """Test that each seat of a batch plays its own strategy."""
+    seats = np.array([[0, 1], [1, 0], [1, 1]])
+    outcomes = bots.play_games([bots.BIG_MONEY, bots.WITCH_BM], seats, rng=0)
+    assert outcomes.shape == (3, 2), "Incorrect shape."
+    assert (outcomes.max(axis=1) >= 0).all(), "A game without a winner."
+
+    outcomes = bots.play_games([bots.BIG_MONEY], np.zeros((4, 2)), max_turns=4)
+    assert (outcomes == 0).all(), "Truncated games were not draws."
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_tournament(workers: int) -> None:
+    """Test that the stronger strategies beat Big Money."""
+    result = bots.tournament(bots.BIG_MONEY, bots.BIG_MONEY, 2000, workers)
+    low, high = result.confidence_interval()
+    assert result.games == 2000, "Games were lost."
+    assert low < 0.5 < high, "Big Money is not even with itself."
+    assert low < result.win_rate < high, "The interval misses the win rate."
+
+    for strategy in (bots.SMITHY_BM, bots.WITCH_BM):
+        result = bots.tournament(strategy, bots.BIG_MONEY, 2000, workers)
+        assert result.confidence_interval()[0] > 0.5, f"{strategy.name} lost."
@@ -3,6 +3,7 @@
 import pathlib
 import tempfile
 
+import pydantic
 import pytest
 from alpha_dom import cards
 from alpha_dom.cards import Expansion
@@ -179,3 +180,57 @@ def test_associated_cards() -> None:
             ], f"{c.name} has incorrect associated cards."
         else:
             assert c.associated_cards == [], f"{c.name} has associated cards."
+
+
+def test_interned_cards() -> None:
+    """Test that every load returns the same instance of a card."""
+    copper = cards.load("Copper")
+    assert copper is cards.load("Copper"), "Copper was loaded twice."
+    assert copper is cards.load("Copper", Expansion.Common), "Copper not interned."
+
+    witch = cards.load("Witch")
+    assert witch.associated_cards[0] is cards.load(
+        "Curse",
+    ), "Associated cards are not interned."
+
+    for card in cards.load_all():
+        assert card is cards.load(card.name), f"{card.name} not interned."
+
+
+def test_registry_no_file_access(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the registry does not touch the disk after it is built."""
+    cards.registry()
+
+    def fail(*_: object, **__: object) -> None:
+        msg = "The registry should not open any files."
+        raise AssertionError(msg)
+
+    monkeypatch.setattr(pathlib.Path, "open", fail)
+    monkeypatch.setattr(pathlib.Path, "exists", fail)
+
+    cards.load("Smithy")
+    cards.load("Estate", Expansion.Common)
+    cards.load_base()
+    cards.load_common(load_curse=False)
+    cards.load_all()
+
+    with pytest.raises(FileNotFoundError):
+        cards.load("Smithy", Expansion.Common)
+
+
+def test_registry_is_immutable() -> None:
+    """Test that the registry and its cards cannot be modified."""
+    reg = cards.registry()
+    assert reg is cards.registry(), "Registry was built twice."
+
+    with pytest.raises(TypeError):
+        reg.cards["Copper"] = reg.cards["Silver"]  # type: ignore[index]
+
+    with pytest.raises(pydantic.ValidationError):
+        reg.cards["Copper"].cost = 3
+
+    assert reg.expansions["Copper"] == Expansion.Common
+    assert reg.expansions["Smithy"] == Expansion.Base
+    assert len(reg.cards) == len(Expansion.Common.list_names()) + len(
+        Expansion.Base.list_names(),
+    )
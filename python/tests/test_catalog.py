@@ -0,0 +1,86 @@
+"""Tests for the compiled catalog of cards."""
+
+import json
+import pathlib
+import shutil
+import tempfile
+
+import pytest
+from alpha_dom.cards import Expansion
+from alpha_dom.cards import catalog
+
+
+def test_catalog_is_fresh() -> None:
+    """Test that the shipped catalog was compiled from the current json files."""
+    raw = catalog.read_catalog(verify=True)
+    assert raw is not None, "Catalog is stale. Run `python -m alpha_dom.cards.catalog`."
+    assert raw == catalog.read_sources(), "Catalog does not match the json files."
+
+
+def test_compile_catalog() -> None:
+    """Test that a compiled catalog can be read back."""
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        path = pathlib.Path(catalog_dir).joinpath("catalog.json")
+        digest = catalog.compile_catalog(path)
+        assert digest == catalog.source_hash(), "Incorrect hash for the catalog."
+
+        raw = catalog.read_catalog(path, verify=True)
+        assert raw is not None, "Compiled catalog could not be read."
+        for expansion in Expansion:
+            names = [d["name"] for d in raw[expansion]]
+            assert names == expansion.list_names(), f"Incorrect cards in {expansion}."
+
+
+def test_stale_catalog() -> None:
+    """Test that a stale or missing catalog falls back to the json files."""
+    sources = catalog.read_sources()
+
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        path = pathlib.Path(catalog_dir).joinpath("catalog.json")
+        assert catalog.read_catalog(path) is None, "Missing catalog was read."
+        assert catalog.load_raw(path) == sources, "Did not fall back to json files."
+
+        catalog.compile_catalog(path)
+        data = json.loads(path.read_text())
+        data["expansions"][Expansion.Base.value].pop()
+        path.write_text(json.dumps(data))
+        assert catalog.read_catalog(path) is None, "Catalog with missing card read."
+        assert catalog.load_raw(path) == sources, "Did not fall back to json files."
+
+        data["hash"] = "stale"
+        data["expansions"] = {e.value: d for e, d in sources.items()}
+        path.write_text(json.dumps(data))
+        assert catalog.read_catalog(path) is not None, "Catalog was not read."
+        assert (
+            catalog.read_catalog(path, verify=True) is None
+        ), "Catalog with stale hash was read."
+
+        data["format"] = catalog.FORMAT_VERSION + 1
+        path.write_text(json.dumps(data))
+        assert catalog.read_catalog(path) is None, "Catalog in wrong format was read."
+
+
+def test_edited_card(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a card edited after compiling the catalog is read from its file."""
+    expansions = tmp_path.joinpath("expansions")
+    shutil.copytree(catalog.EXPANSIONS_DIR, expansions)
+    monkeypatch.setattr(catalog, "EXPANSIONS_DIR", expansions)
+    card = catalog.source_paths()[0]
+    data = json.loads(card.read_text())
+    card.write_text(json.dumps(data))
+    path = tmp_path.joinpath("catalog.json")
+    catalog.compile_catalog(path)
+    assert catalog.read_catalog(path) is not None, "Fresh catalog was not read."
+
+    # An edit that changes the size of a file is caught when loading.
+    data["description"] += "!"
+    card.write_text(json.dumps(data))
+    assert catalog.read_catalog(path) is None, "Stale catalog was read."
+    assert catalog.load_raw(path) == catalog.read_sources(), "Edit was not read."
+
+    # An edit of the same size is only caught by the hash.
+    catalog.compile_catalog(path)
+    data["cost"] = (data["cost"] + 1) % 10
+    card.write_text(json.dumps(data))
+    assert catalog.read_catalog(path) is not None, "Catalog was not read."
+    assert catalog.read_catalog(path, verify=True) is None, "Stale hash was read."
@@ -0,0 +1,103 @@
+"""Tests for the binary codec of the states of games."""
+
+import numpy as np
+import pytest
+from alpha_dom import board
+from alpha_dom import bots
+from alpha_dom import cards
+from alpha_dom import state
+from alpha_dom.player import Player
+from alpha_dom.state import codec
+
+
+def game(
+    num_players: int,
+    lazy: bool,
+) -> tuple[board.Board, list[Player], list[state.Snapshot]]:
+    """Play a game of bots, and return its final state and a state per turn."""
+    strategies = [bots.WITCH_BM, bots.SMITHY_BM, bots.BIG_MONEY][:num_players]
+    b = bots.board_for(strategies)
+    b.set_initial_supply(num_players)
+    players = [Player(name=i, rng=i, lazy=lazy) for i in range(num_players)]
+    snapshots = [state.snapshot(b, players)]
+    for turn in range(30 * num_players):
+        i = turn % num_players
+        others = players[i + 1 :] + players[:i]
+        bots.play_turn(strategies[i], players[i], b, others)
+        snapshots.append(state.snapshot(b, players))
+    return b, players, snapshots
+
+
+@pytest.mark.parametrize(("num_players", "lazy"), [(2, False), (3, True)])
+def test_round_trip(num_players: int, lazy: bool) -> None:
+    """Test that states survive a round trip through one buffer, in order."""
+    _, _, snapshots = game(num_players, lazy)
+    buffer = codec.encode(snapshots).tobytes()
+    decoded = codec.decode(np.frombuffer(buffer, codec.dtype(num_players)))
+
+    assert decoded == snapshots, "The states changed."
+    for s, d in zip(snapshots, decoded, strict=True):
+        for zone, decoded_zone in zip(
+            codec._count_zones(s),
+            codec._count_zones(d),
+            strict=True,
+        ):
+            assert list(zone) == list(decoded_zone), "The order of a zone changed."
+
+
+def test_restore() -> None:
+    """Test that a game restored from a decoded state plays like the original."""
+    b, players, _ = game(2, lazy=False)
+    (decoded,) = codec.decode(codec.encode([state.snapshot(b, players)]))
+
+    copies = [Player(name=i) for i in range(2)]
+    for p, q in zip(players, copies, strict=True):
+        q.rng.bit_generator.state = p.rng.bit_generator.state
+    copy = bots.board_for([bots.WITCH_BM, bots.SMITHY_BM])
+    state.restore(decoded, copy, copies)
+    assert copy.state_hash == b.state_hash, "Bad hash of the board."
+    for p, q in zip(players, copies, strict=True):
+        assert q.state_hash == p.state_hash, "Bad hash of a player."
+        assert q.victory_points() == p.victory_points(), "Bad points."
+
+    for turn in range(10):
+        for bb, ps in ((b, players), (copy, copies)):
+            i = turn % 2
+            strategy = (bots.WITCH_BM, bots.SMITHY_BM)[i]
+            bots.play_turn(strategy, ps[i], bb, ps[1 - i : 2 - i])
+    assert state.snapshot(copy, copies) == state.snapshot(b, players), "Diverged."
+
+
+def test_errors(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that states that do not fit the layout are rejected."""
+    _, _, snapshots = game(2, lazy=False)
+    with pytest.raises(ValueError, match="room for 4"):
+        codec.encode(snapshots, capacity=4)
+    with pytest.raises(ValueError, match="number of players"):
+        codec.encode([snapshots[0], game(3, lazy=True)[2][0]])
+
+    with pytest.raises(ValueError, match="count of the states is out of range"):
+        codec.encode([snapshots[0]._replace(trash={cards.load("Copper"): 256})])
+
+    out = np.zeros(1, codec.dtype(2))
+    with pytest.raises(ValueError, match="Expected 2 records"):
+        codec.encode(snapshots[:2], out=out)
+    codec.encode(snapshots[-1:], out=out)
+    assert codec.decode(out) == snapshots[-1:], "Bad records in the buffer."
+
+    # The layout of a registry with one more card.
+    layout = codec.dtype(2)
+    wider = [
+        (name, layout[name].base, (layout[name].shape[0], cards.num_cards() + 1))
+        if name in ("keys", "counts")
+        else (name, layout[name].base, layout[name].shape)
+        for name in layout.names or ()
+    ]
+    with pytest.raises(ValueError, match="layout"):
+        codec.decode(np.zeros(1, wider))
+
+    # The same layout, with other card ids.
+    records = codec.encode(snapshots)
+    monkeypatch.setattr(cards, "fingerprint", lambda: "0" * 16)
+    with pytest.raises(ValueError, match="registry"):
+        codec.decode(records)
@@ -0,0 +1,100 @@
+"""Tests for integer card ids and compact cards."""
+
+import pickle
+
+import pytest
+from alpha_dom import cards
+from alpha_dom.cards import Expansion
+
+
+def test_card_ids() -> None:
+    """Test that cards have stable integer ids in catalog order."""
+    names = Expansion.Common.list_names() + Expansion.Base.list_names()
+    assert cards.num_cards() == len(names), "Incorrect number of cards."
+
+    for i, name in enumerate(names):
+        card = cards.load(name)
+        assert card.id == i, f"{name} has id {card.id} instead of {i}."
+        assert cards.from_id(i) is card, f"Card with id {i} is not {name}."
+
+    with pytest.raises(IndexError):
+        cards.from_id(len(names))
+
+
+def test_compact_cards() -> None:
+    """Test that compact cards mirror the cards in the registry."""
+    for card in cards.load_all():
+        c = cards.compact_card(card)
+        assert c is cards.compact_card(card.name), f"{c} is not interned."
+        assert c is cards.compact_card(card.id), f"{c} is not interned."
+        assert c is cards.compact_cards()[card.id], f"{c} has the wrong id."
+        assert c.to_card() is card, f"{c} does not point back to {card}."
+        assert (c.id, c.name, c.cost, c.types, c.expansion) == (
+            card.id,
+            card.name,
+            card.cost,
+            tuple(card.types),
+            card.expansion,
+        ), f"{c} does not match {card}."
+        assert str(c) == card.name, f"Incorrect string for {c}."
+
+    copper = cards.compact_card("Copper")
+    silver = cards.compact_card("Silver")
+    assert copper < silver, "Compact cards are not sorted by id."
+    assert copper != silver, "Different compact cards are equal."
+    assert {copper: 1, silver: 2}[cards.compact_card(0)] == 1, "Bad dict lookup."
+
+
+def test_compact_cards_are_immutable() -> None:
+    """Test that compact cards cannot be modified."""
+    copper = cards.compact_card("Copper")
+    with pytest.raises(AttributeError):
+        copper.cost = 3  # type: ignore[misc]
+    with pytest.raises(AttributeError):
+        del copper.name
+    with pytest.raises(AttributeError):
+        copper.extra = 1  # type: ignore[attr-defined]
+
+
+def test_pickled_compact_cards() -> None:
+    """Test that unpickled compact cards are the interned instances."""
+    witch = cards.compact_card("Witch")
+    unpickled = pickle.loads(pickle.dumps(witch))  # noqa: S301
+    assert unpickled is witch, "Witch was not re-interned."
+
+
+def test_type_flags() -> None:
+    """Test that type flags and predicates agree with the list of types."""
+    predicates = {
+        cards.Type.Victory: "is_victory",
+        cards.Type.Treasure: "is_treasure",
+        cards.Type.Action: "is_action",
+        cards.Type.Attack: "is_attack",
+        cards.Type.Reaction: "is_reaction",
+        cards.Type.Curse: "is_curse",
+    }
+    matrix = cards.type_matrix()
+    assert matrix.shape == (cards.num_cards(), len(cards.Type)), "Bad matrix shape."
+
+    for card in cards.load_all():
+        compact = cards.compact_card(card)
+        assert compact.flags == card.flags, f"Flags differ for {card}."
+        for j, t in enumerate(cards.Type):
+            expected = t in card.types
+            assert bool(card.flags & t.flag) == expected, f"Bad flags for {card}."
+            assert getattr(card, predicates[t]) == expected, f"Bad {t} for {card}."
+            assert getattr(compact, predicates[t]) == expected, f"Bad {t} for {card}."
+            assert matrix[card.id, j] == expected, f"Bad type matrix for {card}."
+
+    witch = cards.compact_card("Witch")
+    assert witch.has_type(cards.TypeFlag.Attack | cards.TypeFlag.Reaction), "No Attack."
+    assert not witch.has_type(cards.TypeFlag.Treasure), "Witch is a Treasure."
+    either = cards.type_vector(cards.TypeFlag.Attack | cards.TypeFlag.Reaction)
+    names = [cards.compact_cards()[i].name for i in either.nonzero()[0]]
+    assert sorted(names) == [
+        "Bandit",
+        "Bureaucrat",
+        "Militia",
+        "Moat",
+        "Witch",
+    ], "Incorrect Attack or Reaction cards."
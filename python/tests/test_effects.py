@@ -0,0 +1,129 @@
+"""Tests for the language, compiler and interpreters of card effects."""
+
+import numpy as np
+import pydantic
+import pytest
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import engine
+from alpha_dom.cards import effects
+from alpha_dom.player import Player
+
+KINGDOM = ["Council Room", "Festival", "Market", "Moat", "Witch", "Workshop"]
+
+
+def test_parse() -> None:
+    """Test that statements parse to opcodes, and that others are rejected."""
+    assert effects.parse("+2 Cards") == (effects.Op.Draw, 2), "Bad draw."
+    assert effects.parse("+1 action.") == (effects.Op.Actions, 1), "Bad action."
+    assert effects.parse("gain a card costing up to 4") == (
+        effects.Op.Gain,
+        4,
+    ), "Bad gain."
+    assert effects.parse("Each other player gains a Curse") == (
+        effects.Op.OthersGain,
+        "Curse",
+    ), "Bad curse."
+    assert effects.parse("each other player draws a card") == (
+        effects.Op.OthersDraw,
+        1,
+    ), "Bad draw for the others."
+
+    with pytest.raises(ValueError, match="not a valid effect"):
+        effects.parse("+2 villagers")
+    with pytest.raises(pydantic.ValidationError):
+        cards.Card(
+            name="Bad",
+            cost=0,
+            types=["Action"],
+            description="",
+            expansion="Base",
+            effects=["trash everything"],
+        )
+
+
+def test_program() -> None:
+    """Test the compiled effects of the vanilla cards."""
+    program = effects.program()
+    for name, plus in [
+        ("Smithy", [3, 0, 0, 0]),
+        ("Village", [1, 2, 0, 0]),
+        ("Market", [1, 1, 1, 1]),
+        ("Festival", [0, 2, 1, 2]),
+        ("Laboratory", [2, 1, 0, 0]),
+    ]:
+        i = cards.load(name).id
+        assert program.plus[i].tolist() == plus, f"Bad effects for {name}."
+        assert not program.special[i], f"{name} is not vanilla."
+
+    witch = cards.load("Witch").id
+    assert program.special[witch], "Witch is vanilla."
+    assert program.effects(witch)[-1] == (
+        effects.Op.OthersGain,
+        cards.load("Curse").id,
+    ), "Bad Curse."
+    assert program.blocks[cards.load("Moat").id], "Moat does not block."
+
+
+def test_execute() -> None:
+    """Test the effects of cards played by a `Player`."""
+    b = board.load_custom(KINGDOM)
+    b.set_initial_supply()
+    p, other = Player(name=0, rng=0), Player(name=1, rng=1)
+
+    p.start_turn()
+    engine.execute(p, cards.load("Market"), b, [other])
+    assert (p.actions, p.buys, p.money) == (2, 2, 1), "Bad resources."
+    assert sum(p.hand.values()) == 6, "No card drawn."
+
+    engine.execute(p, cards.load("Council Room"), b, [other])
+    assert sum(other.hand.values()) == 6, "The other player did not draw."
+
+    curse = cards.load("Curse")
+    engine.execute(p, cards.load("Witch"), b, [other])
+    assert other.discard_pile.get(curse) == 1, "No Curse."
+    other.gain(cards.load("Moat"), "Hand", b)
+    engine.execute(p, cards.load("Witch"), b, [other])
+    assert other.discard_pile.get(curse) == 1, "Moat did not block."
+
+    workshop = cards.load("Workshop")
+    with pytest.raises(ValueError, match="needs a choice"):
+        engine.execute(p, workshop, b)
+    silver = cards.load("Silver")
+    engine.execute(p, workshop, b, choose=lambda _, cost: silver if cost >= 3 else None)
+    assert p.discard_pile.get(silver) == 1, "Nothing was gained."
+
+
+def test_execute_batch() -> None:
+    """Test the effects of the cards played in a batch of games."""
+    b = board.load_custom(KINGDOM)
+    names = ["Market", "Festival", "Council Room", "Witch", "Witch", "Workshop", "Moat"]
+    played = np.array([cards.load(name).id for name in names])
+    game = engine.BatchedGame.from_board(b, len(names), rng=0)
+    g = np.arange(len(names))
+    # The other player blocks the first Witch, but not the second.
+    game.hand[3, 1, cards.load("Moat").id] += 1
+    game.hand[g, 0, played] += 1
+    before = game.hand[:, 0].sum(axis=1), game.hand[:, 1].sum(axis=1)
+
+    def choose(
+        _game: engine.BatchedGame,
+        _games: np.ndarray,
+        cost: np.ndarray,
+    ) -> np.ndarray:
+        return np.where(cost >= 3, cards.load("Silver").id, -1)
+
+    game.play(g, played)
+    engine.execute_batch(game, g, played, choose=choose)
+
+    program = effects.program()
+    draw, actions, buys, coins = program.plus[played].T
+    assert (game.actions == actions).all(), "Bad actions."
+    assert (game.buys == 1 + buys).all(), "Bad buys."
+    assert (game.money == coins).all(), "Bad money."
+    assert (game.hand[:, 0].sum(axis=1) == before[0] - 1 + draw).all(), "Bad draws."
+    others = game.hand[:, 1].sum(axis=1) - before[1]
+    assert others.tolist() == [0, 0, 1, 0, 0, 0, 0], "Bad draws for the others."
+    curses = game.discard_pile[:, 1, cards.load("Curse").id]
+    assert curses.tolist() == [0, 0, 0, 0, 1, 0, 0], "Bad Curses."
+    assert game.discard_pile[5, 0, cards.load("Silver").id] == 1, "Nothing gained."
@@ -0,0 +1,79 @@
+"""Tests for the observation encoders."""
+
+import itertools
+
+import numpy as np
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import encoding
+from alpha_dom.engine import BatchedGame
+from alpha_dom.player import Player
+from alpha_dom.player import VectorPlayer
+
+NUM_GAMES = 8
+
+
+def test_layout() -> None:
+    """Test that the features tile the observation without gaps."""
+    for num_players in (2, 3, 4):
+        features = list(encoding.layout(num_players).values())
+        assert features[0].start == 0, "Observation does not start at 0."
+        for a, b in itertools.pairwise(features):
+            assert a.stop == b.start, "Features overlap or leave gaps."
+        assert features[-1].stop == encoding.observation_size(num_players)
+
+    hand = encoding.layout()["hand"]
+    assert hand.stop - hand.start == cards.num_cards(), "Incorrect hand size."
+
+
+def test_encode_players() -> None:
+    """Test that both kinds of players are encoded identically."""
+    b = board.load_suggested(board.SuggestedSet.DeckTop)
+    b.set_initial_supply()
+    players = [Player(name=0), Player(name=1)]
+    players[1].gain(cards.load("Silver"), "DiscardPile", b)
+    vectors = [VectorPlayer.from_player(p) for p in players]
+
+    size = encoding.observation_size()
+    slices = encoding.layout()
+    for observer in range(2):
+        obs = encoding.encode(b, players, observer, np.zeros(size), turn=3)
+        vec = encoding.encode(b, vectors, observer, np.full(size, -1.0), turn=3)
+        assert (obs == vec).all(), "Players of different kinds encode differently."
+
+        opponent = obs[slices["opponent_1_deck"]]
+        assert opponent.sum() == 10 + (observer == 0), "Incorrect opponent deck."
+        assert obs[slices["hand"]].sum() == 5, "Incorrect hand."
+        assert obs[slices["resources"]].tolist() == [1, 0, 1, 3, 1]
+
+
+def test_encode_batch() -> None:
+    """Test that the batched encoder matches the scalar encoder."""
+    boards = [board.load_suggested(s) for s in board.SuggestedSet]
+    game = BatchedGame(
+        [boards[g % len(boards)] for g in range(NUM_GAMES)],
+        rng=np.random.default_rng(0),
+    )
+    encoder = encoding.BatchEncoder(NUM_GAMES)
+    out = encoder.buffer()
+
+    silver = cards.load("Silver").id
+    for _ in range(6):
+        game.play_treasures()
+        game.buy(np.where(game.money >= 3, silver, -1))
+
+        for observers in (game.current, 1 - game.current):
+            encoder.encode(game, out, observers)
+            for g in range(NUM_GAMES):
+                players = [game.to_player(g, p) for p in range(2)]
+                expected = encoding.encode(
+                    game.to_board(g),
+                    players,
+                    int(observers[g]),
+                    np.zeros(encoding.observation_size(), dtype=out.dtype),
+                    current=int(game.current[g]),
+                    turn=int(game.turn[g]),
+                )
+                assert (out[g] == expected).all(), f"Game {g} encoded differently."
+
+        game.cleanup()
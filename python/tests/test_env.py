@@ -0,0 +1,113 @@
+"""Tests for the reinforcement learning environments."""
+
+import numpy as np
+import pytest
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import encoding
+from alpha_dom import env
+from alpha_dom import seeding
+
+
+def random_actions(mask: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Return a random legal action for each environment."""
+    return np.array([rng.choice(np.flatnonzero(row)) for row in mask])
+
+
+def test_dominion_env() -> None:
+    """Test a single environment through the Gymnasium-style API."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    e = env.DominionEnv(b)
+    assert e.num_actions == len(b.kingdom_cards) + 1, "Incorrect action space."
+    assert e.action_cards == b.kingdom_cards, "Actions do not match the board."
+
+    obs, info = e.reset(seed=0)
+    assert obs.shape == (encoding.observation_size(),), "Incorrect observation."
+    assert info["action_mask"][-1], "Passing is not legal."
+    assert info["player"] == 0, "First player is not 0."
+
+    province = e.action_cards.index(cards.load("Province"))
+    with pytest.raises(ValueError, match="Illegal actions"):
+        e.step(province)
+
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        action = int(random_actions(info["action_mask"][None], rng)[0])
+        obs, reward, terminated, truncated, info = e.step(action)
+        if terminated or truncated:
+            break
+    else:
+        pytest.fail("Game did not end.")
+
+    assert reward in (-1.0, 0.0, 1.0), "Incorrect reward."
+    if terminated:
+        assert sorted(info["outcome"].tolist()) in ([-1, 1], [0, 0]), "Bad outcome."
+
+
+def test_batched_env_big_money() -> None:
+    """Test that games of Big Money end by the rules."""
+    boards = [board.load_suggested(s) for s in board.SuggestedSet]
+    e = env.BatchedEnv(boards, rng=np.random.default_rng(0))
+    out = e.reset()
+
+    priorities = [cards.load(name).id for name in ("Province", "Gold", "Silver")]
+    rows = np.arange(e.num_envs)
+    finished = np.zeros(e.num_envs, dtype=bool)
+    for _ in range(500):
+        actions = np.full(e.num_envs, e.num_actions - 1)
+        for card_id in reversed(priorities):
+            action = (e.action_cards == card_id).argmax(axis=1)
+            actions = np.where(out.action_mask[rows, action], action, actions)
+        out = e.step(actions)
+        assert not out.truncated.any(), "Big Money game was truncated."
+        finished |= out.terminated
+        if finished.all():
+            break
+
+    assert finished.all(), "Not every game ended."
+
+
+@pytest.mark.parametrize("mixed", [False, True])
+def test_vector_env_matches_batched_env(mixed: bool) -> None:
+    """Test that the process pool steps exactly like in-process environments.
+
+    With mixed kingdoms, the boards of the second worker need fewer actions than
+    those of the first.
+    """
+    first_game, size_distortion, deck_top = (
+        board.load_suggested(s) for s in board.SuggestedSet
+    )
+    boards = (
+        [first_game, deck_top, size_distortion, first_game, deck_top, deck_top]
+        if mixed
+        else [first_game, size_distortion, deck_top] * 2
+    )
+    num_workers = 2
+    width = env.num_actions(boards)
+    local = [
+        env.BatchedEnv(boards[:3], rng=seeding.generator(7, 0), width=width),
+        env.BatchedEnv(boards[3:], rng=seeding.generator(7, 1), width=width),
+    ]
+
+    with pytest.raises(ValueError, match="need 18 actions"):
+        env.BatchedEnv(boards, width=17)
+
+    rng = np.random.default_rng(0)
+    with env.VectorEnv(boards, num_workers, seed=7) as vector:
+        processes = list(vector._processes)
+        out = vector.reset()
+        expected = [e.reset() for e in local]
+        for _ in range(100):
+            for name, value in out._asdict().items():
+                joined = np.concatenate([getattr(x, name) for x in expected])
+                assert (value == joined).all(), f"{name} differs."
+
+            actions = random_actions(out.action_mask, rng)
+            out = vector.step(actions)
+            expected = [local[0].step(actions[:3]), local[1].step(actions[3:])]
+
+        with pytest.raises(RuntimeError, match="Illegal actions"):
+            vector.step(np.full(vector.num_envs, -2))
+
+    assert all(p.exitcode == 0 for p in processes), "A worker failed to exit."
+    vector.close()
@@ -0,0 +1,121 @@
+"""Tests for the batched inference server."""
+
+import multiprocessing
+import threading
+import time
+
+import numpy as np
+import pytest
+from alpha_dom import inference
+
+NUM_FEATURES, NUM_ACTIONS = 8, 4
+
+
+def stub(observations: np.ndarray, masks: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """A model whose results identify the observations they were computed from."""
+    return masks * observations[:, :1], observations.sum(axis=1)
+
+
+def failing(
+    _observations: np.ndarray,
+    _masks: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """A model that always fails."""
+    msg = "Bad model."
+    raise ValueError(msg)
+
+
+def inputs(rng: np.random.Generator, n: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return random observations and masks."""
+    observations = rng.integers(0, 100, (n, NUM_FEATURES)).astype(np.float32)
+    return observations, rng.random((n, NUM_ACTIONS)) < 0.5
+
+
+def work(client: inference.Client, seed: int, num_requests: int) -> None:
+    """Evaluate random observations on the server, and check the results."""
+    rng = np.random.default_rng(seed)
+    for _ in range(num_requests):
+        observations, masks = inputs(rng, int(rng.integers(1, 40)))
+        priors, values = client(observations, masks, timeout=10)
+        expected = stub(observations, masks)
+        assert (priors == expected[0]).all(), "Wrong priors."
+        assert (values == expected[1]).all(), "Wrong values."
+
+
+def test_batching() -> None:
+    """Test that requests waiting together are evaluated in one batch."""
+    server = inference.Server(
+        stub,
+        NUM_FEATURES,
+        NUM_ACTIONS,
+        num_clients=3,
+        max_batch_size=16,
+    )
+    rng = np.random.default_rng(0)
+    calls = [(client, *inputs(rng, 5)) for client in server.clients]
+    results: list = [None] * len(calls)
+
+    def call(k: int) -> None:
+        client, observations, masks = calls[k]
+        results[k] = client(observations, masks, timeout=10)
+
+    threads = [threading.Thread(target=call, args=(k,)) for k in range(len(calls))]
+    for thread in threads:
+        thread.start()
+    while server.stats().queue_depth < len(calls):
+        time.sleep(0.001)
+    assert server.stats().queue_depth == len(calls), "Bad queue depth."
+
+    with server:
+        for thread in threads:
+            thread.join()
+
+    for (_, observations, masks), (priors, values) in zip(calls, results, strict=True):
+        assert (priors == stub(observations, masks)[0]).all(), "Wrong priors."
+        assert (values == stub(observations, masks)[1]).all(), "Wrong values."
+    stats = server.stats()
+    assert (stats.requests, stats.batches) == (3, 1), "Requests were not batched."
+    assert stats.batch_sizes[15] == 1, "Bad batch size."
+    assert stats.max_queue_depth == 3, "Bad queue depth."
+    assert 0 < stats.p50_latency <= stats.p99_latency, "Bad latencies."
+
+
+def test_workers() -> None:
+    """Test that worker processes get back the results of their observations."""
+    num_requests = 20
+    server = inference.Server(
+        stub,
+        NUM_FEATURES,
+        NUM_ACTIONS,
+        num_clients=3,
+        max_batch_size=32,
+    )
+    ctx = multiprocessing.get_context()
+    workers = [
+        ctx.Process(target=work, args=(client, seed, num_requests))
+        for seed, client in enumerate(server.clients)
+    ]
+    with server:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+
+    assert [w.exitcode for w in workers] == [0, 0, 0], "A worker failed."
+    stats = server.stats()
+    assert stats.requests >= 3 * num_requests, "Requests were lost."
+    assert stats.batch_sizes.sum() == stats.batches, "Bad histogram."
+    assert stats.batch_sizes[33:].sum() == 0, "A batch was too large."
+    assert stats.queue_depth == 0, "Requests were not answered."
+
+
+def test_errors() -> None:
+    """Test that clients see failures of the model, and stopped servers."""
+    rng = np.random.default_rng(0)
+    server = inference.Server(failing, NUM_FEATURES, NUM_ACTIONS, num_clients=1)
+    with server, pytest.raises(RuntimeError, match="model failed"):
+        server.clients[0](*inputs(rng, 3), timeout=10)
+
+    server = inference.Server(stub, NUM_FEATURES, NUM_ACTIONS, num_clients=1)
+    with pytest.raises(TimeoutError, match="did not answer"):
+        server.clients[0](*inputs(rng, 3), timeout=0.01)
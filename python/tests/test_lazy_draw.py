@@ -0,0 +1,93 @@
+"""Tests for players that sample draws instead of shuffling."""
+
+import collections
+
+import numpy as np
+import pytest
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import encoding
+from alpha_dom import state
+from alpha_dom.player import Player
+from alpha_dom.player import VectorPlayer
+
+
+def check(p: Player) -> None:
+    """Check the zones of a player against its hash and running totals."""
+    assert p.state_hash == p.rehash(), "Stale hash."
+    assert p.deck_size == len(p.deck), "Bad deck size."
+    draw = collections.Counter(p.draw_pile) + collections.Counter(p.shuffled)
+    assert dict(draw) == {c: n for c, n in p.draw_counts.items() if n}, "Bad counts."
+
+
+def test_distribution() -> None:
+    """Test that sampled draws follow the same distribution as shuffled draws."""
+    copper, estate = cards.load("Copper"), cards.load("Estate")
+    draws: dict[bool, collections.Counter] = {
+        True: collections.Counter(),
+        False: collections.Counter(),
+    }
+    for seed in range(2000):
+        for lazy in (True, False):
+            p = Player(name=0, rng=seed, lazy=lazy)
+            draws[lazy][tuple(c.name for c in p.reveal(2))] += 1
+    for lazy, counts in draws.items():
+        both = counts[(estate.name, estate.name)] / 2000
+        assert abs(both - 2 / 30) < 0.02, f"Bad distribution for {lazy=}."
+        first = sum(n for key, n in counts.items() if key[0] == copper.name) / 2000
+        assert abs(first - 0.7) < 0.04, f"Bad distribution for {lazy=}."
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_reveal(lazy: bool) -> None:
+    """Test that revealed and top-decked cards are drawn in order."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    p = Player(name=0, rng=0, lazy=lazy)
+    log = state.UndoLog()
+    log.track(b, p)
+    before = state.snapshot(b, [p])
+
+    p.cleanup()
+    p.cleanup()
+    revealed = p.reveal(3)
+    assert len(p.draw_pile) >= 3, "The revealed cards were not fixed."
+    gold = cards.load("Gold")
+    p.gain(gold, "DrawPile", b)
+    for card in [gold, *revealed]:
+        n = p.hand.get(card, 0)
+        p.draw_to_hand(1)
+        assert p.hand[card] == n + 1, "The cards were not drawn in order."
+    check(p)
+
+    assert len(p.reveal(100)) == p.deck_size - sum(p.hand.values()), "Bad reveal."
+    assert not p.shuffled, "The whole draw pile is revealed."
+    check(p)
+
+    log.rollback()
+    assert state.snapshot(b, [p]) == before, "Bad rollback."
+
+
+def test_game() -> None:
+    """Test that a lazy player stays consistent with the other representations."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    p = Player(name=0, rng=0, lazy=True)
+    silver = cards.load("Silver")
+    for _ in range(30):
+        p.start_turn()
+        p.play_treasures()
+        if p.money >= silver.cost:
+            p.buy(silver, b)
+        p.cleanup()
+        check(p)
+
+    v = VectorPlayer.from_player(p, rng=np.random.default_rng(0))
+    deck = np.bincount([c.id for c in p.deck], minlength=cards.num_cards())
+    assert (v.deck == deck).all(), "Cards were lost in the conversion."
+
+    other = Player(name=1, rng=1)
+    lazy, eager = np.zeros((2, encoding.observation_size()))
+    encoding.encode(b, [p, other], 0, lazy)
+    encoding.encode(b, [v.to_player(), other], 0, eager)
+    assert (lazy == eager).all(), "The encodings differ."
@@ -0,0 +1,137 @@
+"""Tests for the binary log of games and the replayer of their states."""
+
+import pathlib
+
+import numpy as np
+import pytest
+from alpha_dom import bots
+from alpha_dom import cards
+from alpha_dom import state
+from alpha_dom.record import Log
+from alpha_dom.record import Recorder
+from alpha_dom.record import Replayer
+
+NUM_TURNS = 60
+
+
+def record(lazy: bool) -> tuple[Recorder, list[tuple[int, state.Snapshot, str]]]:
+    """Record a game of bots, with its state and json dump after each turn."""
+    strategies = [bots.WITCH_BM, bots.SMITHY_BM]
+    recorder = Recorder(bots.board_for(strategies), seed=7, lazy=lazy)
+    b, players = recorder.board, recorder.players
+
+    turns = []
+    for turn in range(NUM_TURNS):
+        i = turn % 2
+        bots.play_turn(strategies[i], players[i], b, players[1 - i : 2 - i])
+        dump = "".join([b.model_dump_json(), *(p.model_dump_json() for p in players)])
+        turns.append((len(recorder.log().records), state.snapshot(b, players), dump))
+    return recorder, turns
+
+
+@pytest.mark.parametrize("lazy", [True, False])
+def test_replay(lazy: bool, tmp_path: pathlib.Path) -> None:
+    """Test that replays rebuild every state of a game, in any order."""
+    recorder, turns = record(lazy)
+    recorder.stop().save(tmp_path / "game.log")
+    log = Log.load(tmp_path / "game.log")
+    assert log.header == recorder.header, "Bad header."
+
+    replayer = Replayer(log, interval=50)
+    assert replayer.steps[-1] == len(log.records), "The replay did not finish."
+    order = np.random.default_rng(0).permutation(len(turns))
+    for t in order:
+        position, expected, _ = turns[t]
+        b, players = replayer.at(position)
+        assert state.snapshot(b, players) == expected, f"Bad state after turn {t}."
+
+    b, players = replayer.state(len(replayer))
+    players[0].gain(cards.load("Copper"), "DiscardPile", b)
+    assert replayer.state(len(replayer))[1][0].deck_size == players[0].deck_size - 1
+
+
+def test_draw_pile() -> None:
+    """Test replays of looks, shuffles and cards taken from the draw pile."""
+    recorder = Recorder(bots.board_for([bots.WITCH_BM]), seed=0, lazy=True)
+    b, players = recorder.board, recorder.players
+    p = players[0]
+    silver = cards.load("Silver")
+    expected = []
+    for _ in range(4):
+        p.gain(silver, "Hand", b)
+        p.top_deck(silver, "Hand")
+        revealed = p.reveal(7)
+        p.discard(revealed[2], "DrawPile", index=-3)
+        p.trash(b, revealed[0], "DrawPile")
+        p.cleanup()
+        expected.append((len(recorder.log().records), state.snapshot(b, players)))
+
+        # Empty the draw pile, so that the next look shuffles.
+        p.draw_to_hand(len(p.draw_pile) + sum(p.shuffled.values()))
+        p.discard(next(c for c, n in p.hand.items() if n), "Hand")
+        p.reveal(1)
+        p.cleanup()
+        expected.append((len(recorder.log().records), state.snapshot(b, players)))
+
+    replayer = Replayer(recorder.stop(), interval=8)
+    for position, snapshot in reversed(expected):
+        assert state.snapshot(*replayer.at(position)) == snapshot, "Bad state."
+
+
+def test_resources() -> None:
+    """Test replays of resources changed without events, or out of range."""
+    recorder = Recorder(bots.board_for([bots.SMITHY_BM]), seed=0)
+    b, players = recorder.board, recorder.players
+    p, smithy = players[0], cards.load("Smithy")
+    expected = []
+
+    def call(method: str, *args: object) -> None:
+        getattr(p, method)(*args)
+        expected.append((len(recorder.log().records), state.snapshot(b, players)))
+
+    # `start_turn` brings the actions back to 1 without an event, and `play`
+    # brings them down to the 0 of the last record.
+    call("gain", smithy, "Hand", b)
+    call("play", smithy)
+    call("cleanup")
+    call("gain", smithy, "Hand", b)
+    call("start_turn")
+    call("play", smithy)
+    p.money = 3
+    call("gain", smithy, "DiscardPile", b)
+    p.buys = -200
+    with pytest.raises(ValueError, match="out of range"):
+        recorder.log()
+    p.buys = -2
+    call("play_treasures")
+
+    replayer = Replayer(recorder.stop())
+    for position, snapshot in expected:
+        assert state.snapshot(*replayer.at(position)) == snapshot, "Bad state."
+
+
+def test_size() -> None:
+    """Test that logs are much smaller than json dumps of the states."""
+    recorder, turns = record(lazy=False)
+    size = len(recorder.stop().to_bytes())
+    dumps = sum(len(dump) for _, _, dump in turns)
+    assert 10 * size < dumps, f"The log has {size} bytes, the dumps {dumps}."
+
+
+def test_errors() -> None:
+    """Test that corrupted logs are rejected."""
+    recorder, turns = record(lazy=True)
+    log = recorder.stop()
+    with pytest.raises(ValueError, match="not a game log"):
+        Log.from_bytes(b"{}")
+    with pytest.raises(ValueError, match="registry"):
+        log.header._replace(registry="0" * 16).setup()
+    cleanup = np.flatnonzero(log.records["kind"] == 8)[0]
+    with pytest.raises(ValueError, match="end of a step"):
+        Replayer(log).at(cleanup + 1)
+
+    records = log.records.copy()
+    drawn = np.flatnonzero(records["kind"] == 6)[10]
+    records["card"][drawn] = (records["card"][drawn] + 1) % cards.num_cards()
+    with pytest.raises(ValueError, match=f"Record {drawn} "):
+        Replayer(Log(log.header, records))
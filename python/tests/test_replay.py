@@ -0,0 +1,151 @@
+"""Tests for the memory-mapped replay buffer."""
+
+import multiprocessing
+import pathlib
+
+import numpy as np
+import pytest
+from alpha_dom import cards
+from alpha_dom import encoding
+from alpha_dom import selfplay
+
+
+def positions(games: np.ndarray) -> dict[str, np.ndarray]:
+    """Return positions whose columns are all filled with their game."""
+    m = len(games)
+    return {
+        "observation": np.repeat(games, encoding.observation_size()).reshape(m, -1),
+        "policy": np.repeat(games, cards.num_cards() + 1).reshape(m, -1),
+        "outcome": (games % 3 - 1).astype(np.int8),
+        "game": games,
+    }
+
+
+def test_ring(tmp_path: pathlib.Path) -> None:
+    """Test that appends overwrite, and evictions drop, the oldest positions."""
+    with selfplay.ReplayBuffer.create(tmp_path, capacity=10) as buffer:
+        buffer.append(positions(np.arange(6)))
+        kept = buffer.append(positions(np.arange(6, 13)))
+        assert kept.tolist() == list(range(6, 13)), "Incorrect positions."
+        assert len(buffer) == 10, "The buffer overflowed."
+        assert sorted(buffer.columns["game"]) == list(range(3, 13)), "Bad eviction."
+
+        kept = buffer.append(positions(np.arange(13, 40)))
+        assert kept.tolist() == list(range(30, 40)), "Too many positions were kept."
+        assert sorted(buffer.columns["game"]) == list(range(30, 40)), "Bad overwrite."
+
+        buffer.evict(4)
+        assert len(buffer) == 6, "Positions were not evicted."
+        rng = np.random.default_rng(0)
+        for prioritized in (False, True):
+            batch = buffer.sample(500, rng, prioritized=prioritized)
+            assert set(batch.observation[:, 0]) == set(range(34, 40)), "Bad samples."
+            assert (batch.policy[:, -1] == batch.observation[:, 0]).all(), "Bad rows."
+            assert (batch.indices == batch.observation[:, 0]).all(), "Bad positions."
+
+
+def test_evict_shards(tmp_path: pathlib.Path) -> None:
+    """Test that shards are evicted whole, even after partial overwrites."""
+    with selfplay.ReplayBuffer.create(tmp_path, capacity=10) as buffer:
+        for size in (4, 3, 5):
+            shard = buffer.total + np.arange(size)
+            selfplay.shards.write_shard(tmp_path / "shards", 0, positions(shard))
+            buffer.append_shard(selfplay.shards.shard_path(tmp_path / "shards", 0))
+        assert len(buffer) == 10, "The first shard was not overwritten."
+
+        # The first shard lost two positions to overwrites, and counts as one.
+        buffer.evict_shards(1)
+        assert len(buffer) == 8, "The rest of the first shard was not evicted."
+        buffer.evict_shards(0)
+        assert len(buffer) == 8, "Positions were evicted."
+        buffer.evict(1)
+        buffer.evict_shards(1)
+        assert len(buffer) == 5, "The split shard was not evicted whole."
+        batch = buffer.sample(100, np.random.default_rng(0))
+        assert set(batch.indices) == set(range(7, 12)), "The wrong shard was evicted."
+        buffer.evict_shards(5)
+        assert not len(buffer), "Shards were left after evicting all of them."
+
+        # More appends than rows wrap around the ends of the appends.
+        for game in range(12, 30):
+            buffer.append(positions(np.array([game])))
+        buffer.evict_shards(3)
+        assert len(buffer) == 7, "Appends were not evicted after wrapping around."
+
+
+def test_prioritized(tmp_path: pathlib.Path) -> None:
+    """Test that prioritized samples follow the priorities."""
+    with selfplay.ReplayBuffer.create(tmp_path, capacity=6) as buffer:
+        buffer.append(positions(np.arange(6)), priority=np.array([0, 1, 2, 3, 0, 4.0]))
+        rng = np.random.default_rng(1)
+        batch = buffer.sample(20_000, rng, prioritized=True)
+        frequency = np.bincount(batch.indices, minlength=6) / len(batch.indices)
+        assert np.allclose(
+            frequency,
+            [0, 0.1, 0.2, 0.3, 0, 0.4],
+            atol=0.02,
+        ), "Bad freq."
+        assert batch.weight.max() == 1, "Unnormalized weights."
+        assert (batch.weight[batch.indices == 5] < 1).all(), "Frequent rows not damped."
+
+        buffer.update_priorities(np.array([5]), np.array([0.0]))
+        batch = buffer.sample(1000, rng, prioritized=True)
+        assert 5 not in batch.indices, "A row without priority was sampled."
+
+        # A target at the sum of the tree, as rounding errors can produce, must
+        # not reach the rows without priority after the last one.
+        assert buffer._descend(np.array([buffer._tree[1]])).tolist() == [3], "Bad row."
+
+        buffer.evict(2)
+        buffer.update_priorities(np.array([0, 1, 2]), np.array([9.0, 9.0, 1.0]))
+        batch = buffer.sample(1000, rng, prioritized=True)
+        assert set(batch.indices) == {2, 3}, "An evicted row was sampled."
+        assert np.isfinite(batch.weight).all(), "Bad weights."
+
+        buffer.update_priorities(np.array([2, 3]), np.zeros(2))
+        with pytest.raises(ValueError, match="priorities are zero"):
+            buffer.sample(1, rng, prioritized=True)
+
+        # Positions 8 and 9 overwrite the rows of the evicted positions 2 and 3,
+        # so late updates of the old positions must not touch the new ones.
+        buffer.evict(4)
+        buffer.append(positions(np.arange(6, 10)), priority=np.ones(4))
+        buffer.update_priorities(np.arange(2, 6), np.zeros(4))
+        batch = buffer.sample(1000, rng, prioritized=True)
+        assert set(batch.indices) == set(range(6, 10)), "A stale update was applied."
+        assert (batch.indices == batch.observation[:, 0]).all(), "Bad positions."
+
+
+def _append(root: pathlib.Path, worker: int) -> None:
+    """Append the positions of a worker to a shared buffer."""
+    with selfplay.ReplayBuffer(root) as buffer:
+        for k in range(10):
+            buffer.append(positions(np.arange(10) + 100 * worker + 10 * k))
+
+
+def test_writers(tmp_path: pathlib.Path) -> None:
+    """Test appends from several processes."""
+    selfplay.ReplayBuffer.create(tmp_path, capacity=500).close()
+    ctx = multiprocessing.get_context("spawn")
+    processes = [ctx.Process(target=_append, args=(tmp_path, w)) for w in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0, "A writer failed."
+
+    with selfplay.ReplayBuffer(tmp_path) as buffer:
+        assert buffer.total == 300, "Appends were lost."
+        games = sorted(buffer.columns["game"][:300])
+    assert games == list(range(300)), "Torn appends."
+
+
+def test_other_registry(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a buffer of other card ids is not opened."""
+    selfplay.ReplayBuffer.create(tmp_path, capacity=4).close()
+    monkeypatch.setattr(cards, "fingerprint", lambda: "0" * 16)
+    with pytest.raises(ValueError, match="registry"):
+        selfplay.ReplayBuffer(tmp_path)
@@ -0,0 +1,171 @@
+"""Tests for snapshots, state hashes and tree search."""
+
+import numpy as np
+import pytest
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import state
+from alpha_dom.engine import BatchedGame
+from alpha_dom.player import Player
+from alpha_dom.search import MCTS
+from alpha_dom.state import zobrist
+
+
+def make_game(num_games: int = 4) -> BatchedGame:
+    """Return a batch of games in the buy phase of their first turn."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    game = BatchedGame.from_board(b, num_games, rng=0)
+    game.play_treasures()
+    return game
+
+
+def test_batched_snapshot() -> None:
+    """Test that restoring a snapshot undoes any number of turns."""
+    game = make_game()
+    snapshot = game.snapshot(1)
+    before = zobrist.hash_games(game)
+
+    for _ in range(10):
+        game.buy(np.full(game.num_games, cards.load("Copper").id))
+        game.cleanup()
+        game.play_treasures()
+    assert (zobrist.hash_games(game) != before).all(), "Hashes did not change."
+
+    game.restore(snapshot)
+    restored = zobrist.hash_games(game)
+    assert (restored == before[1]).all(), "Restored states differ."
+    for name, value in snapshot.items():
+        assert (getattr(game, name)[3] == value).all(), f"{name} not restored."
+
+
+def test_object_snapshot() -> None:
+    """Test snapshots of a board and its players."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    players = [Player(name=i, rng=i) for i in range(2)]
+    s = state.snapshot(b, players)
+    expected = [(p.draw_pile.copy(), dict(p.hand)) for p in players]
+
+    for _ in range(2):
+        for p in players:
+            p.buy(cards.load("Silver"), b)
+            p.trash(b, next(iter(p.hand)), "Hand")
+            p.cleanup()
+        state.restore(s, b, players)
+
+        assert b.supply[cards.load("Silver")] == 40, "Supply not restored."
+        assert not b.trash, "Trash not restored."
+        for p, (draw_pile, hand) in zip(players, expected, strict=True):
+            assert p.draw_pile == draw_pile, "Draw pile not restored."
+            assert p.hand == hand, "Hand not restored."
+            assert not p.discard_pile, "Discard pile not restored."
+
+
+def test_zobrist() -> None:
+    """Test that hashes depend on counts, not on the order of buys."""
+    game = make_game(2)
+    game.restore(game.snapshot(0))
+    game.money[:] = 10
+    game.buys[:] = 2
+    silver, village = cards.load("Silver").id, cards.load("Village").id
+    game.buy(np.array([silver, village]))
+    game.buy(np.array([village, silver]))
+    h = zobrist.hash_games(game)
+    assert h[0] == h[1], "Transposed buys hash differently."
+
+    # The hash changes by the keys of the old and new counts of a card.
+    count = int(game.supply[0, silver])
+    key = zobrist.zone_index("supply")
+    game.supply[0, silver] -= 1
+    updated = h[0] ^ zobrist.card_key(key, silver, count)
+    updated ^= zobrist.card_key(key, silver, count - 1)
+    assert zobrist.hash_games(game)[0] == updated, "Hash is not incremental."
+    assert zobrist.card_key(key, silver, 0) == 0, "Empty counts have a key."
+
+
+def test_mcts_finds_win() -> None:
+    """Test that the search buys the last Province when that wins the game."""
+    game = make_game(1)
+    province = cards.load("Province").id
+    game.supply[0, province] = 1
+    game.discard_pile[0, 0, cards.load("Duchy").id] = 1
+    game.money[0] = 8
+
+    calls = []
+
+    def evaluator(
+        observations: np.ndarray,
+        masks: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        calls.append(len(observations))
+        return masks / masks.sum(axis=1, keepdims=True), np.zeros(len(masks))
+
+    mcts = MCTS(game.boards[0], evaluator, batch_size=16, rng=0)
+    node = mcts.search(game.snapshot(0), 256)
+    assert node.visits.sum() == 256, "Incorrect number of simulations."
+    assert node.mask.sum() > 1, "Only one action was legal."
+    assert mcts.action_cards[node.visits.argmax()] == province, "Did not win."
+    assert node.q()[node.visits.argmax()] == pytest.approx(1), "Win was not valued."
+    assert calls[0] == 1, "The root was not expanded on its own."
+    assert len(calls) <= 1 + 256 // 16, "Leaves were not evaluated in batches."
+    assert max(calls) > 1, "Leaves were not evaluated in batches."
+
+    game.done[0] = True
+    with pytest.raises(ValueError, match="finished game"):
+        mcts.search(game.snapshot(0), 16)
+
+
+def test_incremental_hashes() -> None:
+    """Test that the mutators of boards and players maintain their hashes."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    players = [Player(name=i, rng=i) for i in range(2)]
+    rng = np.random.default_rng(0)
+    silver, village = cards.load("Silver"), cards.load("Village")
+
+    seen = set()
+    for turn in range(20):
+        p = players[turn % 2]
+        p.start_turn()
+        p.play_treasures()
+        p.buy(silver, b)
+        p.gain(village, "Hand", b)
+        p.top_deck(village, "Hand")
+        if p.draw_pile:
+            index = int(rng.integers(len(p.draw_pile)))
+            p.discard(p.draw_pile[index], "DrawPile", index)
+        if p.draw_pile:
+            p.trash(b, p.draw_pile[-1], "DrawPile")
+        if p.hand.get(silver):
+            p.trash(b, silver, "Hand")
+        else:
+            p.gain(silver, "Hand", b)
+        p.cleanup()
+
+        incremental = b.state_hash
+        assert incremental == b.rehash(), "Hash of the board was not maintained."
+        for q in players:
+            incremental = q.state_hash
+            assert incremental == q.rehash(), "Hash of a player was not maintained."
+        seen.add(zobrist.hash_state(b, players, turn % 2, turn))
+    assert len(seen) == 20, "Different states hash the same."
+
+
+def test_hashes_match_batched_game() -> None:
+    """Test that boards and players hash like the same state of a batch."""
+    game = make_game()
+    for _ in range(15):
+        game.buy(np.full(game.num_games, cards.load("Silver").id))
+        game.cleanup()
+        game.play_treasures()
+
+    hashes = zobrist.hash_games(game)
+    for g in range(game.num_games):
+        players = [game.to_player(g, p) for p in range(game.num_players)]
+        h = zobrist.hash_state(
+            game.to_board(g),
+            players,
+            int(game.current[g]),
+            int(game.turn[g]),
+        )
+        assert h == hashes[g], "Hashes of the same state differ."
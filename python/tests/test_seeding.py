@@ -0,0 +1,79 @@
+"""Tests for reproducible random number streams."""
+
+import numpy as np
+from alpha_dom import board
+from alpha_dom import seeding
+from alpha_dom.engine import BatchedGame
+from alpha_dom.player import Player
+from alpha_dom.player import VectorPlayer
+
+
+def test_streams() -> None:
+    """Test that streams depend only on the master seed and their key."""
+    first = seeding.generator(42, 3).integers(1 << 32, size=8)
+    again = seeding.generator(42, 3).integers(1 << 32, size=8)
+    assert (first == again).all(), "The same stream is not reproducible."
+
+    # Deriving other streams first does not change a stream.
+    seeding.game_generators(42, range(3))
+    spawned = np.random.default_rng(np.random.SeedSequence(42).spawn(4)[3])
+    assert (first == spawned.integers(1 << 32, size=8)).all(), "Not counter-based."
+
+    others = [
+        seeding.generator(43, 3),
+        seeding.generator(42, 4),
+        seeding.generator(42, 3, 0),
+    ]
+    for rng in others:
+        assert (first != rng.integers(1 << 32, size=8)).any(), "Streams collide."
+
+    nested = seeding.stream(seeding.stream(42, 3), 1)
+    flat = seeding.stream(42, 3, 1)
+    assert (nested.generate_state(4) == flat.generate_state(4)).all(), "Bad nesting."
+
+
+def test_seeded_players() -> None:
+    """Test that players with the same stream shuffle identically."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+
+    decks = []
+    for _ in range(2):
+        p = Player(name=0, rng=seeding.generator(0, 5, 1))
+        for _ in range(6):
+            p.cleanup()
+        v = VectorPlayer(0, rng=seeding.generator(0, 5, 1))
+        for _ in range(6):
+            v.cleanup()
+        decks.append((p.draw_pile, p.hand, v.draw_pile.tolist(), v.hand.tolist()))
+
+    assert decks[0] == decks[1], "Seeded players are not reproducible."
+    assert VectorPlayer.from_player(p).rng is p.rng, "Generator was not shared."
+
+
+def test_seeded_boards_and_games() -> None:
+    """Test that random boards and batched games are reproducible."""
+    assert board.load_random(7).name == board.load_random(7).name, "Bad board."
+    names = {board.load_random(seeding.generator(7, g)).name for g in range(10)}
+    assert len(names) > 1, "Random boards do not vary between streams."
+
+    boards = [board.load_suggested(s) for s in board.SuggestedSet]
+    games = [BatchedGame(boards, rng=seeding.generator(1, 0)) for _ in range(2)]
+    for game in games:
+        game.reset()
+        for _ in range(20):
+            game.play_treasures()
+            game.buy(np.full(game.num_games, -1))
+            game.cleanup()
+    assert (games[0].draw_pile == games[1].draw_pile).all(), "Bad batched shuffles."
+    assert (games[0].hand == games[1].hand).all(), "Bad batched shuffles."
+
+
+def test_clone() -> None:
+    """Test that a clone continues the stream of a generator independently."""
+    rng = seeding.generator(3, 0)
+    rng.random(5)
+    copied = seeding.clone(rng)
+    assert (copied.random(5) == rng.random(5)).all(), "The clone diverged."
+    copied.random()
+    assert copied.random() != rng.random(), "The clone shares its state."
@@ -0,0 +1,138 @@
+"""Tests for the self-play runner and its sharded output."""
+
+import pathlib
+
+import numpy as np
+import pytest
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import encoding
+from alpha_dom import selfplay
+from alpha_dom.selfplay import shards
+
+
+def config(root: pathlib.Path, num_shards: int) -> selfplay.Config:
+    """Return the settings of a small run."""
+    return selfplay.Config(
+        root=root,
+        num_shards=num_shards,
+        games_per_shard=3,
+        num_envs=2,
+        max_turns=40,
+        seed=5,
+    )
+
+
+def read(root: pathlib.Path, shard: int) -> dict[str, np.ndarray]:
+    """Return the columns of a shard, read into memory."""
+    return shards.read_shard(shards.shard_path(root, shard), mmap=False)
+
+
+def test_shard_columns(tmp_path: pathlib.Path) -> None:
+    """Test the columns of a shard and their consistency."""
+    c = config(tmp_path, 1)._replace(suggested=board.SuggestedSet.FirstGame)
+    columns = selfplay.play_shard(c, 0)
+    m = len(columns["game"])
+    assert columns["observation"].shape == (m, encoding.observation_size()), "Bad F."
+    assert columns["policy"].shape == (m, cards.num_cards() + 1), "Bad policy."
+    assert np.allclose(columns["policy"].sum(axis=1), 1), "Unnormalized policy."
+
+    games = columns["game"]
+    assert (np.diff(games) >= 0).all(), "Positions are not grouped by game."
+    assert np.unique(games).tolist() == [0, 1, 2], "Incorrect games."
+    assert set(np.unique(columns["outcome"])) <= {-1, 0, 1}, "Incorrect outcomes."
+
+
+def test_search_targets(tmp_path: pathlib.Path) -> None:
+    """Test that the visit counts of a search are recorded as policy targets."""
+    c = config(tmp_path, 1)._replace(
+        games_per_shard=1,
+        suggested=board.SuggestedSet.FirstGame,
+        max_turns=6,
+        num_simulations=8,
+    )
+    columns = selfplay.play_shard(c, 0)
+    policy = columns["policy"]
+    assert np.allclose(policy.sum(axis=1), 1), "Unnormalized policy."
+    assert np.allclose(policy * 8, np.round(policy * 8)), "Not visit counts."
+
+    # The first position is the same without a search, whose targets are the
+    # uniform priors over the legal actions.
+    priors = selfplay.play_shard(c._replace(num_simulations=0), 0)["policy"][0]
+    assert (priors[policy[0] > 0] > 0).all(), "An illegal action was searched."
+    assert not np.allclose(policy[0], priors), "The priors were recorded."
+
+
+def test_long_games_are_kept(tmp_path: pathlib.Path) -> None:
+    """Test that a shard keeps the first games to start, not to finish."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    ids = board.Tables.stack([b], len(b.kingdom_cards) + 1).ids[0]
+    money = [cards.load(name).id for name in ("Province", "Gold", "Silver")]
+    preferred = [np.flatnonzero(ids == card_id)[0] for card_id in money]
+
+    def evaluator(
+        observations: np.ndarray,
+        masks: np.ndarray,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Pass in the first game, and play Big Money in the others."""
+        priors = np.zeros(masks.shape)
+        priors[:, -1] = 1
+        for row in range(1, len(masks)):
+            legal = [a for a in preferred if masks[row, a]]
+            if legal:
+                priors[row] = np.eye(np.shape(masks)[1])[legal[0]]
+        return priors, np.zeros(len(observations))
+
+    c = config(tmp_path, 1)._replace(
+        games_per_shard=1,
+        suggested=board.SuggestedSet.FirstGame,
+        max_turns=100,
+        evaluator=evaluator,
+    )
+    columns = selfplay.play_shard(c, 0)
+    assert len(columns["game"]) == 100, "The first game was not kept."
+    assert not columns["outcome"].any(), "The first game was not truncated."
+
+
+def test_run_and_resume(tmp_path: pathlib.Path) -> None:
+    """Test that resuming a run only generates the missing shards."""
+    throughput = selfplay.run(config(tmp_path, 2))
+    assert throughput.games == 6, "Incorrect number of games."
+    assert throughput.positions == sum(
+        e.positions for e in shards.read_index(tmp_path).values()
+    ), "The throughput and the index disagree."
+    first = read(tmp_path, 1)
+
+    # A crash after writing shard 1, but before its line was complete.
+    index = tmp_path / shards.INDEX
+    lines = index.read_text().splitlines()
+    index.write_text(lines[0] + "\n" + lines[1][:10])
+    throughput = selfplay.run(config(tmp_path, 3))
+    assert throughput.games == 6, "Finished shards were generated again."
+    assert sorted(shards.read_index(tmp_path)) == [0, 1, 2], "Incorrect index."
+    for name, column in read(tmp_path, 1).items():
+        assert (column == first[name]).all(), "A redone shard differs."
+
+    assert selfplay.run(config(tmp_path, 3)).games == 0, "A finished run resumed."
+
+
+def test_other_registry(
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that shards written with other card ids are not read."""
+    selfplay.run(config(tmp_path, 1))
+    monkeypatch.setattr(cards, "fingerprint", lambda: "0" * 16)
+    with pytest.raises(ValueError, match="registry"):
+        read(tmp_path, 0)
+
+
+def test_workers(tmp_path: pathlib.Path) -> None:
+    """Test that the shards do not depend on the number of workers."""
+    selfplay.run(config(tmp_path / "serial", 2))
+    selfplay.run(config(tmp_path / "parallel", 2), num_workers=2)
+    for shard in range(2):
+        serial = read(tmp_path / "serial", shard)
+        parallel = read(tmp_path / "parallel", shard)
+        for name in shards.COLUMNS:
+            assert (serial[name] == parallel[name]).all(), "Workers changed a shard."
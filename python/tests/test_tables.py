@@ -0,0 +1,87 @@
+"""Tests for the precomputed per-board tables and legal-action masks."""
+
+import numpy as np
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom.player import Player
+from alpha_dom.player import VectorPlayer
+
+
+def naive_buy_mask(b: board.Board, money: int, buys: int) -> list[bool]:
+    """Return the buy mask by comparing every card one at a time."""
+    return [
+        buys > 0 and c.cost <= money and b.supply.get(c, 0) > 0 for c in b.kingdom_cards
+    ]
+
+
+def test_tables_built_with_supply() -> None:
+    """Test that setting the initial supply builds the tables of a board."""
+    b = board.load_suggested(board.SuggestedSet.DeckTop)
+    b.set_initial_supply()
+    tables = b.tables
+
+    assert tables.ids.tolist() == [c.id for c in b.kingdom_cards], "Incorrect ids."
+    assert tables.costs.tolist() == [c.cost for c in b.kingdom_cards], "Bad costs."
+    assert tables.types.tolist() == [c.flags for c in b.kingdom_cards], "Bad types."
+
+
+def test_masks() -> None:
+    """Test the masks of a player against a naive scan."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    p = Player(name=0)
+    market = cards.load("Market")
+    b.supply[cards.load("Silver")] = 0
+
+    for money in range(9):
+        p.money = money
+        buy, play = board.masks(b, p)
+        assert buy.tolist() == naive_buy_mask(b, money, p.buys), "Bad buy mask."
+        assert not play.any(), "Treasures or victory cards are playable."
+
+    p.hand[market] = 1
+    _, play = board.masks(b, p)
+    assert play.nonzero()[0].tolist() == [market.id], "Market is not playable."
+
+    p.actions = 0
+    p.buys = 0
+    buy, play = board.masks(b, p)
+    assert not buy.any(), "Buy mask ignores buys."
+    assert not play.any(), "Play mask ignores actions."
+
+    v = VectorPlayer.from_player(p)
+    for expected, mask in zip(board.masks(b, p), board.masks(b, v), strict=True):
+        assert (expected == mask).all(), "Masks differ for a vector player."
+
+
+def test_batched_masks() -> None:
+    """Test that the masks of a batch match those of each board."""
+    boards = [board.load_suggested(s) for s in board.SuggestedSet]
+    boards.append(board.load_custom(["Witch", "Village", "Smithy"]))
+    rng = np.random.default_rng(0)
+    for b in boards:
+        b.set_initial_supply()
+        for c in b.kingdom_cards:
+            b.supply[c] = int(rng.integers(0, 2))
+
+    tables = board.Tables.stack(boards)
+    supply = np.zeros((len(boards), cards.num_cards()), dtype=np.int32)
+    for i, b in enumerate(boards):
+        for c, n in b.supply.items():
+            supply[i, c.id] = n
+
+    money = rng.integers(0, 9, len(boards))
+    buys = rng.integers(0, 2, len(boards))
+    mask = board.buy_mask(tables, tables.gather(supply), money, buys)
+    width = max(len(b.kingdom_cards) for b in boards)
+    assert mask.shape == (len(boards), width), "Incorrect mask shape."
+    for i, b in enumerate(boards):
+        expected = naive_buy_mask(b, money[i], buys[i])
+        assert mask[i, : len(expected)].tolist() == expected, "Bad batched mask."
+        assert not mask[i, len(expected) :].any(), "Padding can be bought."
+
+    hands = rng.integers(0, 2, (len(boards), cards.num_cards()))
+    actions = rng.integers(0, 2, len(boards))
+    play = board.play_mask(hands, actions)
+    for i in range(len(boards)):
+        assert (play[i] == board.play_mask(hands[i], actions[i])).all(), "Bad mask."
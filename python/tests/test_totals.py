@@ -0,0 +1,64 @@
+"""Tests for the running totals of boards and players."""
+
+import numpy as np
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import state
+from alpha_dom.player import Player
+
+
+def points(p: Player) -> int:
+    """Return the victory points of a player, counted over its whole deck."""
+    deck = p.deck
+    return sum(
+        card.points
+        + (len(deck) // card.points_per_cards if card.points_per_cards else 0)
+        for card in deck
+    )
+
+
+def test_totals() -> None:
+    """Test that the totals match a full count after gains, buys and trashes."""
+    b = board.load_custom(["Gardens", "Smithy", "Witch"])
+    b.set_initial_supply()
+    p = Player(name=0, rng=0)
+    log = state.UndoLog()
+    log.track(b, p)
+    rng = np.random.default_rng(0)
+
+    assert (p.deck_size, p.victory_points()) == (10, 3), "Bad starting totals."
+    for _ in range(200):
+        if p.hand and rng.random() < 0.3:
+            p.trash(b, next(iter(p.hand)), "Hand")
+        stocked = [c for c in b.kingdom_cards if b.supply[c]]
+        if stocked:
+            card = stocked[rng.integers(len(stocked))]
+            p.money, p.buys = card.cost, 1
+            p.buy(card, b)
+        p.cleanup()
+
+        assert p.deck_size == len(p.deck), "Bad deck size."
+        assert p.victory_points() == points(p), "Bad victory points."
+        empty = sum(n == 0 for n in b.supply.values())
+        assert b.empty_piles == empty, "Bad count of empty piles."
+        assert b.game_over() == (
+            b.supply[cards.load("Province")] == 0 or empty >= 3
+        ), "Bad end of game."
+
+    assert b.game_over(), "The supply did not run out."
+    log.rollback()
+    assert (p.deck_size, p.victory_points()) == (10, 3), "Totals not rolled back."
+    assert b.empty_piles == 0, "Empty piles not rolled back."
+
+
+def test_direct_play() -> None:
+    """Test that cleanup discards cards put directly into the play area."""
+    p = Player(name=0, rng=0)
+    card = next(iter(p.hand))
+    p.hand[card] -= 1
+    p.cards_in_play.append(card)
+    p.cleanup()
+
+    assert p.deck_size == len(p.deck) == 10, "Cards were lost."
+    assert not p.cards_in_play, "The play area was not discarded."
+    assert p.state_hash == p.fork().rehash(), "Bad hash."
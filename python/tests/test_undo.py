@@ -0,0 +1,90 @@
+"""Tests for the undo log and copy-on-write forks of boards and players."""
+
+import numpy as np
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom import state
+from alpha_dom.player import Player
+
+
+def setup() -> tuple[board.Board, list[Player]]:
+    """Return a board with its initial supply and two seeded players."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    return b, [Player(name=i, rng=i) for i in range(2)]
+
+
+def play(b: board.Board, players: list[Player], turns: int, seed: int) -> None:
+    """Play random turns, using every kind of mutation of the players."""
+    rng = np.random.default_rng(seed)
+    for turn in range(turns):
+        p = players[turn % len(players)]
+        p.start_turn()
+        if p.hand and rng.random() < 0.3:
+            card = next(iter(c for c, n in p.hand.items() if n))
+            p.trash(b, card, "Hand")
+        if p.draw_pile and rng.random() < 0.3:
+            p.discard(p.draw_pile[0], "DrawPile", 0)
+        p.play_treasures()
+        affordable = [c for c in b.kingdom_cards if c.cost <= p.money and b.supply[c]]
+        if affordable:
+            p.buy(affordable[rng.integers(len(affordable))], b)
+        p.gain(cards.load("Silver"), "DrawPile", b)
+        p.cleanup()
+
+
+def test_rollback() -> None:
+    """Test that rolling back restores the state, its hashes and the logs."""
+    b, players = setup()
+    log = state.UndoLog()
+    log.track(b, *players)
+
+    before = state.snapshot(b, players)
+    hashes = [b.state_hash, *(p.state_hash for p in players)]
+    play(b, players, 6, seed=0)
+    checkpoint = log.checkpoint()
+    middle = state.snapshot(b, players)
+
+    play(b, players, 6, seed=1)
+    assert state.snapshot(b, players) != middle, "The turns changed nothing."
+    log.rollback(to=checkpoint)
+    assert state.snapshot(b, players) == middle, "Incorrect rollback to checkpoint."
+    assert len(log) == checkpoint, "The rolled back entries are still logged."
+
+    log.rollback()
+    log.untrack(b, *players)
+    assert state.snapshot(b, players) == before, "Incorrect full rollback."
+    assert [b.state_hash, *(p.state_hash for p in players)] == hashes, "Bad hashes."
+    assert b.state_hash == b.rehash(), "The board hash is not restored."
+    for p in players:
+        assert p.state_hash == p.rehash(), "The player hash is not restored."
+
+    play(b, players, 2, seed=2)
+    assert not len(log), "Untracked models are logged."
+
+
+def test_fork() -> None:
+    """Test that forks share zones until either side changes them."""
+    b, players = setup()
+    play(b, players, 4, seed=0)
+    before = state.snapshot(b, players)
+
+    board_fork = b.fork()
+    forks = [p.fork() for p in players]
+    assert board_fork.supply is b.supply, "The supply is copied eagerly."
+    assert forks[0].draw_pile is players[0].draw_pile, "The zones are copied eagerly."
+    assert forks[0].state_hash == players[0].state_hash, "Different hashes."
+
+    play(board_fork, forks, 6, seed=1)
+    assert state.snapshot(b, players) == before, "A fork changed the original."
+    play(b, players, 6, seed=1)
+    expected = state.snapshot(board_fork, forks)
+    assert state.snapshot(b, players) == expected, "The forks diverged."
+
+    log = state.UndoLog()
+    log.track(b, *players)
+    forked = [p.fork() for p in players]
+    play(b, players, 2, seed=2)
+    log.rollback()
+    expected = state.snapshot(b, forked)
+    assert state.snapshot(b, players) == expected, "A rollback changed a fork."
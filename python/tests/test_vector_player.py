@@ -0,0 +1,169 @@
+"""Tests for the array-backed player."""
+
+import numpy as np
+import pytest
+from alpha_dom import board
+from alpha_dom import cards
+from alpha_dom.player import Player
+from alpha_dom.player import VectorPlayer
+
+
+def counts(zone: dict[cards.Card, int]) -> list[int]:
+    """Return the counts of a dict-based zone as a list indexed by card id."""
+    result = [0] * cards.num_cards()
+    for card, n in zone.items():
+        result[card.id] += n
+    return result
+
+
+def make_board() -> board.Board:
+    """Return a board with its initial supply."""
+    b = board.load_suggested(board.SuggestedSet.FirstGame)
+    b.set_initial_supply()
+    return b
+
+
+def test_starting_deck() -> None:
+    """Test that a vector player starts with 7 Coppers and 3 Estates."""
+    p = VectorPlayer(0, rng=np.random.default_rng(42))
+    copper, estate = cards.load("Copper").id, cards.load("Estate").id
+
+    assert p.deck[copper] == 7, "Incorrect number of Coppers."
+    assert p.deck[estate] == 3, "Incorrect number of Estates."
+    assert p.deck_size() == 10, "Incorrect deck size."
+    assert p.hand.sum() == 5, "Incorrect hand size."
+    assert p.draw_pile.size == 5, "Incorrect draw pile size."
+    assert not p.discard_pile.any(), "Discard pile is not empty."
+
+
+def test_draw_and_reshuffle() -> None:
+    """Test that drawing reshuffles the discard pile when the draw pile is empty."""
+    p = VectorPlayer(0, rng=np.random.default_rng(42))
+    deck = p.deck.copy()
+
+    drawn = [p.draw() for _ in range(5)]
+    assert None not in drawn, "Could not draw from the draw pile."
+    assert p.draw() is None, "Drew a card from empty piles."
+
+    ids = [c for c in drawn if c is not None]
+    p.discard_pile[:] = np.bincount(ids, minlength=cards.num_cards())
+    card = p.draw()
+    assert card is not None, "Did not reshuffle the discard pile."
+    p.hand[card] += 1
+    assert p.draw_pile.size == 4, "Incorrect draw pile size after reshuffle."
+    assert not p.discard_pile.any(), "Discard pile not emptied by reshuffle."
+
+    p.cleanup()
+    assert p.hand.sum() == 5, "Incorrect hand size after cleanup."
+    assert (p.deck == deck).all(), "Cleanup changed the deck."
+
+
+def test_cleanup_reshuffles_once() -> None:
+    """Test that cleanup draws the rest of the hand after reshuffling."""
+    p = VectorPlayer(0, rng=np.random.default_rng(0))
+    p.cleanup()
+    assert p.draw_pile.size == 0, "Draw pile should be empty."
+    assert p.discard_pile.sum() == 5, "Incorrect discard pile size."
+
+    p.cleanup()
+    assert p.hand.sum() == 5, "Incorrect hand size after reshuffle."
+    assert p.draw_pile.size == 5, "Incorrect draw pile size after reshuffle."
+    assert not p.discard_pile.any(), "Discard pile not emptied by reshuffle."
+
+    p.draw_to_hand(3)
+    p.cleanup()
+    assert p.hand.sum() == 5, "Incorrect hand size after reshuffle."
+    assert p.draw_pile.size == 5, "Incorrect draw pile size after reshuffle."
+    assert p.deck_size() == 10, "Incorrect deck size."
+
+
+def test_matches_player() -> None:
+    """Test that a vector player mirrors the operations of a `Player`."""
+    b, vb = make_board(), make_board()
+    player = Player(name=1)
+    vector = VectorPlayer.from_player(player, rng=np.random.default_rng(7))
+
+    def check() -> None:
+        assert counts(player.hand) == vector.hand.tolist(), "Hands differ."
+        assert (
+            counts(player.discard_pile) == vector.discard_pile.tolist()
+        ), "Discard piles differ."
+        assert [c.id for c in player.draw_pile] == vector.draw_pile.tolist()
+        assert (player.money, player.buys) == (vector.money, vector.buys)
+        assert counts(b.supply) == counts(vb.supply), "Supplies differ."
+        assert counts(b.trash) == counts(vb.trash), "Trashes differ."
+
+    check()
+    silver, smithy = cards.load("Silver"), cards.load("Smithy")
+    copper, estate = cards.load("Copper"), cards.load("Estate")
+    in_hand = next(iter(player.hand))
+
+    player.money = vector.money = 7
+    player.buys = vector.buys = 2
+    player.buy(silver, b)
+    vector.buy(silver, vb)
+    check()
+
+    player.buy(smithy, b)
+    vector.buy(smithy.id, vb)
+    check()
+
+    player.gain(copper, "DrawPile", b)
+    vector.gain(cards.compact_card(copper), "DrawPile", vb)
+    player.gain(estate, "Hand", b)
+    vector.gain(estate, "Hand", vb)
+    check()
+
+    player.top_deck(in_hand, "Hand")
+    vector.top_deck(in_hand, "Hand")
+    player.top_deck(silver, "DiscardPile")
+    vector.top_deck(silver, "DiscardPile")
+    check()
+
+    player.discard(estate, "Hand")
+    vector.discard(estate, "Hand")
+    top = player.draw_pile[0]
+    player.discard(top, "DrawPile", 0)
+    vector.discard(top, "DrawPile", 0)
+    check()
+
+    player.gain(estate, "Hand", b)
+    vector.gain(estate, "Hand", vb)
+    player.trash(b, estate, "Hand")
+    vector.trash(vb, estate, "Hand")
+    top = player.draw_pile[-1]
+    player.trash(b, top, "DrawPile")
+    vector.trash(vb, top, "DrawPile")
+    check()
+
+    assert vector.to_player().draw_pile == player.draw_pile, "Round trip failed."
+
+
+def test_invalid_locations() -> None:
+    """Test that invalid sources and destinations raise errors."""
+    p = VectorPlayer(0)
+    b = make_board()
+    copper = cards.load("Copper")
+    with pytest.raises(ValueError, match="Invalid destination"):
+        p.gain(copper, "Trash", b)  # type: ignore[arg-type]
+    with pytest.raises(ValueError, match="Invalid source"):
+        p.top_deck(copper, "Trash")  # type: ignore[arg-type]
+    with pytest.raises(ValueError, match="Invalid source"):
+        p.discard(copper, "Trash")  # type: ignore[arg-type]
+    with pytest.raises(ValueError, match="Invalid source"):
+        p.trash(b, copper, "Trash")  # type: ignore[arg-type]
+
+
+def test_play_treasures() -> None:
+    """Test that playing treasures matches `Player.play_treasures`."""
+    player = Player(name=0)
+    vector = VectorPlayer.from_player(player)
+
+    player.play_treasures()
+    vector.play_treasures()
+
+    coppers = player.cards_in_play.count(cards.load("Copper"))
+    assert player.money == coppers, "Incorrect money from Coppers."
+    assert vector.money == player.money, "Money differs."
+    assert counts(player.hand) == vector.hand.tolist(), "Hands differ."
+    assert vector.in_play.sum() == coppers, "Incorrect cards in play."